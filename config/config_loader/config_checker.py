@@ -1,5 +1,8 @@
 from .config_error import ConfigError
 
+# values the 'jax' ENGINE requires, it only plays one_to_one conversations without these features
+JAX_ENGINE_SETTINGS = {"p_one_to_one": 1, "ACTIVE_SELF_FRIENDSHIP": False, "competence": False, "LOGGING": False}
+
 class ConfigChecker:
     """A class to check the configuration settings for the simulation."""
 
@@ -17,6 +20,7 @@ class ConfigChecker:
         self.check_list_lengths()
         self.check_initial_mind_structure()
         self.check_character_consistency()
+        self.check_engine()
 
     def check_integer_parameters(self):
         """Check that all required integer parameters are present and valid.
@@ -74,3 +78,26 @@ class ConfigChecker:
         for character in characters:
             if "all" not in character and len(character) != self.conf["n_agents"]:
                 raise ConfigError("Number of characters", "invalid_length", self.conf["n_agents"], len(character))
+
+    def check_engine(self):
+        """Check that the 'jax' ENGINE is only used with the features it implements.
+
+        Raises:
+            ConfigError: If ENGINE is 'jax' and a setting differs from JAX_ENGINE_SETTINGS.
+        """
+        if self.conf.get("ENGINE") == "jax":
+            check_jax_engine(self.conf.get)
+
+
+def check_jax_engine(conf: callable) -> None:
+    """Check the settings the 'jax' ENGINE does not implement, see JAX_ENGINE_SETTINGS.
+
+    Args:
+        conf (callable): Returns the configuration value of a key.
+
+    Raises:
+        ConfigError: If a setting differs from the value the engine requires.
+    """
+    for key, required in JAX_ENGINE_SETTINGS.items():
+        if (conf(key) or 0) != required:
+            raise ConfigError(key, "unsupported_by_engine", required, conf(key))
@@ -25,7 +25,8 @@ class ConfigError(Exception):
         error_messages = {
             "missing": f"Configuration value for '{param}' is missing.",
             "invalid_type": f"Configuration value for '{param}' should be {expected}, but got {actual}.",
-            "invalid_length": f"List '{param}' length should be {expected}, but got {actual}."
+            "invalid_length": f"List '{param}' length should be {expected}, but got {actual}.",
+            "unsupported_by_engine": f"Configuration value for '{param}' should be {expected} with the 'jax' ENGINE, but got {actual}."
         }
         self.message = error_messages.get(error_type, f"Error with '{param}': {error_type}")
         super().__init__(self.message)
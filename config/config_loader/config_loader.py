@@ -1,3 +1,4 @@
+import copy
 import yaml
 from .config_checker import ConfigChecker
 
@@ -9,14 +10,16 @@ class ConfigLoader:
         conf: The processed configuration with defaults and mappings applied.
     """
 
-    def __init__(self, filename: str) -> None:
+    def __init__(self, filename: str, overrides: dict = None) -> None:
         """Initialize the ConfigLoader by loading configuration data and checking validity.
 
         Args:
             filename: The path to the YAML configuration file.
+            overrides: Values replacing those of the file, by flat key (e.g. {"BLUSH_FREQ_LIE": 0.2}). Defaults to None.
         """
         self.config = self.load_data(filename)
         self.conf = self.create_last_name_mapping(self.config)
+        self.conf.update(copy.deepcopy(overrides or {}))
         self.set_config_defaults()
         
         checker = ConfigChecker(self.conf)
@@ -69,13 +72,16 @@ class ConfigLoader:
         """Get the configuration value for a given key."""
         return self.conf.get(key)
 
-def init_conf() -> any:
+def init_conf(overrides: dict = None) -> any:
     """Initialize configuration loader and return a function to access configuration values.
 
+    Args:
+        overrides: Values replacing those of config.yml in memory, by flat key. Defaults to None.
+
     Returns:
         A function that takes a key and returns the corresponding configuration value.
     """
-    config = ConfigLoader('config/config.yml')
+    config = ConfigLoader('config/config.yml', overrides)
     return config.get
 
 config = ConfigLoader('config/config.yml')
@@ -2,7 +2,7 @@ import os
 import streamlit as st
 import matplotlib.pyplot as plt
 from simulate import Game
-from evaluate import Postprocessor
+from evaluate import load_select
 from evaluate.plotter_tool import PlotConfigurator
 from ruamel.yaml import YAML
 
@@ -59,7 +59,7 @@ class ConfigSidebar():
             "switches": {"CONTINUOUS_FRIENDSHIP": self.continuous_friendship}}
         )
         results = Game(write_to_file=False).run(override=True)
-        data = Postprocessor(data=results).select
+        data = load_select(data=results)
         st.session_state.results = data
         st.success("Configuration updated and game executed!")
 
@@ -1,3 +1,3 @@
 from .plotter_tool import plot
 from .logger import Logger
-from .postprocessor import Postprocessor
\ No newline at end of file
+from .postprocessor import Postprocessor, load_select
\ No newline at end of file
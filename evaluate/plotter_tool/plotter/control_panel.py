@@ -2,7 +2,7 @@ import os
 from PyQt5.QtWidgets import QGridLayout, QColorDialog
 from helper import create_button, create_label, create_select, update_plot
 from .control_updater import ControlUpdater
-from evaluate.postprocessor import Postprocessor
+from evaluate.postprocessor import load_select
 
 class ControlPanel(QGridLayout):
     def __init__(self, plotter):
@@ -22,7 +22,7 @@ class ControlPanel(QGridLayout):
     def setup_data_source(self):
         """Set up the data source selection panel."""
         create_label("Data source", 0, 0, self)
-        self.file_select = create_select(self.list_json_files(), 0, 1, self, func=self.load_data)
+        self.file_select = create_select(self.list_result_files(), 0, 1, self, func=self.load_data)
 
     def setup_main_menu(self):
         """Set up the main control panel with axis selection and preconfigured options."""
@@ -30,6 +30,8 @@ class ControlPanel(QGridLayout):
         self.preconf = create_select(self.plotter.plots.keys(), 0, 3, self, self.apply_preconfigured)
         create_label("X-Axis", 1, 0, self)
         self.x_axis_select = create_select(self.fields, 1, 1, self, func=self.plotter.plot_data)
+        create_label("Band", 1, 2, self)
+        self.band_select = create_select(["none"], 1, 3, self, func=self.plotter.plot_data)
         create_button("Add Y-Axis", self.updater.add_y_axis, self, 2, 0)
         create_button("Plot", self.plotter.plot_data, self, 2, 1)
         self.y_axes = []
@@ -45,20 +47,24 @@ class ControlPanel(QGridLayout):
             self.setup_main_menu()
         if filename != "Select file":
             filename = "/".join(["evaluate/results/simulation", filename])
-            self.plotter.data = Postprocessor(filename=filename).select
+            self.plotter.data = load_select(filename=filename)
             self.x_axis_select.deleteLater()
-            self.fields = sorted(self.plotter.data.keys())
+            self.fields = sorted(key for key in self.plotter.data.keys() if key != "bands")
             self.x_axis_select = create_select(self.fields, 1, 1, self, func=self.plotter.plot_data)
+            self.band_select.blockSignals(True)
+            self.band_select.clear()
+            self.band_select.addItems(["none"] + list(self.plotter.data.get("bands", {})))
+            self.band_select.blockSignals(False)
             self.file_select.setCurrentText(filename)
 
-    def list_json_files(self) -> list:
-        """List all JSON files in the data directory.
+    def list_result_files(self) -> list:
+        """List all result files (.npz, .jsonl folders and JSON) in the data directory.
 
         Returns:
-            list: A list of JSON file names.
+            list: A list of result file names.
         """
-        json_files = [f for f in os.listdir("evaluate/results/simulation") if f.endswith('.json')]
-        return ["Select file"] + json_files
+        result_files = [f for f in os.listdir("evaluate/results/simulation") if f.endswith(('.json', '.npz', '.jsonl'))]
+        return ["Select file"] + result_files
 
     @update_plot
     def apply_preconfigured(self, plot_name: str):
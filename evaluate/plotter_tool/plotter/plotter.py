@@ -51,10 +51,12 @@ class Plotter(QWidget):
         self.main_layout.update()
 
     def plot_data(self):
-        """Plot the selected data with specified axes and styles."""
+        """Plot the selected data with specified axes and styles. Over time, the selected band (e.g. the confidence
+        interval over seeds) is drawn around every line."""
         if getattr(self, "data", None):
             self.figure.clear()
             x_field = self.controls.x_axis_select.currentText()
+            band = self.data.get("bands", {}).get(self.controls.band_select.currentText(), {})
             ax = self.canvas.figure.add_subplot(111)
             for y_axis in self.controls.y_axes:
                 y_field = y_axis["data"].currentText()
@@ -63,6 +65,8 @@ class Plotter(QWidget):
                         color=y_axis["color"], 
                         label=y_field, 
                         linewidth=0.5)
+                if x_field == "time" and y_field in band:
+                    ax.fill_between(self.data[x_field], *band[y_field], color=y_axis["color"], alpha=0.2, linewidth=0)
             ax.set_xlabel(x_field)
             ax.set_ylabel("Values")
             ax.legend()
@@ -1 +1,2 @@
-from .postprocessor import Postprocessor
\ No newline at end of file
+from .postprocessor import Postprocessor
+from .select_cache import SelectCache, load_select
\ No newline at end of file
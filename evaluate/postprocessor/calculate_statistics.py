@@ -1,41 +1,145 @@
 import numpy as np
+from scipy import stats
 from config import conf
 
-def calculate_statistics(results: list[dict], times: int) -> dict:
-    """Calculate the mean over all simulation results.
+def calculate_statistics(results: list[dict], times: int, quantiles: list[float] = None, confidence: float = None) -> dict:
+    """Calculate statistics over all simulation results in one vectorized pass per field.
+
+    The time series of all seeds are stacked along a seed axis and reduced to the mean, the standard deviation
+    (ddof=1, 0 for a single seed), minimum, maximum, the selected quantiles and the confidence interval of the mean
+    (Student's t).
 
     Args:
         results (list[dict]): A list of dictionaries containing simulation results.
         times (int): Number of conversations in the simulation
+        quantiles (list[float], optional): Quantiles to compute, e.g. [0.25, 0.75]. Defaults to STATISTICS_QUANTILES.
+        confidence (float, optional): Confidence level of the interval. Defaults to STATISTICS_CONFIDENCE.
 
     Returns:
-        dict: A dictionary containing aggregated time series data for each agent.
+        dict: {statistic: aggregated time series data for each agent}. The statistics are "mean", "std", "min",
+            "max", "q<percent>" for every quantile (e.g. "q25") and "ci_low", "ci_high".
+    """
+    quantiles = conf("STATISTICS_QUANTILES") if quantiles is None else quantiles
+    confidence = conf("STATISTICS_CONFIDENCE") if confidence is None else confidence
+    n_stat = len(results)
+    agg_ts = {}
+    for key in results[0][conf("agents")[0]]:
+        stack = np.stack([stack_agents(result, key) for result in results])
+        mean = stack.mean(axis=0)
+        std = stack.std(axis=0, ddof=1) if n_stat > 1 else np.zeros_like(mean)
+        agg_ts.setdefault("mean", {})[key] = mean
+        agg_ts.setdefault("std", {})[key] = std
+        agg_ts.setdefault("min", {})[key] = stack.min(axis=0)
+        agg_ts.setdefault("max", {})[key] = stack.max(axis=0)
+        for q, values in zip(quantiles, np.quantile(stack, quantiles, axis=0) if len(quantiles) else []):
+            agg_ts.setdefault(quantile_name(q), {})[key] = values
+        agg_ts.setdefault("ci_low", {})[key], agg_ts.setdefault("ci_high", {})[key] = \
+            confidence_interval(mean, std, n_stat, confidence)
+    return split_agents(agg_ts)
+
+
+class RunningStatistics:
     """
-    agg_ts = initialise_time_series(times)
-    for a in conf("agents"):
-        for t in range(times):
-            agg_ts[a]["honesty"][t] = np.mean([result[a]["honesty"][t] for result in results])
-            agg_ts[a]["lastK"][t] = np.mean([result[a]["lastK"][t] for result in results])
-            agg_ts[a]["kappa"][t] = np.mean([result[a]["kappa"][t] for result in results])
-            for b in conf("agents"):
-                agg_ts[a]["I"][b, t] = np.mean([result[a]["I"][b, t] for result in results], axis=0)
-                agg_ts[a]["friendships"][b, t] = np.mean([result[a]["friendships"][b, t] for result in results], axis=0)
-                for c in conf("agents"):
-                    agg_ts[a]["J"][b, c, t] = np.mean([result[a]["J"][b, c, t] for result in results], axis=0)
-    return agg_ts
-
-def initialise_time_series(times: int) -> dict:
-    """Initialize a time series structure for agent simulation data."""
-    n_agents = conf("n_agents")
-    return {
-        id: {
-            "honesty": np.zeros(times),
-            "I": np.zeros((n_agents, times)),
-            "J": np.zeros((n_agents, n_agents, times)),
-            "Iothers": np.zeros((n_agents, n_agents, times)),
-            "lastK": np.zeros(times),
-            "kappa": np.zeros(times),
-            "friendships": np.zeros((n_agents, times)),
-        }
-        for id in conf("agents")
-    }
+    Statistics over seeds that are updated one seed at a time, so the time series of a seed can be discarded after
+    `update` and the memory doesn't depend on the number of seeds.
+
+    Mean and variance are accumulated with Welford's algorithm; accumulators of disjoint sets of seeds can be
+    combined with `merge`. The results match `calculate_statistics` up to rounding, except for the quantiles,
+    which can't be computed from running sums and are left out.
+
+    Attributes:
+        n_stat (int): Number of seeds so far.
+        mean (dict): {field: running mean}, stacked over agents.
+        m2 (dict): {field: sum of squared differences from the mean}.
+        min (dict): {field: running minimum}.
+        max (dict): {field: running maximum}.
+    """
+
+    def __init__(self) -> None:
+        """Starts without seeds."""
+        self.n_stat = 0
+        self.mean, self.m2, self.min, self.max = {}, {}, {}, {}
+
+    def update(self, result: dict) -> None:
+        """
+        Adds the time series of one seed.
+
+        Args:
+            result (dict): Time series data for each agent of one seed.
+        """
+        self.n_stat += 1
+        for key in result[conf("agents")[0]]:
+            values = stack_agents(result, key).astype(float)
+            if self.n_stat == 1:
+                self.mean[key], self.m2[key] = values.copy(), np.zeros_like(values)
+                self.min[key], self.max[key] = values.copy(), values.copy()
+                continue
+            delta = values - self.mean[key]
+            self.mean[key] += delta / self.n_stat
+            self.m2[key] += delta * (values - self.mean[key])
+            np.minimum(self.min[key], values, out=self.min[key])
+            np.maximum(self.max[key], values, out=self.max[key])
+
+    def merge(self, other: "RunningStatistics") -> "RunningStatistics":
+        """
+        Adds the seeds of another accumulator (Chan's parallel algorithm).
+
+        Args:
+            other (RunningStatistics): Statistics of other seeds.
+
+        Returns:
+            RunningStatistics: This accumulator.
+        """
+        if other.n_stat == 0:
+            return self
+        if self.n_stat == 0:
+            self.n_stat = other.n_stat
+            for name in ("mean", "m2", "min", "max"):
+                setattr(self, name, {key: values.copy() for key, values in getattr(other, name).items()})
+            return self
+        n_stat = self.n_stat + other.n_stat
+        for key in self.mean:
+            delta = other.mean[key] - self.mean[key]
+            self.m2[key] += other.m2[key] + delta ** 2 * self.n_stat * other.n_stat / n_stat
+            self.mean[key] += delta * other.n_stat / n_stat
+            np.minimum(self.min[key], other.min[key], out=self.min[key])
+            np.maximum(self.max[key], other.max[key], out=self.max[key])
+        self.n_stat = n_stat
+        return self
+
+    def result(self, confidence: float = None) -> dict:
+        """
+        Returns the statistics in the format of `calculate_statistics`, without quantiles.
+
+        Args:
+            confidence (float, optional): Confidence level of the interval. Defaults to STATISTICS_CONFIDENCE.
+
+        Returns:
+            dict: {statistic: aggregated time series data for each agent}.
+        """
+        confidence = conf("STATISTICS_CONFIDENCE") if confidence is None else confidence
+        agg_ts = {"mean": self.mean, "std": {}, "min": self.min, "max": self.max, "ci_low": {}, "ci_high": {}}
+        for key, mean in self.mean.items():
+            std = np.sqrt(self.m2[key] / (self.n_stat - 1)) if self.n_stat > 1 else np.zeros_like(mean)
+            agg_ts["std"][key] = std
+            agg_ts["ci_low"][key], agg_ts["ci_high"][key] = confidence_interval(mean, std, self.n_stat, confidence)
+        return split_agents(agg_ts)
+
+
+def stack_agents(result: dict, key: str) -> np.ndarray:
+    """Returns the time series of a field of all agents of one seed as one array, agents first."""
+    return np.array([result[a][key] for a in conf("agents")])
+
+def split_agents(agg_ts: dict) -> dict:
+    """Turns {statistic: {field: array stacked over agents}} into {statistic: {agent: {field: array}}}."""
+    return {statistic: {a: {key: values[i] for key, values in fields.items()} for i, a in enumerate(conf("agents"))}
+            for statistic, fields in agg_ts.items()}
+
+def confidence_interval(mean: np.ndarray, std: np.ndarray, n_stat: int, confidence: float) -> tuple:
+    """Returns the lower and upper bound of the confidence interval of the mean (Student's t), the mean for one seed."""
+    half_width = stats.t.ppf(0.5 + confidence / 2, n_stat - 1) * std / np.sqrt(n_stat) if n_stat > 1 else 0
+    return mean - half_width, mean + half_width
+
+def quantile_name(q: float) -> str:
+    """Returns the name of a quantile statistic, e.g. "q25" for 0.25."""
+    return f"q{q * 100:g}"
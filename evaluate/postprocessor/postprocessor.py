@@ -1,31 +1,127 @@
-import json
+import os
+import numpy as np
+from config import conf
+from helper import load_results, iterate_results, count_results
+from helper.run_parallel import launch_parallel
 from .time_series_maker import TimeSeriesMaker
-from .calculate_statistics import calculate_statistics
+from .calculate_statistics import calculate_statistics, RunningStatistics
 from .prepare_plotting import create_select_for_plotter
 
 class Postprocessor:
-    """Loads data from simulation output JSON, converts to time series data, 
-    applies statistics, and prepares for plotting."""
-    def __init__(self, filename: str = None, data: list = None) -> None:
-        """Initialize the Postprocessor with data loaded from a JSON file.
+    """Loads data from a simulation output file (.npz or JSON), converts to time series data, 
+    applies statistics, and prepares for plotting.
+
+    With POSTPROCESSING "streaming", the seeds are read and converted one at a time into `RunningStatistics`, so the
+    memory doesn't grow with the number of seeds; the statistics then have no quantiles.
+    With POSTPROCESSING "parallel", chunks of seeds are converted the same way in the worker pool and their running
+    statistics are merged; fewer seeds than POSTPROCESSING_MIN_PARALLEL are streamed in this process instead.
+
+    Attributes:
+        statistics (dict): {statistic: time series data for agents} of `calculate_statistics`.
+        data (dict): The mean time series data for agents.
+        select (dict): Fields for the plotter, see `create_select_for_plotter`.
+    """
+    def __init__(self, filename: str = None, data: list = None, mode: str = None) -> None:
+        """Initialize the Postprocessor with data loaded from a result file or with the results of a game.
 
         Args:
-            filename (str): The path to the JSON file containing the results.
+            filename (str): The path to the .npz or JSON file containing the results.
+            data (list): Results of a game, each a list of dicts or `StepRecords`.
+            mode (str, optional): "batch", "streaming" or "parallel". Defaults to POSTPROCESSING.
         """
+        mode = mode or conf("POSTPROCESSING")
         if data:
             self.data = data
+        elif filename and mode == "parallel" and count_results(filename) is not None:
+            self.data = filename
         elif filename:
-            self.data = self.load_results(filename)
+            self.data = self.load_results(filename) if mode == "batch" else iterate_results(filename)
         else:
             raise NotImplementedError
-        times = len(self.data[0])
-        ts_maker = TimeSeriesMaker()
 
-        self.data = [ts_maker.make_time_series_data(result, times) for result in self.data]
-        self.data = calculate_statistics(self.data, times)
-        self.select = create_select_for_plotter(self.data, times)
+        if mode == "parallel":
+            self.statistics, times = self.parallel_statistics(self.data)
+        elif mode == "streaming":
+            self.statistics, times = self.stream_statistics(self.data)
+        else:
+            times = len(self.data[0])
+            ts_maker = TimeSeriesMaker()
+            self.data = [ts_maker.make_time_series_data(result, times) for result in self.data]
+            self.statistics = calculate_statistics(self.data, times)
+        self.data = self.statistics["mean"]
+        self.select = create_select_for_plotter(self.statistics, times)
+
+    def stream_statistics(self, results) -> tuple[dict, int]:
+        """Converts one seed after another and adds it to running statistics.
+
+        Args:
+            results (iterable): Results of a game, e.g. from `iterate_results`.
+
+        Returns:
+            tuple[dict, int]: The statistics (see `RunningStatistics.result`) and the number of time steps.
+        """
+        running, times = accumulate_statistics(results)
+        return running.result(), times
+
+    def parallel_statistics(self, source) -> tuple[dict, int]:
+        """Converts chunks of seeds in the worker pool and merges their running statistics.
+
+        The workers read the seeds of an .npz file or .jsonl folder themselves and only send back the running sums
+        of their chunk. Other results are sent to the workers in chunks.
+
+        Args:
+            source (str | iterable): A result file with a known number of seeds (see `count_results`), or results.
+
+        Returns:
+            tuple[dict, int]: The statistics (see `RunningStatistics.result`) and the number of time steps.
+        """
+        if isinstance(source, str):
+            n_stat = count_results(source)
+            chunks = [(source, seeds.tolist()) for seeds in np.array_split(np.arange(n_stat), chunk_count(n_stat))]
+        else:
+            results = list(source)
+            n_stat = len(results)
+            chunks = [(None, [results[i] for i in seeds])
+                      for seeds in np.array_split(np.arange(n_stat), chunk_count(n_stat))]
+        if n_stat < conf("POSTPROCESSING_MIN_PARALLEL"):
+            running, times = accumulate_statistics(seed for chunk in chunks for seed in chunk_results(chunk))
+            return running.result(), times
+
+        running, times = RunningStatistics(), None
+        for partial, chunk_times in launch_parallel(chunks, postprocess_chunk):
+            running.merge(partial)
+            times = times or chunk_times
+        return running.result(), times
 
     def load_results(self, filename: str) -> list[dict]:
-        """Load results from a JSON file."""
-        with open(filename, "r") as json_file:
-            return json.load(json_file)
+        """Load results from an .npz or JSON file."""
+        return load_results(filename)
+
+
+def accumulate_statistics(results) -> tuple[RunningStatistics, int]:
+    """Converts seeds one at a time into time series and adds them to running statistics.
+
+    Args:
+        results (iterable): Results of seeds, each a list of dicts or `StepRecords`.
+
+    Returns:
+        tuple[RunningStatistics, int]: The running statistics and the number of time steps.
+    """
+    ts_maker, running, times = TimeSeriesMaker(), RunningStatistics(), None
+    for result in results:
+        times = times or len(result)
+        running.update(ts_maker.make_time_series_data(result, times))
+    return running, times
+
+def chunk_count(n_stat: int) -> int:
+    """Returns the number of chunks the seeds are split into: one per core, but at least one seed per chunk."""
+    return max(1, min(n_stat, os.cpu_count()))
+
+def chunk_results(chunk: tuple):
+    """Returns the results of a chunk, either (filename, seed indices) or (None, results)."""
+    filename, seeds = chunk
+    return iterate_results(filename, seeds) if filename else seeds
+
+def postprocess_chunk(chunk: tuple) -> tuple[RunningStatistics, int]:
+    """Worker task of `Postprocessor.parallel_statistics`: the running statistics of a chunk of seeds."""
+    return accumulate_statistics(chunk_results(chunk))
@@ -1,15 +1,32 @@
 from config import conf
+from .calculate_statistics import quantile_name
 
-def create_select_for_plotter(data: dict, times: int) -> dict:
+def create_select_for_plotter(statistics: dict, times: int) -> dict:
     """Create a selection dictionary for plotting data. In the plotter, directly select key via dropdown.
 
     Args:
-        data (dict): A dictionary containing time series data for agents.
+        statistics (dict): {statistic: time series data for agents} of `calculate_statistics`.
         times (int): Number of conversations in the simulation
 
     Returns:
         dict: A dictionary with selections for plotting, including honesties, kappa,
-              interactions, friendships, and last statements between agents.
+              interactions, friendships, and last statements between agents (their means).
+              Under "bands", {band: {field: (lower, upper)}} for drawing the spread around every mean.
+    """
+    select = select_fields(statistics["mean"], times)
+    select["bands"] = {name: dict(zip(lower, zip(lower.values(), upper.values())))
+                       for name, (lower, upper) in band_fields(statistics, times).items()}
+    return select
+
+def select_fields(data: dict, times: int) -> dict:
+    """Maps the time series of one statistic to the field names of the plotter.
+
+    Args:
+        data (dict): A dictionary containing time series data for agents.
+        times (int): Number of conversations in the simulation
+
+    Returns:
+        dict: {field: time series}, including "time".
     """
     select = {"time": list(range(times))}
     for a in conf("agents"):
@@ -21,3 +38,29 @@ def create_select_for_plotter(data: dict, times: int) -> dict:
             for c in conf("agents"):
                 select[f"A{b} said last to A{a} about A{c}"] = data[a]["J"][b][c]
     return select
+
+def band_fields(statistics: dict, times: int) -> dict:
+    """Returns the lower and upper fields of every band: "std" (mean +- std), "ci", "min-max" and the range of the
+    outermost quantiles (e.g. "q25-q75").
+
+    Args:
+        statistics (dict): {statistic: time series data for agents} of `calculate_statistics`.
+        times (int): Number of conversations in the simulation
+
+    Returns:
+        dict: {band: (lower fields, upper fields)} without "time".
+    """
+    def fields(data: dict) -> dict:
+        return {key: values for key, values in select_fields(data, times).items() if key != "time"}
+
+    mean, std = fields(statistics["mean"]), fields(statistics["std"])
+    bands = {
+        "std": ({key: mean[key] - std[key] for key in mean}, {key: mean[key] + std[key] for key in mean}),
+        "ci": (fields(statistics["ci_low"]), fields(statistics["ci_high"])),
+        "min-max": (fields(statistics["min"]), fields(statistics["max"])),
+    }
+    quantiles = sorted(conf("STATISTICS_QUANTILES"))
+    if len(quantiles) > 1 and all(quantile_name(q) in statistics for q in quantiles):
+        low, high = quantile_name(quantiles[0]), quantile_name(quantiles[-1])
+        bands[f"{low}-{high}"] = (fields(statistics[low]), fields(statistics[high]))
+    return bands
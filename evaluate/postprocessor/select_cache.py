@@ -0,0 +1,193 @@
+import os
+import json
+import hashlib
+import numpy as np
+from config import conf
+from helper import StepRecords, code_fingerprint
+from .postprocessor import Postprocessor
+
+class SelectCache:
+    """
+    Store of processed plotter selections (`Postprocessor.select`), so that the plotter and the demo don't rerun the
+    postprocessing of unchanged results.
+
+    A select is saved as one .npy matrix with a row per series, loaded memory-mapped, and a JSON index with the
+    names of the rows and the key it was made from. A result file is keyed by its path, size, modification time and
+    content hash, results in memory by their content hash; both also by the VERSION, the settings that change the
+    select and a fingerprint of the postprocessing code (see `code_fingerprint`). A file with a new modification time
+    but the same content stays valid.
+
+    Attributes:
+        folder (str): Folder of the cached selects.
+        settings (dict): Configuration that changes the select.
+        code (str): Fingerprint of the source files in CODE.
+    """
+    VERSION = 1 # increase when the postprocessing changes the select, so that cached selects are no longer used
+    SETTINGS = ("n_agents", "STATISTICS_QUANTILES", "STATISTICS_CONFIDENCE", "POSTPROCESSING")
+    CODE = ("evaluate/postprocessor/*.py", "helper/records.py") # source files that change the select
+
+    def __init__(self, folder: str = None) -> None:
+        """Reads the settings of the configuration and fingerprints the postprocessing code.
+
+        Args:
+            folder (str, optional): Folder of the cached selects. Defaults to SELECT_CACHE_FOLDER.
+        """
+        self.folder = folder or conf("SELECT_CACHE_FOLDER")
+        self.settings = {key: conf(key) for key in self.SETTINGS}
+        self.code = code_fingerprint(self.CODE)
+
+    def load(self, filename: str = None, data: list = None) -> dict:
+        """
+        Returns the select of a result file or of results, from the cache if it is valid, otherwise from a new
+        `Postprocessor`, which is then cached.
+
+        Args:
+            filename (str): The result file (.npz, .jsonl folder or JSON).
+            data (list): Results of a game, each a list of dicts or `StepRecords`.
+
+        Returns:
+            dict: The select, see `create_select_for_plotter`.
+        """
+        source = file_source(filename) if filename else {"hash": results_hash(data)}
+        name = hash_text(os.path.abspath(filename)) if filename else source["hash"][:16]
+        index = self.read_index(name)
+        if index is not None and self.is_valid(index, source, filename):
+            if index["source"] != source:
+                self.write_index(name, {**index, "source": source})
+            return self.read_select(name, index)
+
+        select = Postprocessor(filename=filename, data=data).select
+        source["hash"] = source["hash"] or content_hash(filename)
+        self.write(name, select, source)
+        return select
+
+    def is_valid(self, index: dict, source: dict, filename: str = None) -> bool:
+        """Checks the version, settings and code of a cached select and whether its source is unchanged."""
+        if index["version"] != self.VERSION or index["settings"] != json.loads(json.dumps(self.settings)):
+            return False
+        if index.get("code") != self.code:
+            return False
+        cached = index["source"]
+        if not filename:
+            return cached["hash"] == source["hash"]
+        if cached["size"] != source["size"]:
+            return False
+        source["hash"] = cached["hash"] if cached["mtime_ns"] == source["mtime_ns"] else content_hash(filename)
+        return cached["hash"] == source["hash"]
+
+    def path(self, name: str) -> str:
+        """Returns the .npy file of a cached select, its index has the extension .json."""
+        return os.path.join(self.folder, f"{name}.npy")
+
+    def read_index(self, name: str) -> dict | None:
+        """Returns the index of a cached select, None if there is none."""
+        try:
+            with open(self.path(name)[:-4] + ".json", "r") as file:
+                return json.load(file)
+        except (OSError, ValueError):
+            return None
+
+    def write_index(self, name: str, index: dict) -> None:
+        """Replaces the index of a cached select atomically."""
+        tmp_path = f"{self.path(name)[:-4]}.json.{os.getpid()}.tmp"
+        with open(tmp_path, "w") as file:
+            json.dump(index, file, indent=4)
+        os.replace(tmp_path, self.path(name)[:-4] + ".json")
+
+    def read_select(self, name: str, index: dict) -> dict:
+        """
+        Maps the matrix of a cached select and splits it into the series of the select.
+
+        Args:
+            name (str): Name of the cached select.
+            index (dict): Its index.
+
+        Returns:
+            dict: The select with read-only, memory-mapped series.
+        """
+        matrix = np.load(self.path(name), mmap_mode="r")
+        fields, n_fields = index["fields"], len(index["fields"])
+        select = {"time": list(range(index["times"])), **dict(zip(fields, matrix))}
+        select["bands"] = {
+            band: {field: (matrix[(1 + 2 * i) * n_fields + j], matrix[(2 + 2 * i) * n_fields + j])
+                   for j, field in enumerate(fields)}
+            for i, band in enumerate(index["bands"])
+        }
+        return select
+
+    def write(self, name: str, select: dict, source: dict) -> None:
+        """
+        Caches a select: the series, then the lower and upper series of every band, as rows of one matrix. The
+        matrix is written before its index, so an index always belongs to a complete matrix.
+
+        Args:
+            name (str): Name of the cached select.
+            select (dict): The select of `create_select_for_plotter`.
+            source (dict): Key of the results, see `file_source`.
+        """
+        fields = [key for key in select if key not in ("time", "bands")]
+        bands = list(select.get("bands", {}))
+        rows = [select[field] for field in fields]
+        for band in bands:
+            rows += [select["bands"][band][field][0] for field in fields]
+            rows += [select["bands"][band][field][1] for field in fields]
+        os.makedirs(self.folder, exist_ok=True)
+        tmp_path = f"{self.path(name)}.{os.getpid()}.tmp"
+        with open(tmp_path, "wb") as file:
+            np.save(file, np.array(rows, dtype=np.float64).reshape(len(rows), len(select["time"])))
+        os.replace(tmp_path, self.path(name))
+        self.write_index(name, {"version": self.VERSION, "settings": self.settings, "code": self.code, "source": source,
+                                "times": len(select["time"]), "fields": fields, "bands": bands})
+
+
+def load_select(filename: str = None, data: list = None) -> dict:
+    """
+    Returns the plotter select of a result file or of results, cached in a `SelectCache` if SELECT_CACHE is set.
+
+    Args:
+        filename (str): The result file.
+        data (list): Results of a game.
+
+    Returns:
+        dict: The select, see `create_select_for_plotter`.
+    """
+    if conf("SELECT_CACHE"):
+        return SelectCache().load(filename=filename, data=data)
+    return Postprocessor(filename=filename, data=data).select
+
+def result_paths(filename: str) -> list[str]:
+    """Returns the files of a result: the file itself, or the manifest and seed files of a .jsonl folder."""
+    if not os.path.isdir(filename):
+        return [filename]
+    with open(os.path.join(filename, "manifest.json"), "r") as file:
+        seeds = json.load(file)["seeds"]
+    return [os.path.join(filename, name) for name in ["manifest.json"] + seeds]
+
+def file_source(filename: str) -> dict:
+    """Returns the path, size and modification time of a result; the content hash is added only when needed."""
+    stats = [os.stat(path) for path in result_paths(filename)]
+    return {"path": os.path.abspath(filename), "size": sum(stat.st_size for stat in stats),
+            "mtime_ns": max(stat.st_mtime_ns for stat in stats), "hash": None}
+
+def content_hash(filename: str, block_size: int = 1 << 20) -> str:
+    """Returns the SHA-256 of the files of a result."""
+    digest = hashlib.sha256()
+    for path in result_paths(filename):
+        with open(path, "rb") as file:
+            for block in iter(lambda: file.read(block_size), b""):
+                digest.update(block)
+    return digest.hexdigest()
+
+def results_hash(results: list) -> str:
+    """Returns the SHA-256 of results in memory."""
+    digest = hashlib.sha256()
+    for result in results:
+        if isinstance(result, StepRecords):
+            digest.update(np.ascontiguousarray(result.steps).tobytes())
+            result = [result.initial]
+        digest.update(json.dumps(result, sort_keys=True, default=lambda value: value.tolist()).encode())
+    return digest.hexdigest()
+
+def hash_text(text: str) -> str:
+    """Returns the first 16 hex digits of the SHA-256 of a text."""
+    return hashlib.sha256(text.encode()).hexdigest()[:16]
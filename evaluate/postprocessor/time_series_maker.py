@@ -1,125 +1,125 @@
 import numpy as np
 from config import conf
+from helper import StepRecords
+from helper.records import dense_matrix
 
 class TimeSeriesMaker:
-    def make_time_series_data(self, data: list[dict], times: int) -> dict:
+    def make_time_series_data(self, data: list[dict] | StepRecords, times: int) -> dict:
         """Create time series data for agents based on the provided (CHANGES-ONLY) conversation data.
 
+        Every value that an agent saves in a conversation is an event (time, value) of one series; the series is the
+        initial value forward-filled with the latest event. All series of all agents are built at once.
+
         Args:
-            data (list[dict]): A list of dictionaries containing only update data from conversations.
+            data (list[dict] | StepRecords): The initial state followed by the update data of every conversation.
+            times (int): Number of time steps (initial state and conversations).
 
         Returns:
             dict: A dictionary containing the time series data for each agent.
         """
-        ts = self.initialise_time_series(times)
-        ts = self.set_agent_start_values(ts, data[0], times)
-
-        for a in conf("agents"):
-            ts = self.update_agent_time_series(ts, a, data)
-        return ts
-
-    def initialise_time_series(self, times: int) -> dict:
-        """Initialize a time series structure for agents.
-
-        Returns:
-            dict: A dictionary initialized with zeros for each agent's time series data.
-        """
+        records = data if isinstance(data, StepRecords) else StepRecords.from_result(data)
+        initial = {int(agent): {**state, "Iothers": dense_matrix(state["Iothers"]), "J": dense_matrix(state["J"])}
+                   for agent, state in records.initial.items()}
         n_agents = conf("n_agents")
-        time_series = {
+        events = self.extract_events(records.steps[:times - 1])
+        agents = np.arange(n_agents)
+
+        series = {
+            "I": self.empty((n_agents, n_agents), times, initial, "I"),
+            "J": self.empty((n_agents, n_agents, n_agents), times, initial, "J"),
+            "friendships": self.empty((n_agents, n_agents), times, initial, "friendships"),
+            "lastK": self.empty((n_agents,), times, initial, "lastK"),
+            "kappa": self.empty((n_agents,), times, initial, "kappa"),
+        }
+        a, partner, topic, t = events["id"], events["partner"], events["topic"], events["t"]
+        has_partner = partner >= 0 # not the speaker of a one_to_all conversation
+        self.set_events(series["I"], (a, a, t), events["Iself"], topic != a)
+        self.set_events(series["I"], (a, partner, t), events["Ipartner"], has_partner & (topic != partner))
+        self.set_events(series["I"], (a, topic, t), events["Itopic"], ~np.isnan(events["Itopic"]))
+        self.set_events(series["J"], (a, a, topic, t), events["Jself"])
+        self.set_events(series["J"], (a, partner, topic, t), events["Jpartner"], has_partner)
+        self.set_events(series["friendships"], (a, partner, t), events["friendships"], ~np.isnan(events["friendships"]))
+        self.set_events(series["lastK"], (a, t), events["lastK"])
+        self.set_events(series["kappa"], (a, t), events["kappa"])
+        filled = {key: self.forward_fill(*values) for key, values in series.items()}
+
+        iothers = np.zeros((n_agents, n_agents, n_agents, times))
+        iothers[..., 0] = [initial[agent]["Iothers"] for agent in agents]
+        return {
             id: {
-                "honesty": np.zeros(times),
-                "I": np.zeros((n_agents, times)),
-                "J": np.zeros((n_agents, n_agents, times)),
-                "Iothers": np.zeros((n_agents, n_agents, times)),
-                "lastK": np.zeros(times),
-                "kappa": np.zeros(times),
-                "friendships": np.zeros((n_agents, times)),
+                "honesty": np.full(times, float(initial[id]["honesty"])),
+                "I": filled["I"][id],
+                "J": filled["J"][id],
+                "Iothers": iothers[id],
+                "lastK": filled["lastK"][id],
+                "kappa": filled["kappa"][id],
+                "friendships": filled["friendships"][id],
             }
             for id in conf("agents")
         }
-        return time_series
 
-    def set_agent_start_values(self, ts: dict, data: dict, times: int) -> dict:
-        """Set initial values for agents based on the first entry of the data.
+    def extract_events(self, steps: np.ndarray) -> dict:
+        """Flattens the records of all conversations into one event per saved agent state.
 
         Args:
-            ts (dict): The time series data structure.
-            data (dict): The first entry of the data containing agent values.
+            steps (np.ndarray): Records of shape (n_steps, slots), see `StepRecords`.
 
         Returns:
-            dict: Updated time series data structure with initial values.
+            dict: Arrays of all record fields and the time step "t" of every saved agent state.
         """
-        is_str_key = isinstance(list(data.keys())[0], str)
-        for a in conf("agents"):
-            a_field = str(a) if is_str_key else a
-            ts[a]["honesty"][:] = [data[a_field]["honesty"]] * times
-            ts[a]["lastK"][0] = data[a_field]["lastK"]
-            ts[a]["kappa"][0] = data[a_field]["kappa"]
-            ts[a]["I"][:, 0] = data[a_field]["I"][:]
-            ts[a]["friendships"][:, 0] = data[a_field]["friendships"][:]
-            ts[a]["J"][:, :, 0] = data[a_field]["J"][:][:]
-            ts[a]["Iothers"][:, :, 0] = data[a_field]["Iothers"][:][:]
-        return ts
-
-    def update_agent_time_series(self, ts: dict, a: int, data: list[dict]) -> dict:
-        """Update the time series data for a specific agent. Either with the value from the previous time step
-        (if they haven't interacted) or - if applicable - with the new one.
+        t = np.repeat(np.arange(1, len(steps) + 1), steps.shape[1])
+        flat = steps.reshape(-1)
+        saved = flat["id"] >= 0
+        events = {field: np.asarray(flat[field][saved]) for field in flat.dtype.names}
+        for field in ("id", "partner", "topic"):
+            events[field] = events[field].astype(np.intp)
+        events["t"] = t[saved]
+        return events
+
+    def empty(self, shape: tuple, times: int, initial: dict, key: str) -> tuple[np.ndarray, np.ndarray]:
+        """Creates the values of series with their initial value at t = 0 and no events yet.
 
         Args:
-            ts (dict): The time series data structure.
-            a (int): The index of the agent to update.
-            data (list[dict]): The list of data entries for the agents.
+            shape (tuple): Shape of the series of all agents without the time axis, starting with the agent.
+            times (int): Number of time steps.
+            initial (dict): Initial state of every agent.
+            key (str): Field of the initial state.
 
         Returns:
-            dict: Updated time series data structure for the agent.
+            tuple[np.ndarray, np.ndarray]: The values and a mask of the time steps that have a value.
         """
-        for t, entry in enumerate(data[1:], start=1):
-            ts = self.carry_forward_values(ts, a, t)
-            is_str_key = isinstance(list(entry.keys())[0], str)
-            a_field = str(a) if is_str_key else a
-            if a_field in entry.keys():
-                ts = self.update_entry_for_agent(ts, a, t, entry[a_field])
-            else:
-                ts[a]["lastK"][t] = ts[a]["lastK"][t-1]
-                ts[a]["kappa"][t] = ts[a]["kappa"][t-1]
-        return ts
-
-    def carry_forward_values(self, ts: dict, a: int, t: int) -> dict:
-        """Carry forward values for an agent at a given time step. (using values from previous time step)
+        values = np.zeros(shape + (times,))
+        is_set = np.zeros(shape + (times,), dtype=bool)
+        values[..., 0] = [initial[agent][key] for agent in range(shape[0])]
+        is_set[..., 0] = True
+        return values, is_set
 
-        Args:
-            ts (dict): The time series data structure.
-            a (int): The index of the agent.
-            t (int): The current time step.
+    def set_events(self, series: tuple[np.ndarray, np.ndarray], index: tuple, values: np.ndarray,
+                   where: np.ndarray = None) -> None:
+        """Writes events into series.
 
-        Returns:
-            dict: Updated time series data structure with carried forward values.
+        Args:
+            series (tuple[np.ndarray, np.ndarray]): The values and the mask of `empty`.
+            index (tuple): Index arrays of the events, the last one is the time step.
+            values (np.ndarray): Value of every event.
+            where (np.ndarray, optional): Mask of the events to write. Defaults to all.
         """
-        ts[a]["I"][:, t] = ts[a]["I"][:, t-1]
-        ts[a]["friendships"][:, t] = ts[a]["friendships"][:, t-1]
-        ts[a]["J"][:, :, t] = ts[a]["J"][:, :, t-1]
-        return ts
+        if where is not None:
+            index, values = tuple(i[where] for i in index), values[where]
+        series[0][index] = values
+        series[1][index] = True
 
-    def update_entry_for_agent(self, ts: dict, agent: int, t: int, entry: dict) -> dict:
-        """Update the time series entry for a specific agent at a given time step.
+    @staticmethod
+    def forward_fill(values: np.ndarray, is_set: np.ndarray) -> np.ndarray:
+        """Replaces every value without an event by the latest value before it along the last (time) axis.
 
         Args:
-            ts (dict): The time series data structure.
-            agent (int): The index of the agent to update.
-            t (int): The current time step.
-            entry (dict): The entry containing update values for the agent.
+            values (np.ndarray): The values.
+            is_set (np.ndarray): Mask of the values that are set; the first time step has to be set.
 
         Returns:
-            dict: Updated time series data structure with new entry values.
+            np.ndarray: The forward-filled values.
         """
-        partner = entry['partner']
-        topic = entry['topic']
-        ts[agent]["I"][agent][t] = entry["Iself"]
-        ts[agent]["I"][partner][t] = entry["Ipartner"]
-        ts[agent]["I"][topic][t] = entry.get("Itopic", ts[agent]["I"][topic][t-1])
-        ts[agent]["J"][agent][topic][t] = entry["Jself"]
-        ts[agent]["J"][partner][topic][t] = entry["Jpartner"]
-        ts[agent]["lastK"][t] = entry["lastK"]
-        ts[agent]["kappa"][t] = entry["kappa"]
-        ts[agent]["friendships"][partner][t] = entry.get("friendships", ts[agent]["friendships"][partner][t-1])
-        return ts
+        last = np.where(is_set, np.arange(values.shape[-1]), 0)
+        np.maximum.accumulate(last, axis=-1, out=last)
+        return np.take_along_axis(values, last, axis=-1)
@@ -1,6 +1,9 @@
-from .help_simulation import make_random_dict
-from .help_main import parse_arguments, save_data_as_json, make_outfile_name
+from .help_simulation import make_random_dict, make_seed_dict
+from .help_main import parse_arguments, save_data_as_json, make_outfile_name, save_results, load_results, \
+    iterate_results, count_results, results_exist, convert_json_results, code_fingerprint
 from .help_agent import character_mapping
 from .help_conversation import draw_max_from_list
 from .run_parallel import launch_parallel
+from .progress import Progress, TaskCosts
+from .records import StepRecords
 from .help_plotter import create_button, create_label, create_select, update_plot
\ No newline at end of file
@@ -1,32 +1,41 @@
 import os
 import json
+import glob
+import hashlib
 import argparse
-from config import conf
+import functools
+from config import conf as default_conf
+from .records import save_records, load_records, iterate_records, count_records
+from .result_stream import save_stream_results, load_stream_results, stream_results_exist, iterate_stream_results, \
+    read_manifest
 
 def parse_arguments():
     """
     Parse command-line arguments for the simulation script.
 
     Returns:
-        argparse.Namespace: Parsed arguments containing flags for run, plot and override.
+        argparse.Namespace: Parsed arguments containing flags for run, plot, override, sweep and convert.
     """
     parser = argparse.ArgumentParser(description="Process some arguments.")
     parser.add_argument('-r', '--run', action='store_true', help='Flag to run the simulation')
     parser.add_argument('-p', '--plot', action='store_true', help='Flag to generate plots')
     parser.add_argument('-pr', '--proc', action='store_true', help='Flag to only postprocess')
     parser.add_argument('-o', '--override', action='store_true', help='Flag to override existing file with same config')
+    parser.add_argument('-s', '--sweep', action='store_true', help='Flag to run the parameter sweep of sweep_dict')
+    parser.add_argument('-c', '--convert', action='store_true', help='Flag to convert JSON result files to .npz')
     return parser.parse_args()
 
-def make_outfile_name(character):
+def make_outfile_name(character, conf=default_conf):
     """
     Generate the output file name based on character configuration and simulation parameters.
     Note that "all" is always set via the config_loader (default: "ordinary")
 
     Args:
         character (dict): Dictionary with {agent_id: character, ...}. The key 'all' may be used as a special case.
+        conf (callable, optional): Configuration of the game. Defaults to config.yml.
 
     Returns:
-        str: The complete file path where the simulation output will be saved.
+        str: The complete file path where the simulation output will be saved, with the extension of RESULT_FORMAT.
     """
     ids = conf("character_ids_dict")
     characters = list(character.values())
@@ -40,7 +49,8 @@ def make_outfile_name(character):
         name = "mix_" + "|".join(f"{int(ids[c]):02d}" for c in sorted({*characters, basis_character}))
 
     suffix = f"_NA={conf('n_agents')}_NR={conf('n_rounds')}_NST={conf('n_stat')}"
-    return os.path.join(conf("folder"), "simulation", name + suffix) + "_sim.json"
+    extension = {"npz": ".npz", "jsonl": ".jsonl"}.get(conf("RESULT_FORMAT"), ".json")
+    return os.path.join(conf("folder"), "simulation", name + suffix) + "_sim" + extension
 
 def save_data_as_json(data, filename):
     """
@@ -52,4 +62,168 @@ def save_data_as_json(data, filename):
     """
     os.makedirs(os.path.dirname(filename), exist_ok=True)
     with open(filename, 'w') as json_file:
-        json.dump(data, json_file, indent=4)
\ No newline at end of file
+        json.dump(data, json_file, indent=4)
+
+def save_results(results, filename, precision="float64"):
+    """
+    Save the results of a game in the format of the file extension: columnar .npz, a .jsonl folder of streamed
+    seed files or JSON.
+
+    Args:
+        results (list): Result of every seed, each a list of dicts or `StepRecords`. In a .jsonl folder, a seed can
+            also be the path of its streamed file.
+        filename (str): The output file name, ending with .npz, .jsonl or .json.
+        precision (str, optional): Precision of the values in an .npz file, see `save_records`. Defaults to "float64".
+    """
+    if filename.endswith(".npz"):
+        save_records(results, filename, precision)
+    elif filename.endswith(".jsonl"):
+        save_stream_results(results, filename)
+    else:
+        save_data_as_json([list(result) for result in results], filename)
+
+def load_results(filename):
+    """
+    Load the results of a game from a columnar .npz file, a .jsonl folder or a JSON file.
+
+    Args:
+        filename (str): The result file.
+
+    Returns:
+        list: Result of every seed, `StepRecords` for .npz files and lists of dicts otherwise.
+    """
+    if filename.endswith(".npz"):
+        return load_records(filename)
+    if filename.endswith(".jsonl"):
+        return load_stream_results(filename)
+    with open(filename, "r") as json_file:
+        return json.load(json_file)
+
+def iterate_results(filename, seeds=None):
+    """
+    Read the results of a game one seed at a time, so only one seed is held in memory.
+
+    JSON files are parsed element by element, the seeds of a .jsonl folder are read from their files and the rows of
+    a seed are read from the memory-mapped columns of an .npz file (see `iterate_records`).
+
+    Args:
+        filename (str): The result file.
+        seeds (list[int], optional): Indices of the seeds to read. Defaults to all.
+
+    Yields:
+        list | StepRecords: The result of every (selected) seed, like the items of `load_results`.
+    """
+    if filename.endswith(".npz"):
+        yield from iterate_records(filename, seeds)
+    elif filename.endswith(".jsonl"):
+        for steps in iterate_stream_results(filename, seeds):
+            yield list(steps)
+    else:
+        selected = None if seeds is None else set(seeds)
+        for seed, result in enumerate(iterate_json_array(filename)):
+            if selected is None or seed in selected:
+                yield result
+
+def count_results(filename):
+    """
+    Count the seeds of a result file without loading them. Only .npz files and .jsonl folders are supported.
+
+    Args:
+        filename (str): The result file.
+
+    Returns:
+        int | None: The number of seeds, None for JSON files.
+    """
+    if filename.endswith(".npz"):
+        return count_records(filename)
+    if filename.endswith(".jsonl"):
+        return read_manifest(filename)["n_stat"]
+    return None
+
+def iterate_json_array(filename, chunk_size=1 << 20):
+    """
+    Parse the elements of a JSON array file one after another.
+
+    Args:
+        filename (str): A file containing one JSON array.
+        chunk_size (int, optional): Minimum number of characters read at once. Defaults to 1 MiB.
+
+    Yields:
+        any: Every element of the array.
+    """
+    decoder = json.JSONDecoder()
+    with open(filename, "r") as json_file:
+        chunk = json_file.read(chunk_size)
+        buffer, end_of_file = chunk.lstrip(), len(chunk) < chunk_size
+        if not buffer.startswith("["):
+            raise json.JSONDecodeError("Expecting a JSON array", buffer, 0)
+        position = 1
+        while True:
+            while position < len(buffer) and buffer[position] in " \t\r\n,":
+                position += 1
+            if position < len(buffer) and buffer[position] == "]":
+                return
+            try:
+                element, end = decoder.raw_decode(buffer, position)
+                if end < len(buffer) or end_of_file: # a number at the end of the buffer may be cut off
+                    position = end
+                    yield element
+                    continue
+            except json.JSONDecodeError:
+                if end_of_file:
+                    raise
+            # the element doesn't fit: read at least as much as it has so far, so it is parsed a bounded number of times
+            chunk = json_file.read(max(chunk_size, 2 * (len(buffer) - position)))
+            buffer, position, end_of_file = buffer[position:] + chunk, 0, not chunk
+
+def results_exist(filename):
+    """
+    Check whether the results of a game were saved. A .jsonl folder only counts once it was finalized.
+
+    Args:
+        filename (str): The result file.
+
+    Returns:
+        bool: True if the results exist.
+    """
+    return stream_results_exist(filename) if filename.endswith(".jsonl") else os.path.exists(filename)
+
+def convert_json_results(filename, precision="float64", remove=False):
+    """
+    Convert a JSON result file into the columnar .npz format.
+
+    Args:
+        filename (str): The JSON result file.
+        precision (str, optional): Precision of the values, see `save_records`. Defaults to "float64".
+        remove (bool, optional): If True, the JSON file is deleted after the conversion. Defaults to False.
+
+    Returns:
+        str: The name of the .npz file.
+    """
+    npz_filename = os.path.splitext(filename)[0] + ".npz"
+    save_records(load_results(filename), npz_filename, precision)
+    if remove:
+        os.remove(filename)
+    return npz_filename
+
+@functools.cache
+def code_fingerprint(patterns=("simulate/**/*.py", "helper/**/*.py")):
+    """
+    Hashes source files, by default those of the packages that play a simulation, so that stored results are not
+    used after the code changes. Computed once per process and tuple of patterns.
+
+    Args:
+        patterns (tuple, optional): Glob patterns of the files, relative to the repository. Defaults to all .py
+            files in simulate/ and helper/.
+
+    Returns:
+        str: The first 16 hex digits of the SHA-256 of the paths and contents of the matched files.
+    """
+    root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    digest = hashlib.sha256()
+    for pattern in patterns:
+        for path in sorted(glob.glob(os.path.join(root, pattern), recursive=True)):
+            digest.update(os.path.relpath(path, root).encode())
+            with open(path, "rb") as file:
+                digest.update(file.read())
+    return digest.hexdigest()[:16]
@@ -1,20 +1,20 @@
 import numpy as np
-from config import conf
+from config import conf as default_conf
+from .random_streams import LegacyStream, GeneratorStream
 
-def make_random_dict(simulation_seed: int) -> dict:
+def make_seed_dict(simulation_seed: int, conf: callable = default_conf) -> dict:
     """
-    Generate a dictionary of seeded random number generators based on the configuration and seed variation.
-    Used throughout the simulation to make "random" decisions.
+    Generate the seed of every random stream of a simulation from the fixed seed and the simulation seed.
 
     Args:
-        config (dict): A dictionary containing the base configuration, including a "seed" value.
         simulation_seed (int): An integer used to vary the seeds for different categories.
+        conf (callable, optional): Configuration to read the fixed seed from. Defaults to config.yml.
 
     Returns:
-        dict: A dictionary where each key corresponds to a specific category, and each value is a seeded `RandomState` object.
+        dict: A dictionary where each key corresponds to a specific category, and each value is its seed.
     """
     fixed_seed = conf("seed")
-    seed_offsets = {
+    return {
         "honesties": fixed_seed,
         "varying_random_honesties": fixed_seed + simulation_seed,
         "fr_affinities": fixed_seed + simulation_seed + 1,
@@ -31,5 +31,24 @@ def make_random_dict(simulation_seed: int) -> dict:
         "flattering": fixed_seed + 10 * simulation_seed + 8,
         "aggressive": fixed_seed + 10 * simulation_seed + 9
     }
-    
-    return {key: np.random.RandomState(seed) for key, seed in seed_offsets.items()}
\ No newline at end of file
+
+def make_random_dict(simulation_seed: int, conf: callable = default_conf) -> dict:
+    """
+    Generate a dictionary of seeded random number generators based on the configuration and seed variation.
+    Used throughout the simulation to make "random" decisions.
+
+    RANDOM_SOURCE selects the generators: "legacy" block-buffered streams with the `RandomState` sequences,
+    "generator" block-buffered `np.random.Generator` streams, or "RandomState" for plain `RandomState` objects.
+
+    Args:
+        simulation_seed (int): An integer used to vary the seeds for different categories.
+        conf (callable, optional): Configuration of the simulation. Defaults to config.yml.
+
+    Returns:
+        dict: A dictionary where each key corresponds to a specific category, and each value is a seeded random stream.
+    """
+    seeds = make_seed_dict(simulation_seed, conf)
+    if conf("RANDOM_SOURCE") == "RandomState":
+        return {key: np.random.RandomState(seed) for key, seed in seeds.items()}
+    stream = GeneratorStream if conf("RANDOM_SOURCE") == "generator" else LegacyStream
+    return {key: stream(seed, conf("RANDOM_BLOCK_SIZE") or 4096) for key, seed in seeds.items()}
@@ -0,0 +1,161 @@
+import os
+import json
+import statistics
+from collections import Counter
+from timeit import default_timer as timer
+
+class Progress:
+    """
+    Reports the progress of parallel tasks per group (e.g. per game) and records the runtime of every task.
+
+    A line with the finished tasks, the throughput and the estimated remaining time of a group is printed when the
+    group is complete and otherwise at most every `interval` seconds.
+
+    Attributes:
+        groups (list): Group of every task, by task index.
+        names (dict): Printed name of every group. Groups without a name are printed as they are.
+        interval (float): Minimum number of seconds between two progress lines.
+        total (Counter): Number of tasks per group.
+        done (Counter): Number of finished tasks per group.
+        runtimes (list): Runtime of every task in seconds, None while it is running.
+    """
+
+    def __init__(self, groups: list, names: dict = None, interval: float = 2.0) -> None:
+        """Starts the clock.
+
+        Args:
+            groups (list): Group of every task, by task index.
+            names (dict, optional): Printed name of every group. Defaults to None.
+            interval (float, optional): Minimum number of seconds between two progress lines. Defaults to 2.0.
+        """
+        self.groups = list(groups)
+        self.names = names or {}
+        self.interval = interval
+        self.total = Counter(self.groups)
+        self.done = Counter()
+        self.runtimes = [None] * len(self.groups)
+        self.start = self.last_print = timer()
+
+    def update(self, index: int, runtime: float) -> None:
+        """
+        Records a finished task and prints the progress of its group if it is due.
+
+        Args:
+            index (int): Index of the task.
+            runtime (float): Runtime of the task in seconds.
+        """
+        group = self.record(index, runtime)
+        now = timer()
+        if self.done[group] == self.total[group] or now - self.last_print >= self.interval:
+            self.last_print = now
+            print(self.report(group, now))
+
+    def record(self, index: int, runtime: float):
+        """
+        Records a finished task without printing.
+
+        Args:
+            index (int): Index of the task.
+            runtime (float): Runtime of the task in seconds.
+
+        Returns:
+            The group of the task.
+        """
+        group = self.groups[index]
+        self.runtimes[index] = runtime
+        self.done[group] += 1
+        return group
+
+    def report(self, group, now: float = None) -> str:
+        """
+        Returns the progress line of a group.
+
+        Throughput and ETA are measured since the start, so a group that waits for the workers behind other groups
+        is estimated conservatively.
+
+        Args:
+            group: The group.
+            now (float, optional): Current time of `timer`. Defaults to now.
+
+        Returns:
+            str: Finished and total tasks, tasks per second and estimated remaining seconds of the group.
+        """
+        elapsed = max((now or timer()) - self.start, 1e-9)
+        done, total = self.done[group], self.total[group]
+        rate = done / elapsed
+        eta = (total - done) / rate if rate else float("inf")
+        return f"{self.names.get(group, group)}: {done}/{total} tasks | {rate:.2f} tasks/s | ETA {eta:.1f}s"
+
+    def stragglers(self, factor: float = 2.0) -> list[int]:
+        """
+        Returns the tasks that took more than `factor` times the median runtime of their group.
+
+        Args:
+            factor (float, optional): Multiple of the median runtime. Defaults to 2.0.
+
+        Returns:
+            list[int]: Indices of the slow tasks, slowest first.
+        """
+        medians = {group: statistics.median(time for g, time in zip(self.groups, self.runtimes)
+                                             if g == group and time is not None)
+                   for group in self.done}
+        slow = [index for index, (group, time) in enumerate(zip(self.groups, self.runtimes))
+                if time is not None and time > factor * medians[group]]
+        return sorted(slow, key=lambda index: -self.runtimes[index])
+
+
+class TaskCosts:
+    """
+    Mean runtime per task of named kinds of tasks (e.g. the seeds of a character setup), kept in a JSON file across runs.
+
+    Attributes:
+        filename (str): The JSON file, None to keep the estimates in memory only.
+        costs (dict): {name: mean runtime in seconds}.
+    """
+
+    def __init__(self, filename: str = None) -> None:
+        """Loads the estimates of previous runs. A missing or unreadable file means no estimates.
+
+        Args:
+            filename (str, optional): The JSON file. Defaults to None.
+        """
+        self.filename = filename
+        try:
+            with open(filename) as file:
+                self.costs = json.load(file)
+        except (TypeError, OSError, ValueError):
+            self.costs = {}
+
+    def estimate(self, names: list) -> list[float]:
+        """
+        Returns the expected runtime of tasks. Unknown names get the mean of the known ones, or 1 if none is known.
+
+        Args:
+            names (list): Name of every task.
+
+        Returns:
+            list[float]: Expected runtime of every task.
+        """
+        default = statistics.mean(self.costs.values()) if self.costs else 1.0
+        return [self.costs.get(name, default) for name in names]
+
+    def update(self, name: str, runtimes: list[float]) -> None:
+        """
+        Replaces the estimate of a name by the mean of new runtimes and saves the file. The estimates of other names
+        are re-read from the file right before it is replaced atomically, so games that finish one after another
+        keep each other's estimates even if they loaded the file at the same time.
+
+        Args:
+            name (str): Name of the tasks.
+            runtimes (list[float]): Their runtimes in seconds.
+        """
+        if not runtimes:
+            return
+        self.costs[name] = statistics.mean(runtimes)
+        if self.filename:
+            self.costs = {**TaskCosts(self.filename).costs, name: self.costs[name]}
+            os.makedirs(os.path.dirname(self.filename) or ".", exist_ok=True)
+            tmp_path = f"{self.filename}.{os.getpid()}.tmp"
+            with open(tmp_path, "w") as file:
+                json.dump(self.costs, file, indent=4, sort_keys=True)
+            os.replace(tmp_path, self.filename)
@@ -0,0 +1,156 @@
+import math
+import numbers
+import numpy as np
+
+TWO_POW_26, TWO_POW_53 = 67108864.0, 9007199254740992.0
+
+
+class LegacyStream:
+    """
+    Block-buffered drop-in for `np.random.RandomState` that reproduces its sequences bit for bit ("legacy" RANDOM_SOURCE).
+
+    The raw 32-bit words of the Mersenne Twister are drawn in blocks; draws are served from the buffer like the legacy
+    C code consumes them: a uniform from two words, a choice by masked rejection sampling on single words and an
+    exponential as -log(1 - U). For every pair of neighbouring words the uniform is precomputed, so a scalar draw is
+    a list lookup instead of a NumPy call.
+
+    Attributes:
+        state (np.random.RandomState): Source of the raw words.
+        block_size (int): Number of words drawn at once.
+        words (list[int]): Buffered words.
+        uniforms (list[float]): Uniform built from words[i] and words[i + 1] for every i.
+        position (int): Index of the next unused word.
+    """
+
+    def __init__(self, seed: int, block_size: int = 4096) -> None:
+        """Seeds the stream like `np.random.RandomState(seed)`.
+
+        Args:
+            seed (int): Seed of the stream.
+            block_size (int, optional): Number of words drawn at once. Defaults to 4096.
+        """
+        self.state = np.random.RandomState(seed)
+        self.block_size = block_size
+        self.words, self.uniforms, self.position = [], [], 0
+
+    def refill(self, n_words: int) -> None:
+        """Makes sure that at least `n_words` unused words are buffered."""
+        if self.position + n_words <= len(self.words):
+            return
+        new_words = self.state.randint(0, 2 ** 32, size=max(self.block_size, n_words), dtype=np.uint32)
+        words = np.concatenate([np.array(self.words[self.position:], dtype=np.uint64), new_words.astype(np.uint64)])
+        self.words, self.position = words.tolist(), 0
+        self.uniforms = (((words[:-1] >> 5) * TWO_POW_26 + (words[1:] >> 6)) / TWO_POW_53).tolist()
+
+    def uniform(self, size: int = None) -> float | np.ndarray:
+        """Draws uniforms in [0, 1) like `RandomState.uniform()`."""
+        if size is not None:
+            self.refill(2 * size)
+            values = np.array(self.uniforms[self.position:self.position + 2 * size:2])
+            self.position += 2 * size
+            return values
+        if self.position + 2 > len(self.words):
+            self.refill(2)
+        self.position += 2
+        return self.uniforms[self.position - 2]
+
+    def randint(self, low: int, high: int = None, size: int = None) -> int | np.ndarray:
+        """Draws integers in [low, high) like `RandomState.randint` (or [0, low) if high is None)."""
+        low, high = (0, low) if high is None else (low, high)
+        rng = int(high - low - 1)
+        if rng == 0:
+            return low if size is None else np.full(size, low)
+        mask = (1 << rng.bit_length()) - 1
+        if size is None:
+            while True:
+                self.refill(1)
+                value = self.words[self.position] & mask
+                self.position += 1
+                if value <= rng:
+                    return low + value
+
+        values = []
+        while len(values) < size:
+            self.refill(2 * (size - len(values)))
+            words = np.array(self.words[self.position:], dtype=np.uint64) & mask
+            accepted = np.flatnonzero(words <= rng)[:size - len(values)]
+            values.extend(words[accepted].tolist())
+            self.position += int(accepted[-1]) + 1 if len(values) == size else len(words)
+        return low + np.array(values, dtype=np.int64)
+
+    def choice(self, a):
+        """Draws an element of `a` (or of range(a) if `a` is an int) like `RandomState.choice(a)`."""
+        if isinstance(a, numbers.Integral):
+            return self.randint(a)
+        return a[self.randint(len(a))]
+
+    def standard_exponential(self, size: int = None) -> float | np.ndarray:
+        """Draws standard exponentials as -log(1 - U) like the legacy `RandomState.standard_exponential`."""
+        if size is not None:
+            return np.array([-math.log(1.0 - u) for u in self.uniform(size).tolist()])
+        return -math.log(1.0 - self.uniform())
+
+    def exponential(self, scale: float = 1.0) -> float:
+        """Draws an exponential with the given scale like `RandomState.exponential(scale)`."""
+        return scale * -math.log(1.0 - self.uniform())
+
+
+class GeneratorStream:
+    """
+    Block-buffered random stream based on `np.random.Generator` ("generator" RANDOM_SOURCE).
+
+    Uniforms are drawn in blocks by the Generator and served from a list; choices and exponentials are derived from
+    a single uniform each. The sequences differ from `RandomState`, so results are statistically but not bitwise
+    equivalent to the "legacy" source.
+
+    Attributes:
+        generator (np.random.Generator): Source of the uniforms.
+        block_size (int): Number of uniforms drawn at once.
+        values (list[float]): Buffered uniforms.
+        position (int): Index of the next unused uniform.
+    """
+
+    def __init__(self, seed: int, block_size: int = 4096) -> None:
+        """Seeds the Generator.
+
+        Args:
+            seed (int): Seed of the stream.
+            block_size (int, optional): Number of uniforms drawn at once. Defaults to 4096.
+        """
+        self.generator = np.random.default_rng(seed)
+        self.block_size = block_size
+        self.values, self.position = [], 0
+
+    def uniform(self, size: int = None) -> float | np.ndarray:
+        """Draws uniforms in [0, 1)."""
+        if size is not None:
+            values = np.array(self.values[self.position:self.position + size])
+            self.position += len(values)
+            return np.concatenate([values, self.generator.random(size - len(values))])
+        if self.position == len(self.values):
+            self.values, self.position = self.generator.random(self.block_size).tolist(), 0
+        self.position += 1
+        return self.values[self.position - 1]
+
+    def randint(self, low: int, high: int = None, size: int = None) -> int | np.ndarray:
+        """Draws integers in [low, high) (or [0, low) if high is None)."""
+        low, high = (0, low) if high is None else (low, high)
+        if size is not None:
+            return low + (self.uniform(size) * (high - low)).astype(np.int64)
+        return low + int(self.uniform() * (high - low))
+
+    def choice(self, a):
+        """Draws an element of `a` (or of range(a) if `a` is an int)."""
+        if isinstance(a, numbers.Integral):
+            return self.randint(a)
+        return a[int(self.uniform() * len(a))]
+
+    def standard_exponential(self, size: int = None) -> float | np.ndarray:
+        """Draws standard exponentials."""
+        if size is not None:
+            return -np.log1p(-self.uniform(size))
+        return -math.log(1.0 - self.uniform())
+
+    def exponential(self, scale: float = 1.0) -> float:
+        """Draws an exponential with the given scale."""
+        return scale * -math.log(1.0 - self.uniform())
@@ -0,0 +1,358 @@
+import os
+import json
+import uuid
+import struct
+import zipfile
+import tempfile
+import numpy as np
+from collections.abc import Sequence
+
+VALUE_FIELDS = ("Iself", "Ipartner", "Iothers", "Jself", "Jpartner", "lastK", "kappa")
+OPTIONAL_FIELDS = ("friendships", "Itopic") # only saved in some conversations, NaN in the other records
+RECORD_DTYPE = np.dtype([("id", np.int16), ("topic", np.int16), ("partner", np.int16)]
+                        + [(field, np.float64) for field in VALUE_FIELDS + OPTIONAL_FIELDS])
+SLOTS = 2 # agents saved per one_to_one conversation (speaker and listener), one_to_all saves all agents
+ROUNDED_FIELDS = ("Iself", "Ipartner", "Iothers", "Jself", "Jpartner") # rounded to 3 decimals by `Info.round_mean`
+FORMAT_VERSION = 1 # version of the columnar result files
+QUANTIZED_NAN = np.iinfo(np.uint16).max # "quantized" value of a field that is NaN, i.e. not saved by the agent
+
+
+class StepRecords(Sequence):
+    """
+    Result of a simulation as one typed array instead of a list of dicts.
+
+    Every conversation (step) has a slot for every saved agent with the fields of `StateSaver.save_state`: SLOTS for
+    the speaker and the listener of one_to_one conversations, one per agent if there are one_to_all conversations
+    (see `count_slots`). An empty slot has the id -1, fields an agent doesn't save are NaN. The records behave like
+    the list of `Simulation.play`: item 0 is the initial state and item t the dict of the changes of conversation t,
+    built when it is accessed.
+    Records can live in a memory-mapped file, so a worker can write them and the parent read them without pickling.
+
+    Attributes:
+        initial (dict): Initial state of every agent.
+        steps (np.ndarray): Records of shape (n_steps, slots) with RECORD_DTYPE.
+        path (str): File of a memory-mapped record array, otherwise None.
+    """
+
+    def __init__(self, initial: dict, steps: np.ndarray, path: str = None) -> None:
+        """Wraps an initial state and a record array.
+
+        Args:
+            initial (dict): Initial state of every agent.
+            steps (np.ndarray): Records of shape (n_steps, slots) with RECORD_DTYPE.
+            path (str, optional): File of the memory-mapped records. Defaults to None.
+        """
+        self.initial = initial
+        self.steps = steps
+        self.path = path
+
+    @classmethod
+    def allocate(cls, initial: dict, n_steps: int, path: str = None, slots: int = SLOTS) -> "StepRecords":
+        """
+        Creates empty records for `n_steps` conversations.
+
+        Args:
+            initial (dict): Initial state of every agent.
+            n_steps (int): Number of conversations.
+            path (str, optional): If given, the records are a memory-mapped .npy file at this path. Defaults to None.
+            slots (int, optional): Agents saved per conversation, see `count_slots`. Defaults to SLOTS.
+
+        Returns:
+            StepRecords: Records with empty slots.
+        """
+        shape = (n_steps, slots)
+        steps = np.lib.format.open_memmap(path, "w+", RECORD_DTYPE, shape) if path else np.zeros(shape, RECORD_DTYPE)
+        steps["id"] = -1
+        return cls(initial, steps, path)
+
+    @classmethod
+    def from_result(cls, result: list[dict]) -> "StepRecords":
+        """
+        Converts the result of `Simulation.play` into records.
+
+        Args:
+            result (list[dict]): The initial state followed by the changes of every conversation.
+
+        Returns:
+            StepRecords: The same result as records.
+        """
+        records = cls.allocate(result[0], len(result) - 1, slots=max([SLOTS] + [len(entry) for entry in result[1:]]))
+        for t, entry in enumerate(result[1:], start=1):
+            records.write(t, entry)
+        return records
+
+    def write(self, t: int, entry: dict) -> None:
+        """
+        Saves the changes of conversation t.
+
+        Args:
+            t (int): Index of the conversation, starting at 1 like in the result list.
+            entry (dict): {agent: state} as returned by `Conversation.run_conversation_protocol`.
+        """
+        for slot, state in enumerate(entry.values()):
+            self.steps[t - 1, slot] = (state["id"], state["topic"], state["partner"],
+                                       *(state.get(field, np.nan) for field in VALUE_FIELDS + OPTIONAL_FIELDS))
+
+    def step(self, t: int) -> dict:
+        """
+        Builds the dict of conversation t like `StateSaver.save_state`.
+
+        Args:
+            t (int): Index of the conversation, starting at 1.
+
+        Returns:
+            dict: {agent: state} of the agents saved in this conversation.
+        """
+        entry = {}
+        for agent, topic, partner, *values in self.steps[t - 1].tolist():
+            if agent < 0:
+                continue
+            state = {"topic": topic, "partner": partner, "id": agent}
+            state.update({field: value for field, value in zip(VALUE_FIELDS + OPTIONAL_FIELDS, values) if value == value})
+            entry[agent] = state
+        return entry
+
+    def __len__(self) -> int:
+        return len(self.steps) + 1
+
+    def __getitem__(self, index: int | slice) -> dict | list[dict]:
+        if isinstance(index, slice):
+            return [self[t] for t in range(*index.indices(len(self)))]
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError("step index out of range")
+        return self.initial if index == 0 else self.step(index)
+
+    def __eq__(self, other: object) -> bool:
+        if not isinstance(other, Sequence):
+            return NotImplemented
+        return len(self) == len(other) and all(a == b for a, b in zip(self, other))
+
+    def __getstate__(self) -> dict:
+        """Pickles the records as an in-memory array, also if they are memory-mapped."""
+        return {"initial": self.initial, "steps": np.array(self.steps), "path": None}
+
+    def descriptor(self) -> dict:
+        """
+        Returns what a worker sends back instead of the records: their file and the initial state.
+
+        The records are flushed to the file first.
+
+        Returns:
+            dict: "path" and "initial" for `StepRecords.attach`.
+        """
+        self.steps.flush()
+        return {"path": self.path, "initial": self.initial}
+
+    @classmethod
+    def attach(cls, descriptor: dict) -> "StepRecords":
+        """
+        Maps the records of a `descriptor` without copying them. The file is removed right away, its memory is
+        freed as soon as the records are no longer used.
+
+        Args:
+            descriptor (dict): Output of `StepRecords.descriptor`.
+
+        Returns:
+            StepRecords: The read-only records.
+        """
+        steps = np.load(descriptor["path"], mmap_mode="r")
+        os.remove(descriptor["path"])
+        return cls(descriptor["initial"], steps)
+
+
+def dense_matrix(matrix: list[list] | dict) -> list[list]:
+    """
+    Returns a matrix of an initial state (Iothers or J) as nested lists.
+
+    The "sparse" MIND_BACKEND saves these n x n matrices as {"size": n, "default": mean, "entries": [[row, column,
+    mean], ...]}, all entries that are not listed have the default mean.
+
+    Args:
+        matrix (list[list] | dict): The matrix as nested lists or in the sparse format.
+
+    Returns:
+        list[list]: The matrix as nested lists.
+    """
+    if not isinstance(matrix, dict):
+        return matrix
+    dense = [[matrix["default"]] * matrix["size"] for _ in range(matrix["size"])]
+    for row, column, value in matrix["entries"]:
+        dense[row][column] = value
+    return dense
+
+def count_slots(n_agents: int, p_one_to_one: float) -> int:
+    """
+    Returns the number of agents saved per conversation: SLOTS if all conversations are one_to_one, otherwise one
+    per agent, for the speaker and all listeners of a one_to_all conversation.
+
+    Args:
+        n_agents (int): Number of agents.
+        p_one_to_one (float): Fraction of one_to_one conversations.
+
+    Returns:
+        int: Slots per conversation of the records.
+    """
+    return SLOTS if p_one_to_one == 1 else max(SLOTS, n_agents)
+
+def pad_slots(steps: np.ndarray, slots: int) -> np.ndarray:
+    """Returns records with `slots` slots per conversation, the added ones are empty."""
+    if steps.shape[1] == slots:
+        return steps
+    padded = np.zeros((len(steps), slots), RECORD_DTYPE)
+    padded["id"] = -1
+    padded[:, :steps.shape[1]] = steps
+    return padded
+
+def make_transfer_path(folder: str = None) -> str:
+    """
+    Returns a new file name for memory-mapped records.
+
+    Args:
+        folder (str, optional): Folder of the file. Defaults to /dev/shm (memory only) if it exists, otherwise the
+            temporary folder.
+
+    Returns:
+        str: Path of a .npy file that doesn't exist yet.
+    """
+    folder = folder or ("/dev/shm" if os.path.isdir("/dev/shm") else tempfile.gettempdir())
+    os.makedirs(folder, exist_ok=True)
+    return os.path.join(folder, f"records_{uuid.uuid4().hex}.npy")
+
+
+def save_records(results: list, filename: str, precision: str = "float64") -> None:
+    """
+    Saves the results of all seeds of a game as columns of typed arrays in an .npz file.
+
+    Every field of the records is one array of shape (n_stat, n_steps, slots), seeds with fewer slots are padded with
+    empty ones; the initial states and the format are
+    in a JSON header. The arrays are stored uncompressed, so that `load_records` can map them and read single seeds. The precision of the values is one of
+    - "float64": exact.
+    - "float32": half the size, values are rounded to single precision.
+    - "quantized": the fields rounded to 3 decimals are stored as uint16 thousandths, the others as float32.
+      Dividing by 1000 on loading gives back the rounded values exactly. Missing (NaN) values are stored as
+      QUANTIZED_NAN.
+
+    Args:
+        results (list): Result of every seed, each a list of dicts or `StepRecords`.
+        filename (str): The .npz file.
+        precision (str, optional): "float64", "float32" or "quantized". Defaults to "float64".
+    """
+    records = [result if isinstance(result, StepRecords) else StepRecords.from_result(result) for result in results]
+    slots = max(result.steps.shape[1] for result in records)
+    steps = np.stack([pad_slots(result.steps, slots) for result in records])
+    columns = {field: steps[field] for field in ("id", "topic", "partner")}
+    scales = {}
+    for field in VALUE_FIELDS + OPTIONAL_FIELDS:
+        if precision == "quantized" and field in ROUNDED_FIELDS:
+            thousandths = steps[field] * 1000
+            columns[field] = np.where(np.isnan(thousandths), QUANTIZED_NAN, np.rint(thousandths)).astype(np.uint16)
+            scales[field] = 1000
+        else:
+            columns[field] = steps[field].astype(np.float64 if precision == "float64" else np.float32)
+    header = {
+        "version": FORMAT_VERSION, "precision": precision, "scales": scales,
+        "initial": [result.initial for result in records]
+    }
+    os.makedirs(os.path.dirname(filename) or ".", exist_ok=True)
+    np.savez(filename, header=np.array(json.dumps(header, default=lambda value: value.tolist())), **columns)
+
+def load_records(filename: str, seeds: list[int] = None) -> list[StepRecords]:
+    """
+    Loads the results of a game from an .npz file of `save_records`.
+
+    The columns are memory-mapped (see `map_column`), so only the rows of the selected seeds are read and a worker
+    that loads a chunk of seeds doesn't hold the whole file.
+
+    Args:
+        filename (str): The .npz file.
+        seeds (list[int], optional): Indices of the seeds to load. Defaults to all.
+
+    Returns:
+        list[StepRecords]: Result of every (selected) seed, with float64 values.
+    """
+    header = read_header(filename)
+    seeds = list(range(len(header["initial"]))) if seeds is None else list(seeds)
+    return select_records(header, {field: map_column(filename, field) for field in RECORD_DTYPE.names}, seeds)
+
+def iterate_records(filename: str, seeds: list[int] = None):
+    """
+    Reads the results of a game from an .npz file of `save_records` one seed at a time.
+
+    The header is read and the columns are mapped once, then only the rows of one seed are read per iteration.
+
+    Args:
+        filename (str): The .npz file.
+        seeds (list[int], optional): Indices of the seeds to read. Defaults to all.
+
+    Yields:
+        StepRecords: Result of every (selected) seed, with float64 values.
+    """
+    header = read_header(filename)
+    columns = {field: map_column(filename, field) for field in RECORD_DTYPE.names}
+    for seed in range(len(header["initial"])) if seeds is None else seeds:
+        yield select_records(header, columns, [seed])[0]
+
+def read_header(filename: str) -> dict:
+    """Returns the JSON header of an .npz file of `save_records`."""
+    with np.load(filename) as file:
+        return json.loads(file["header"].item())
+
+def select_records(header: dict, columns: dict, seeds: list[int]) -> list[StepRecords]:
+    """
+    Builds the records of some seeds from the columns of an .npz file of `save_records`.
+
+    Args:
+        header (dict): The header of the file.
+        columns (dict): The array of every field of RECORD_DTYPE, e.g. from `map_column`.
+        seeds (list[int]): Indices of the seeds.
+
+    Returns:
+        list[StepRecords]: Result of every seed, with float64 values.
+    """
+    steps = None
+    for field in RECORD_DTYPE.names:
+        column = columns[field][seeds]
+        if steps is None:
+            steps = np.empty(column.shape, RECORD_DTYPE)
+        if field in header["scales"]:
+            steps[field] = np.where(column == QUANTIZED_NAN, np.nan, column / header["scales"][field])
+        else:
+            steps[field] = column
+    return [StepRecords({int(agent): state for agent, state in header["initial"][seed].items()}, seed_steps)
+            for seed, seed_steps in zip(seeds, steps)]
+
+def map_column(filename: str, field: str) -> np.ndarray:
+    """
+    Maps the array of a field in an .npz file without reading it.
+
+    `np.load` ignores `mmap_mode` for .npz files and reads a whole member when it is accessed. The members written by
+    `save_records` are stored uncompressed, so the .npy data of a member is mapped at its offset in the file instead.
+    Compressed members are read as usual.
+
+    Args:
+        filename (str): The .npz file.
+        field (str): Name of the array.
+
+    Returns:
+        np.ndarray: The read-only, memory-mapped array.
+    """
+    with zipfile.ZipFile(filename) as archive:
+        info = archive.getinfo(f"{field}.npy")
+    if info.compress_type != zipfile.ZIP_STORED:
+        with np.load(filename) as file:
+            return file[field]
+    with open(filename, "rb") as file:
+        file.seek(info.header_offset + 26) # lengths of the name and the extra field in the local file header
+        name_length, extra_length = struct.unpack("<HH", file.read(4))
+        file.seek(info.header_offset + 30 + name_length + extra_length)
+        version = np.lib.format.read_magic(file)
+        read_header = np.lib.format.read_array_header_1_0 if version == (1, 0) else np.lib.format.read_array_header_2_0
+        shape, fortran_order, dtype = read_header(file)
+        offset = file.tell()
+    return np.memmap(filename, dtype, "r", offset, shape, "F" if fortran_order else "C")
+
+def count_records(filename: str) -> int:
+    """Returns the number of seeds in an .npz file of `save_records`."""
+    return len(read_header(filename)["initial"])
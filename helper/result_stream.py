@@ -0,0 +1,141 @@
+import os
+import json
+from typing import Iterator
+
+STREAM_VERSION = 1 # version of the manifest of streamed results
+BUFFER_SIZE = 1 << 20 # bytes buffered by a `StepWriter` before they are written to the file
+
+
+class StepWriter:
+    """
+    Writes the states of one simulation to a line-delimited JSON file while it is played, one line per step.
+
+    Lines go through a buffered file that is named `path` only when the writer is closed, so a seed file either is
+    complete or doesn't exist.
+
+    Attributes:
+        path (str): The seed file.
+        tmp_path (str): The file while it is written.
+        n_lines (int): Number of written lines.
+    """
+
+    def __init__(self, path: str, buffer_size: int = BUFFER_SIZE) -> None:
+        """Opens the temporary file.
+
+        Args:
+            path (str): The seed file.
+            buffer_size (int, optional): Bytes buffered before writing. Defaults to BUFFER_SIZE.
+        """
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        self.path = path
+        self.tmp_path = f"{path}.{os.getpid()}.tmp"
+        self.file = open(self.tmp_path, "w", buffering=buffer_size)
+        self.n_lines = 0
+
+    def write(self, entry: dict) -> None:
+        """Appends the initial state or the changes of a conversation as one line."""
+        self.file.write(json.dumps(entry, default=lambda value: value.tolist()) + "\n")
+        self.n_lines += 1
+
+    def close(self) -> None:
+        """Flushes the buffer and moves the complete file to its name."""
+        self.file.close()
+        os.replace(self.tmp_path, self.path)
+
+    def __enter__(self) -> "StepWriter":
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback) -> None:
+        if exc_type is None:
+            self.close()
+        else:
+            self.file.close()
+            os.remove(self.tmp_path)
+
+
+def read_steps(path: str) -> Iterator[dict]:
+    """
+    Reads a seed file of `StepWriter` line by line.
+
+    Args:
+        path (str): The seed file.
+
+    Yields:
+        dict: The initial state, then the changes of every conversation, with agent ids as int keys.
+    """
+    with open(path, "r") as file:
+        for line in file:
+            yield {int(agent): state for agent, state in json.loads(line).items()}
+
+def seed_file(folder: str, seed: int) -> str:
+    """Returns the file of a seed in a folder of streamed results."""
+    return os.path.join(folder, f"seed_{seed}.jsonl")
+
+def save_stream_results(results: list, folder: str) -> None:
+    """
+    Finalizes a folder of streamed results: writes the seeds that aren't streamed yet and then the manifest.
+
+    The manifest is replaced atomically, so the folder counts as complete (see `stream_results_exist`) only when
+    every seed file is written.
+
+    Args:
+        results (list): Result of every seed: the path of its streamed file, or a list of dicts or `StepRecords`.
+        folder (str): The folder of the results.
+    """
+    files = []
+    for seed, result in enumerate(results):
+        path = result if isinstance(result, str) else seed_file(folder, seed)
+        if not isinstance(result, str):
+            with StepWriter(path) as writer:
+                for entry in result:
+                    writer.write(entry)
+        files.append(os.path.relpath(path, folder))
+
+    manifest = {"format": "jsonl", "version": STREAM_VERSION, "n_stat": len(files), "seeds": files}
+    tmp_path = os.path.join(folder, f"manifest.json.{os.getpid()}.tmp")
+    with open(tmp_path, "w") as file:
+        json.dump(manifest, file, indent=4)
+    os.replace(tmp_path, os.path.join(folder, "manifest.json"))
+
+def stream_results_exist(folder: str) -> bool:
+    """Returns True if a folder of streamed results was finalized."""
+    return os.path.exists(os.path.join(folder, "manifest.json"))
+
+def discard_manifest(folder: str) -> None:
+    """Marks a folder of streamed results as incomplete before its seeds are (re)written, see `stream_results_exist`."""
+    try:
+        os.remove(os.path.join(folder, "manifest.json"))
+    except FileNotFoundError:
+        pass
+
+def read_manifest(folder: str) -> dict:
+    """Returns the manifest of a finalized folder of streamed results."""
+    with open(os.path.join(folder, "manifest.json"), "r") as file:
+        return json.load(file)
+
+def iterate_stream_results(folder: str, seeds: list[int] = None) -> Iterator[Iterator[dict]]:
+    """
+    Reads the seeds of a finalized folder one after another, without holding more than one step in memory.
+
+    Args:
+        folder (str): The folder of the results.
+        seeds (list[int], optional): Indices of the seeds to read. Defaults to all.
+
+    Yields:
+        Iterator[dict]: The steps of every (selected) seed, see `read_steps`.
+    """
+    names = read_manifest(folder)["seeds"]
+    for seed in range(len(names)) if seeds is None else seeds:
+        yield read_steps(os.path.join(folder, names[seed]))
+
+def load_stream_results(folder: str) -> list[list[dict]]:
+    """
+    Loads all seeds of a finalized folder of streamed results.
+
+    Args:
+        folder (str): The folder of the results.
+
+    Returns:
+        list[list[dict]]: Result of every seed.
+    """
+    return [list(steps) for steps in iterate_stream_results(folder)]
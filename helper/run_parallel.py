@@ -1,21 +1,43 @@
+import os
+import atexit
+import multiprocess
+from timeit import default_timer as timer
 from pathos.multiprocessing import ProcessingPool as Pool
 from itertools import islice
+from .progress import Progress
 
-def launch_parallel(tasks: list, task_fn) -> list:
+POOL, POOL_SETUP = None, None # worker pool of the process and its (n_cores, initializer), reused by every launch
+
+def launch_parallel(tasks: list, task_fn, initializer=None, dynamic: bool = False, costs: list = None,
+                    progress: Progress = None) -> list:
     """Launch tasks in parallel using multiple cores.
 
+    The static mode splits the tasks into equally sized batches and blocks until all of them are done. The dynamic
+    mode hands shrinking batches out to whichever worker is free (see `guided_batches`), so slow tasks don't leave
+    cores idle at the end, and reports every finished task to `progress`.
+
     Args:
         tasks (list): A list of tasks to be processed.
         task_fn: A function that defines the task to be executed on each item.
+        initializer (callable, optional): Run once in every worker when the pool is started, e.g. to compile
+            kernels. Defaults to None.
+        dynamic (bool, optional): If True, tasks are scheduled dynamically. Defaults to False.
+        costs (list, optional): Expected relative runtime of every task, used by the dynamic mode to start the
+            longest tasks first and to size the batches. Defaults to equal costs.
+        progress (Progress, optional): Receives the runtime of every task in the dynamic mode. Defaults to None.
 
     Returns:
-        list: A list of results from the processed tasks.
+        list: A list of results from the processed tasks, in the order of `tasks`.
     """
-    n_cores = int(Pool().ncpus)
+    n_cores = os.cpu_count()
+    pool = get_pool(n_cores, initializer)
+    if dynamic:
+        return run_dynamic(tasks, task_fn, pool, guided_batches(costs or [1.0] * len(tasks), n_cores), progress)
+
     batch_size = max(1, len(tasks) // (n_cores * 2))
     batches = batch_tasks(tasks, batch_size)
     
-    return run_parallel(batches, task_fn, n_cores)
+    return run_parallel(batches, task_fn, pool)
 
 def batch_tasks(tasks: list, batch_size: int) -> list[list]:
     """Divide tasks into batches of specified size.
@@ -30,21 +52,102 @@ def batch_tasks(tasks: list, batch_size: int) -> list[list]:
     it = iter(tasks)
     return [list(islice(it, batch_size)) for _ in range(0, len(tasks), batch_size)]
 
-def run_parallel(batches: list, task_fn, n_cores: int) -> list:
+def run_parallel(batches: list, task_fn, pool: Pool) -> list:
     """Execute batches of tasks in parallel.
 
     Args:
         batches (list): A list of batches, each containing tasks.
         task_fn: A function that defines the task to be executed on each item.
-        n_cores (int): The number of CPU cores to use for parallel processing.
+        pool (Pool): The worker pool.
 
     Returns:
         list: A flattened list of results from all processed batches.
     """
-    with Pool(n_cores) as pool:
-        results = pool.map(process_batch, batches, [task_fn] * len(batches))
+    results = pool.map(process_batch, batches, [task_fn] * len(batches))
     return [item for sublist in results for item in sublist]
 
+def guided_batches(costs: list, n_cores: int) -> list[list[int]]:
+    """Divide task indices into batches that shrink towards the end (guided scheduling).
+
+    Tasks are sorted by decreasing cost and every batch takes about 1 / (2 * n_cores) of the remaining cost, so the
+    first batches are large enough to keep the overhead low and the last ones small enough to even out the load.
+
+    Args:
+        costs (list): Expected relative runtime of every task.
+        n_cores (int): Number of workers.
+
+    Returns:
+        list[list[int]]: Batches of task indices, in the order they are handed out.
+    """
+    remaining = float(sum(costs))
+    batches, batch, batch_cost = [], [], 0.0
+    for index in sorted(range(len(costs)), key=lambda index: -costs[index]):
+        batch.append(index)
+        batch_cost += costs[index]
+        if batch_cost >= remaining / (n_cores * 2):
+            batches.append(batch)
+            remaining -= batch_cost
+            batch, batch_cost = [], 0.0
+    return batches + [batch] if batch else batches
+
+def run_dynamic(tasks: list, task_fn, pool: Pool, batches: list[list[int]], progress: Progress = None) -> list:
+    """Execute batches of task indices in parallel, each one on the next free worker, and collect results as they come.
+
+    Args:
+        tasks (list): A list of tasks to be processed.
+        task_fn: A function that defines the task to be executed on each item.
+        pool (Pool): The worker pool.
+        batches (list[list[int]]): Batches of task indices.
+        progress (Progress, optional): Receives the runtime of every task. Defaults to None.
+
+    Returns:
+        list: A list of results from the processed tasks, in the order of `tasks`.
+    """
+    results = [None] * len(tasks)
+    indexed_batches = [[(index, tasks[index]) for index in batch] for batch in batches]
+    for batch_results in pool.uimap(process_timed_batch, indexed_batches, [task_fn] * len(batches)):
+        for index, result, runtime in batch_results:
+            results[index] = result
+            if progress is not None:
+                progress.update(index, runtime)
+    return results
+
+def get_pool(n_cores: int, initializer=None) -> Pool:
+    """Returns the persistent worker pool. It is closed when the process exits.
+
+    Keeping the workers alive across launches saves their startup (imports and JIT compilation) for every game.
+    A new pool is started on first use and whenever `n_cores` or `initializer` differ from the running pool. Tasks
+    without an initializer run in any running pool.
+    Workers are spawned instead of forked: a fork of a process that has already started JAX threads can
+    deadlock as soon as the worker uses JAX.
+
+    Args:
+        n_cores (int): Number of workers.
+        initializer (callable, optional): Run once in every new worker. Defaults to None.
+
+    Returns:
+        Pool: The worker pool.
+    """
+    global POOL, POOL_SETUP
+    if POOL is not None and POOL_SETUP != (n_cores, initializer or POOL_SETUP[1]):
+        close_pool()
+    if POOL is None:
+        kwargs = {"initializer": initializer} if initializer else {}
+        POOL = Pool(n_cores, context=multiprocess.get_context("spawn"), **kwargs)
+        POOL_SETUP = (n_cores, initializer)
+    return POOL
+
+def close_pool() -> None:
+    """Shuts the persistent worker pool down."""
+    global POOL, POOL_SETUP
+    if POOL is not None:
+        POOL.close()
+        POOL.join()
+        POOL.clear()
+        POOL, POOL_SETUP = None, None
+
+atexit.register(close_pool)
+
 def process_batch(batch: list, task_fn) -> list:
     """Process a single batch of tasks using the specified function. Feed multiple tasks at once to a core.
 
@@ -56,3 +159,20 @@ def process_batch(batch: list, task_fn) -> list:
         list: A list of results from processing the batch.
     """
     return [task_fn(item) for item in batch]
+
+def process_timed_batch(batch: list[tuple], task_fn) -> list[tuple]:
+    """Process a batch of (index, task) pairs and measure the runtime of every task.
+
+    Args:
+        batch (list[tuple]): Index and task of every item of the batch.
+        task_fn: A function that defines the task to be executed on each item.
+
+    Returns:
+        list[tuple]: Index, result and runtime in seconds of every task.
+    """
+    timed = []
+    for index, task in batch:
+        start = timer()
+        result = task_fn(task)
+        timed.append((index, result, timer() - start))
+    return timed
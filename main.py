@@ -1,7 +1,7 @@
 import os
 from timeit import default_timer as timer
-from helper import parse_arguments
-from simulate import Game
+from helper import parse_arguments, convert_json_results, make_outfile_name
+from simulate import Game, Sweep, run_games
 from config import conf
 
 def main(args=None):
@@ -9,6 +9,8 @@ def main(args=None):
     Main function. Runs simulations, postprocessor (benchmarking), or only plot based on terminal args. Can be combined.
     
     - Running a simulation (`-r` or `--run`)
+    - Running the parameter sweep of `sweep_dict` (`-s` or `--sweep`)
+    - Converting the JSON result files of the simulation folder to .npz (`-c` or `--convert`)
     - Overriding an existing simulation output (`-o` or `--override`)
     - Running the postprocessor for benchmarking (`-pr` or `--proc`)
     - Plotting the results (`-p` or `--plot`)
@@ -27,25 +29,33 @@ def main(args=None):
 
     Outputs:
     ========
-    The "Game" instance writes a JSON file with conversation round data to evaluate/results/simulation/
+    The "Game" instance writes an .npz (or JSON, see RESULT_FORMAT) file with conversation round data to evaluate/results/simulation/
     
     plot(): Postprocessor processes this file into time series data and feeds into Plotter Tool.
     """
     args = args if args else parse_arguments()
     
     if args.run:
-        for characters_setup in conf("characters_dict"):
-            Game(characters_setup).run(args.override)
+        run_games([Game(characters_setup) for characters_setup in conf("characters_dict")], args.override)
+
+    if args.sweep:
+        Sweep(**conf("sweep_dict")).run(args.override)
+
+    if args.convert:
+        folder = os.path.join(conf("folder"), "simulation")
+        for filename in sorted(os.listdir(folder)) if os.path.isdir(folder) else []:
+            if filename.endswith("_sim.json"):
+                print(f"Converted {filename} to {os.path.basename(convert_json_results(os.path.join(folder, filename), conf('RESULT_PRECISION')))}")
 
     if args.proc:
         from evaluate import Postprocessor
-        file_path = "evaluate/results/simulation/04_ordinary_NA=3_NR=500_NST=1_sim.json"
+        file_path = make_outfile_name(conf("characters_dict")[0])
         if os.path.exists(file_path):
             start = timer()
-            Postprocessor()
+            Postprocessor(filename=file_path)
             print(f"Finished processing: {round(timer() - start, 2)}s")
         else:
-            print("The file for postprocessor benchmarking doesn't exist. Specify a different one if needed in main.py")
+            print("The file for postprocessor benchmarking doesn't exist. Run it first with -r or specify a different one in main.py")
 
     if args.plot:
         from evaluate import plot
@@ -1,3 +1,5 @@
 from .game import Game
 from .simulation import Simulation
+from .scheduler import run_games
+from .sweep import Sweep
 from .agent import Agent
\ No newline at end of file
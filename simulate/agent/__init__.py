@@ -3,4 +3,5 @@ from .sender import Sender
 from .receiver import Receiver
 from .updater import Updater
 from .saver import StateSaver
-from .agent import Agent
\ No newline at end of file
+from .agent import Agent
+from .memory import InfoArray, SimulationMemory, SparseInfoMatrix
\ No newline at end of file
@@ -1,19 +1,18 @@
 import numpy as np
 from statistics import median
 
-from config import conf
 from helper import character_mapping
 from simulate.information_theory import Info
 from . import Initiator, Sender, Receiver, Updater, StateSaver
-
-agents = conf("agents")
+from .memory import SimulationMemory, SparseInfoMatrix
 
 class Agent:
     """
     Represents an agent in the simulation with defined characteristics and memory.
     """
 
-    def __init__(self, id: int, honesty: float, character: str, random_dict: dict, log: any, conf: dict) -> None:
+    def __init__(self, id: int, honesty: float, character: str, random_dict: dict, log: any, conf: dict,
+                 memory: SimulationMemory = None) -> None:
         """Initializes an agent with specified attributes and sets up its character and memory.
 
         Args:
@@ -23,6 +22,8 @@ class Agent:
             random_dict (dict): Random number generator dict.
             log (Logger): Logger instance for recording events.
             conf (dict): Configuration settings for the simulation.
+            memory (SimulationMemory, optional): Shared mind arrays of the simulation for the "arrays"
+                MIND_BACKEND. Defaults to None, i.e. the agent allocates the arrays of its own mind only.
         """
         self.conf = conf
         self.id = id
@@ -31,7 +32,7 @@ class Agent:
         self.random = random_dict
         self.log = log
         self.setup_character(character)
-        self.setup_memory()
+        self.setup_memory(memory)
         self.initialise_memory()
 
         self.Initiator = Initiator(self)
@@ -49,20 +50,36 @@ class Agent:
         for key, value in character_mapping(character).items():
             setattr(self, key, value)
 
-    def setup_memory(self) -> None:
-        """Initializes the agent's memory structures for friendships and information states."""
+    def setup_memory(self, memory: SimulationMemory = None) -> None:
+        """Initializes the agent's memory structures for friendships and information states.
+
+        With MIND_BACKEND "arrays", the Info-valued memories are views on the simulation's `SimulationMemory`, or on
+        arrays of its own mind for an agent without one.
+        With "sparse", Iothers, J and C only store the entries that have been written.
+        Otherwise ("lists", the default) they are lists of Info.
+
+        Args:
+            memory (SimulationMemory, optional): Shared mind arrays of the simulation. Defaults to None.
+        """
         n_agents = self.conf("n_agents")
-        self.friendships = [Info(1, 0) if i == self.id else Info(0, 0) for i in agents]
-        self.I = [Info(0, 0)] * n_agents
-        self.Iothers = [[Info(0, 0)] * n_agents for _ in range(n_agents)]
-        self.J = [[Info(0, 0)] * n_agents for _ in range(n_agents)]
-        self.C = [[Info(0, 0)] * n_agents for _ in range(n_agents)]
+        if self.conf("MIND_BACKEND") == "arrays":
+            views = memory.views(self.id) if memory else SimulationMemory.agent_views(n_agents, self.id)
+            for name, view in views.items():
+                setattr(self, name, view)
+        else:
+            self.friendships = [Info.TRUE if i == self.id else Info.ZERO for i in self.conf("agents")]
+            self.I = [Info.ZERO] * n_agents
+            self.Icomp = [Info.ZERO] * n_agents
+            if self.conf("MIND_BACKEND") == "sparse":
+                self.Iothers, self.J, self.C = (SparseInfoMatrix(n_agents) for _ in range(3))
+            else:
+                self.Iothers = [[Info.ZERO] * n_agents for _ in range(n_agents)]
+                self.J = [[Info.ZERO] * n_agents for _ in range(n_agents)]
+                self.C = [[Info.ZERO] * n_agents for _ in range(n_agents)]
         self.K = [np.sqrt(np.pi)] * self.conf("KLENGTH")
         self.kappa = 1
         self.n_conversations = [{"partner": 0, "topic": 0} for _ in range(n_agents)]
 
-        self.Icomp = [Info(0, 0)] * n_agents
-        
 
     def initialise_memory(self) -> None:
         """Initializes the agent's memory with predefined values from the configuration."""
@@ -71,4 +88,9 @@ class Agent:
                 self.I[b] = Info(self.conf("mindI_dict")[self.id][b][0], self.conf("mindI_dict")[self.id][b][1])
         if self.id in self.conf("Ks_dict"):
             self.K = self.conf("Ks_dixt")[self.id] if self.conf("Ks_dict") else [np.sqrt(np.pi) for _ in range(self.conf("KLENGTH"))]
-        self.kappa = median(self.K) / np.sqrt(np.pi)
\ No newline at end of file
+        self.kappa = median(self.K) / np.sqrt(np.pi)
+
+    def count_mind_entries(self) -> int:
+        """Returns the number of Info entries held in Iothers, J and C (only the written ones for the "sparse" backend)."""
+        return sum(matrix.n_entries if isinstance(matrix, SparseInfoMatrix) else sum(len(row) for row in matrix)
+                   for matrix in (self.Iothers, self.J, self.C))
\ No newline at end of file
@@ -0,0 +1,191 @@
+import numpy as np
+from simulate.information_theory import Info
+from simulate.information_theory.info import MAX_COUNT
+
+
+class InfoArray:
+    """
+    View on a float array of shape (..., 2) that reads and writes Info instances along the last axis.
+
+    Indexing a one-dimensional InfoArray returns an Info, indexing a higher-dimensional one returns another view,
+    so `I[b]` and `Iothers[b][topic]` work like the lists of Info of the "lists" backend. Hot paths read and write the
+    parameters directly with `counts` and `set_counts`, without creating a view and an Info per access.
+
+    Attributes:
+        data (np.ndarray): The underlying array; the last axis holds (mu, la).
+    """
+    __slots__ = ("data",)
+
+    def __init__(self, data: np.ndarray) -> None:
+        """Wraps an array without copying it.
+
+        Args:
+            data (np.ndarray): Array of shape (..., 2).
+        """
+        self.data = data
+
+    def __getitem__(self, index: int) -> 'Info | InfoArray':
+        if self.data.ndim == 2:
+            mu, la = self.data[index].tolist()
+            return Info._make(mu, la)
+        return InfoArray(self.data[index])
+
+    def __setitem__(self, index: int, info: Info) -> None:
+        self.data[index] = (info.mu, info.la)
+
+    def __len__(self) -> int:
+        return len(self.data)
+
+    def __iter__(self):
+        return (self[i] for i in range(len(self.data)))
+
+    def counts(self, *index: int) -> list[float]:
+        """Returns [mu, la] of an entry, e.g. `Iothers.counts(b, topic)` for the parameters of `Iothers[b][topic]`."""
+        return self.data[index].tolist()
+
+    def set_counts(self, index: tuple, mu: float, la: float) -> None:
+        """Writes the parameters of an entry like `self[...] = Info(mu, la)`, including the MAX_COUNT rescaling."""
+        if (total := mu + la) > MAX_COUNT:
+            mu, la = MAX_COUNT * mu / total, MAX_COUNT * la / total
+        self.data[index] = (mu, la)
+
+
+def info_means(data: np.ndarray) -> np.ndarray:
+    """Means of the Beta distributions of an array of shape (..., 2), like `Info.mean` for every entry."""
+    return (data[..., 0] + 1) / (data[..., 0] + data[..., 1] + 2)
+
+
+class SimulationMemory:
+    """
+    Struct-of-arrays storage of the minds of all agents of a simulation ("arrays" MIND_BACKEND).
+
+    Each agent reads and writes its own rows through `InfoArray` views, so the memory footprint is
+    a few contiguous arrays instead of O(n^3) Info objects.
+
+    Attributes:
+        I (np.ndarray): Opinions of every agent about every agent, shape (n, n, 2).
+        Icomp (np.ndarray): Assumed competences, shape (n, n, 2).
+        friendships (np.ndarray): Friendships, shape (n, n, 2).
+        Iothers (np.ndarray): Assumed opinions of others, shape (n, n, n, 2).
+        J (np.ndarray): Last statements heard from others, shape (n, n, n, 2).
+        C (np.ndarray): Statements weighted by distrust, shape (n, n, n, 2).
+    """
+    FIELDS = ("I", "Icomp", "friendships", "Iothers", "J", "C")
+
+    def __init__(self, n_agents: int) -> None:
+        """Allocates the minds of `n_agents` agents with the same start values as the "lists" backend.
+
+        Args:
+            n_agents (int): Number of agents in the simulation.
+        """
+        n = n_agents
+        self.I, self.Icomp, self.friendships = np.zeros((n, n, 2)), np.zeros((n, n, 2)), np.zeros((n, n, 2))
+        self.Iothers, self.J, self.C = np.zeros((n, n, n, 2)), np.zeros((n, n, n, 2)), np.zeros((n, n, n, 2))
+        self.friendships[np.arange(n), np.arange(n)] = (Info.TRUE.mu, Info.TRUE.la)
+
+    def views(self, id: int) -> dict[str, InfoArray]:
+        """Returns the views on the mind of one agent.
+
+        Args:
+            id (int): ID of the agent.
+
+        Returns:
+            dict[str, InfoArray]: A view for every field, keyed by the agent attribute name.
+        """
+        return {name: InfoArray(getattr(self, name)[id]) for name in self.FIELDS}
+
+    @staticmethod
+    def agent_views(n_agents: int, id: int) -> dict[str, InfoArray]:
+        """Allocates the mind of a single agent that is not part of a simulation, with the start values of `views`.
+
+        Args:
+            n_agents (int): Number of agents the agent knows about.
+            id (int): ID of the agent.
+
+        Returns:
+            dict[str, InfoArray]: A view on a new array for every field, keyed by the agent attribute name.
+        """
+        n = n_agents
+        views = {name: InfoArray(np.zeros((n, 2))) for name in ("I", "Icomp", "friendships")}
+        views.update({name: InfoArray(np.zeros((n, n, 2))) for name in ("Iothers", "J", "C")})
+        views["friendships"][id] = Info.TRUE
+        return views
+
+    @property
+    def nbytes(self) -> int:
+        """Returns the memory used by all arrays in bytes."""
+        return sum(getattr(self, name).nbytes for name in self.FIELDS)
+
+
+class SparseInfoRow:
+    """
+    Row of a `SparseInfoMatrix`. Reads return the default prior for entries that were never written.
+
+    Attributes:
+        rows (dict): Written rows of the matrix, {row: {column: Info}}.
+        row (int): Index of this row.
+        size (int): Number of columns.
+    """
+    __slots__ = ("rows", "row", "size")
+
+    def __init__(self, rows: dict, row: int, size: int) -> None:
+        self.rows, self.row, self.size = rows, row, size
+
+    def __getitem__(self, column: int) -> Info:
+        entries = self.rows.get(self.row)
+        return entries.get(column, Info.ZERO) if entries else Info.ZERO
+
+    def __setitem__(self, column: int, info: Info) -> None:
+        self.rows.setdefault(self.row, {})[column] = info
+
+    def __len__(self) -> int:
+        return self.size
+
+    def __iter__(self):
+        return (self[column] for column in range(self.size))
+
+
+class SparseInfoMatrix:
+    """
+    n x n matrix of Info that only stores the entries that have been written ("sparse" MIND_BACKEND).
+
+    Agents only touch Iothers[speaker][topic], J[speaker][topic] and C[speaker][topic] for the
+    (speaker, topic) pairs that came up in conversation, so most entries stay at the prior Info.ZERO.
+
+    Attributes:
+        rows (dict): Written entries, {row: {column: Info}}.
+        size (int): Number of rows and columns.
+    """
+    __slots__ = ("rows", "size")
+
+    def __init__(self, size: int) -> None:
+        """Creates an empty matrix.
+
+        Args:
+            size (int): Number of rows and columns, i.e. the number of agents.
+        """
+        self.rows, self.size = {}, size
+
+    def __getitem__(self, row: int) -> SparseInfoRow:
+        return SparseInfoRow(self.rows, row, self.size)
+
+    def __len__(self) -> int:
+        return self.size
+
+    def __iter__(self):
+        return (self[row] for row in range(self.size))
+
+    @property
+    def n_entries(self) -> int:
+        """Returns the number of stored entries."""
+        return sum(len(entries) for entries in self.rows.values())
+
+    def round_means(self) -> dict:
+        """Returns the rounded means of the stored entries in the sparse format of `dense_matrix`.
+
+        Returns:
+            dict: "size", the mean of the prior ("default") and [row, column, mean] of every stored entry ("entries").
+        """
+        return {"size": self.size, "default": Info.ZERO.round_mean(),
+                "entries": [[row, column, info.round_mean()] for row, entries in sorted(self.rows.items())
+                            for column, info in sorted(entries.items())]}
@@ -13,8 +13,9 @@ class Receiver():
             agent (Agent): The agent that this receiver belongs to.
         """
         self.a = agent
+        self.arrays = agent.conf("MIND_BACKEND") == "arrays"
 
-    def receive(self, topic: int, speaker: int, statement: Info, blush: bool) -> dict:
+    def receive(self, topic: int, speaker: int, statement: Info, blush: bool, surprise: float = None) -> dict:
         """Processes a received statement, updates trust, and interprets the speaker and topic.
 
         Args:
@@ -22,13 +23,14 @@ class Receiver():
             speaker (int): The ID of the speaker.
             statement (Info): The statement received from the speaker.
             blush (bool): Indicates if the speaker is blushing.
+            surprise (float, optional): Precomputed KL(statement, I[topic]), e.g. from `Ift.KL_many`. Defaults to None.
 
         Returns:
             dict: A dictionary containing trust and interpreted information about the speaker and topic.
         """
         if topic == self.a.id:
             self.a.Updater.update_friendship(speaker, statement.mean)
-        trust = self.compute_trust(topic=topic, speaker=speaker, statement=statement, blush=blush)
+        trust = self.compute_trust(topic=topic, speaker=speaker, statement=statement, blush=blush, surprise=surprise)
         
         Ispeaker = self.interprete_speaker(speaker=speaker, topic=topic, statement=statement)
         if speaker != topic:
@@ -41,7 +43,7 @@ class Receiver():
         return reception
 
 
-    def compute_trust(self, topic: int, speaker: int, statement: 'Info', blush: bool) -> float:
+    def compute_trust(self, topic: int, speaker: int, statement: 'Info', blush: bool, surprise: float = None) -> float:
         """Computes the trustworthiness of the speaker based on the received statement.
 
         Args:
@@ -49,6 +51,7 @@ class Receiver():
             speaker (int): The ID of the speaker.
             statement (Info): The statement received from the speaker.
             blush (bool): Indicates if the speaker is blushing.
+            surprise (float, optional): Precomputed KL(statement, I[topic]). Defaults to None.
 
         Returns:
             float: The computed trust value.
@@ -59,10 +62,10 @@ class Receiver():
         assumed_honesty = self.a.I[speaker].mean
         if self.a.listening and speaker == topic and statement.mean < assumed_honesty: return 1
 
-        if self.a.conf["competence"]:  # remove surprise from denominator, only blush
+        if self.a.conf("competence"):  # remove surprise from denominator, only blush
             denominator = assumed_honesty + (1 - self.a.conf("BLUSH_FREQ_LIE") * (1 - assumed_honesty))
         else:
-            surprise_factor = self.handle_surprise(statement=statement, topic=topic)
+            surprise_factor = self.handle_surprise(statement=statement, topic=topic, surprise=surprise)
             denominator = surprise_factor * (1 - self.a.conf("BLUSH_FREQ_LIE") * (1 - assumed_honesty))
         return assumed_honesty / (assumed_honesty + denominator)
 
@@ -73,19 +76,21 @@ class Receiver():
              
         # Annahme - Ich bin kompetent
 
-    def handle_surprise(self, statement: Info, topic: int) -> float:
+    def handle_surprise(self, statement: Info, topic: int, surprise: float = None) -> float:
         """Calculates the surprise factor based on the received statement and topic.
 
         Args:
             statement (Info): The statement received from the speaker.
             topic (int): The topic of conversation.
+            surprise (float, optional): Precomputed KL(statement, I[topic]). Defaults to None.
 
         Returns:
             float: The computed surprise factor.
         """
         if not self.a.listening or self.a.uncritical: return 1
         
-        surprise = Ift.KL(statement, self.a.I[topic])
+        if surprise is None:
+            surprise = Ift.KL(statement, self.a.I[topic])
         surprise_factor = 0.5 * (surprise / (self.a.kappa + 1e-6)) ** 2
         self.a.K = (self.a.K + [surprise])[-10:]
         self.a.kappa = median(self.a.K) / np.sqrt(np.pi)
@@ -102,7 +107,7 @@ class Receiver():
         Returns:
             dict: A dictionary containing the interpreted information about truth and lies.
         """
-        Inew = Ift.get_info_difference(P=statement, Q=self.a.Iothers[speaker][topic])
+        Inew = Ift.get_info_difference(P=statement, Q=self.assumed_opinion(speaker, topic))
         Itruth = Inew + self.a.I[topic]
         Ilie = self.a.I[topic]
         return {"Itruth": Itruth, "Ilie": Ilie}
@@ -118,9 +123,15 @@ class Receiver():
         Returns:
             dict: A dictionary containing the interpreted information about the speaker's truth and lies.
         """
-        Itruth = self.a.I[speaker] + Info(1, 0)
+        Itruth = self.a.I[speaker] + Info.TRUE
         if speaker == topic:
-            Inew = Ift.get_info_difference(P=statement, Q=self.a.Iothers[speaker][topic])
-            Itruth = statement + Info(1, 0) + Inew
-        Ilie = self.a.I[speaker] + Info(0, 1)
-        return {"Itruth": Itruth, "Ilie": Ilie}
\ No newline at end of file
+            Inew = Ift.get_info_difference(P=statement, Q=self.assumed_opinion(speaker, topic))
+            Itruth = statement + Info.TRUE + Inew
+        Ilie = self.a.I[speaker] + Info.FALSE
+        return {"Itruth": Itruth, "Ilie": Ilie}
+
+    def assumed_opinion(self, speaker: int, topic: int) -> Info:
+        """Returns Iothers[speaker][topic], read from the array without a view for MIND_BACKEND "arrays"."""
+        if self.arrays:
+            return Info._make(*self.a.Iothers.counts(speaker, topic))
+        return self.a.Iothers[speaker][topic]
@@ -1,3 +1,6 @@
+from .memory import SparseInfoMatrix
+
+
 class StateSaver():
     """Handles compressing an agent's state into a small dict for logging or writing to JSON."""
     def __init__(self, agent):
@@ -11,6 +14,9 @@ class StateSaver():
     def initial_state(self) -> dict:
         """Gets the initial state of the agent.
 
+        The n x n matrices Iothers and J of the "sparse" backend are saved in a sparse format with only the written
+        entries, see `dense_matrix`.
+
         Returns:
             dict: A dictionary containing the initial state information of the agent.
         """
@@ -18,14 +24,24 @@ class StateSaver():
             "honesty": self.a.honesty, "character": self.a.character, 
             "friendships": [f.round_mean() for f in self.a.friendships],
             "I": [i.round_mean() for i in self.a.I],
-            "Iothers": [[ii.round_mean() for ii in i] for i in self.a.Iothers],
-            "J": [[jj.round_mean() for jj in j] for j in self.a.J],
+            "Iothers": self.matrix_state(self.a.Iothers),
+            "J": self.matrix_state(self.a.J),
             "lastK": self.a.K[-1], "kappa": float(self.a.kappa)
         }
 
+    @staticmethod
+    def matrix_state(matrix) -> list[list] | dict:
+        """Returns the rounded means of an n x n matrix of Info, only the written entries for a `SparseInfoMatrix`."""
+        if isinstance(matrix, SparseInfoMatrix):
+            return matrix.round_means()
+        return [[info.round_mean() for info in row] for row in matrix]
+
     def save_state(self, topic: int, partners: list, setting: str) -> dict:
         """Saves only the necessary agent attributes that changed during this conversation.
 
+        The speaker of a one_to_all conversation has no single partner: it only saves its own opinion and statement,
+        with the partner -1. Its listeners save the same attributes as in a one_to_one conversation with the speaker.
+
         Args:
             topic (int): The topic of conversation.
             partners (list): The list of partners involved in the conversation.
@@ -34,20 +50,22 @@ class StateSaver():
         Returns:
             dict: A dictionary containing only the necessary agent attributes that changed during this conversation.
         """
-        if setting == "one_to_one":
-            partner = partners[0]
-            state = {
-                "topic": int(topic), "partner": int(partner), "id": self.a.id, "Iself": self.a.I[self.a.id].round_mean(),
-                "Ipartner": self.a.I[partner].round_mean(), "Iothers": self.a.Iothers[partner][topic].round_mean(),
-                "Jself": self.a.J[self.a.id][topic].round_mean(), "Jpartner": self.a.J[partner][topic].round_mean(),
-                "lastK": float(self.a.K[-1]), "kappa": float(self.a.kappa)
+        if setting == "one_to_all" and len(partners) > 1:
+            return {
+                "topic": int(topic), "partner": -1, "id": self.a.id, "Iself": self.a.I[self.a.id].round_mean(),
+                "Jself": self.a.J[self.a.id][topic].round_mean(), "lastK": float(self.a.K[-1]), "kappa": float(self.a.kappa)
             }
-            if topic == self.a.id:
-                state["friendships"] = float(self.a.friendships[partner].mean)
-            if topic not in [self.a.id, partner]:
-                state["Itopic"] = float(self.a.I[topic].mean)
-        else:
-            state = {}
+        partner = partners[0]
+        state = {
+            "topic": int(topic), "partner": int(partner), "id": self.a.id, "Iself": self.a.I[self.a.id].round_mean(),
+            "Ipartner": self.a.I[partner].round_mean(), "Iothers": self.a.Iothers[partner][topic].round_mean(),
+            "Jself": self.a.J[self.a.id][topic].round_mean(), "Jpartner": self.a.J[partner][topic].round_mean(),
+            "lastK": float(self.a.K[-1]), "kappa": float(self.a.kappa)
+        }
+        if topic == self.a.id:
+            state["friendships"] = float(self.a.friendships[partner].mean)
+        if topic not in [self.a.id, partner]:
+            state["Itopic"] = float(self.a.I[topic].mean)
         return state
 
     def log_state(self) -> dict:
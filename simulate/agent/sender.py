@@ -1,4 +1,3 @@
-from scipy.optimize import root
 from simulate.information_theory import Ift, Info
 
 
@@ -68,18 +67,11 @@ class Sender():
         Returns:
             float: The maximum size of the lie that can be told.
         """
-        def lie_tolerance() -> float:
-            tolerance = self.a.random["lies"].exponential(self.a.kappa) * self.a.conf("F_CAUTION")
-            if self.a.disturbing:
-                return 2 * tolerance
-            return tolerance
-        
-        def lie_size(x, friend) -> float:
-            statement = assumed_opinion + Info(x ** 2, 0) if friend else assumed_opinion + Info(0, x ** 2)
-            return Ift.KL(statement, assumed_opinion) - lie_tolerance()
-        
+        tolerance = self.a.random["lies"].exponential(self.a.kappa) * self.a.conf("F_CAUTION")
+        if self.a.disturbing:
+            tolerance *= 2
         friend = self.a.friendships[topic].mean > 0.5
-        return root(lie_size, [2.0], args=(friend,)).x[0] ** 2
+        return Ift.maximum_lie_size(assumed_opinion, tolerance, friend)
 
     def choose_lie_method(self, topic: int, listeners: dict[list], lie: float) -> Info:
         """Chooses the lie method based on the topic and agent character.
@@ -93,17 +85,17 @@ class Sender():
         """
         aggressive = self.a.aggressive > self.a.random["aggressive"].uniform()
         if self.a.id == topic:
-            lie = Info(lie, 0) if aggressive else Info(0, 0)
+            lie = Info(lie, 0) if aggressive else Info.ZERO
         elif self.a.flattering and topic in listeners["ids"]:
             scaling_factor = (1 - self.a.I[topic].mean) if self.a.conf("SCALED_FLATTERING") else 1
             lie = Info(lie * scaling_factor, 0)
         else:
             friendship = self.a.friendships[topic].mean
             if self.a.conf("CONTINUOUS_FRIENDSHIP"):
-                lie = Info(2 * (friendship - 0.5) * lie, 0) if aggressive else Info(0, 0) ## NOOO
+                lie = Info(2 * (friendship - 0.5) * lie, 0) if aggressive else Info.ZERO ## NOOO
             else:
                 if friendship == 0.5: 
-                    lie = Info(0, 0)
+                    lie = Info.ZERO
                 else: 
                     lie = Info((friendship > 0.5) * lie, (friendship < 0.5) * lie)
 
@@ -1,4 +1,5 @@
-from .agent import Agent
+from .agent import Agent, Updater
+from .information_theory import Ift, Info
 
 class Conversation:
     """
@@ -29,21 +30,26 @@ class Conversation:
         self.random = random
         self.agents = agents
 
-    def run_conversation_protocol(self):
+    def run_conversation_protocol(self, planned: tuple = None):
         """
         Executes the conversation protocol, managing message exchanges between agents (sending, receiving, updating).
 
+        Args:
+            planned (tuple, optional): Setting, listeners and topic from a `ConversationPlan`. Defaults to None.
+
         Returns:
             dict: The attributes of all participating agents that changed during the simulation.
         """
-        self.initiate_conversation()
+        self.initiate_conversation(planned)
 
         message = self.speaker.Sender.talk(self.listeners, self.topic)        
         listeners = [self.agents[i] for i in self.listeners["ids"]]
-        for listener in listeners:
+        surprises = self.compute_surprises(listeners, message["statement"])
+        for listener, surprise in zip(listeners, surprises):
             reception = listener.Receiver.receive(topic=self.topic, speaker=self.speaker.id, 
-                                                  statement=message["statement"], blush=message["blushes"])
-            [listener.Updater.add_to_buffer(reception) for listener in listeners]
+                                                  statement=message["statement"], blush=message["blushes"],
+                                                  surprise=surprise)
+            listener.Updater.add_to_buffer(reception)
 
         if self.setting == "one_to_one":
             response = listeners[0].Sender.talk({"ids": [self.speaker.id], "weights": [1]}, self.topic)
@@ -52,15 +58,41 @@ class Conversation:
             self.speaker.Updater.add_to_buffer(reception)
             self.speaker.Updater.update(self.topic, listeners[0].id)
             
-        [agent.Updater.update(self.topic, self.speaker.id) for agent in listeners]
+        if len(listeners) > 1:
+            Updater.update_batch([agent.Updater for agent in listeners], self.topic, self.speaker.id)
+        else:
+            [agent.Updater.update(self.topic, self.speaker.id) for agent in listeners]
 
         return self.save_state()
 
-    def initiate_conversation(self):
-        """Initializes the conversation by selecting its setting, listeners, and topic."""
-        self.setting = self.pick_setting()
-        self.listeners = self.pick_listeners()
-        self.topic = self.pick_topic()
+    def initiate_conversation(self, planned: tuple = None):
+        """Initializes the conversation by selecting its setting, listeners, and topic.
+
+        Args:
+            planned (tuple, optional): Setting, listeners and topic from a `ConversationPlan`, None where not planned.
+                Only the missing ones are picked by the speaker. Defaults to None.
+        """
+        setting, listeners, topic = planned or (None, None, None)
+        self.setting = setting or self.pick_setting()
+        self.listeners = listeners or self.pick_listeners()
+        self.topic = self.pick_topic() if topic is None else topic
+
+    def compute_surprises(self, listeners: list[Agent], statement: Info) -> list:
+        """Computes the surprise KL(statement, I[topic]) of all listeners of a broadcast with one `Ift.KL_many` call.
+
+        Receiving does not change the listeners' own opinions, so the values equal those computed one at a time.
+
+        Args:
+            listeners (list[Agent]): The listeners of the conversation.
+            statement (Info): The statement of the speaker.
+
+        Returns:
+            list: The surprise of every listener, or None for all if there is only one listener.
+        """
+        if len(listeners) < 2:
+            return [None] * len(listeners)
+        opinions = [listener.I[self.topic] for listener in listeners]
+        return Ift.KL_many(statement.mu, statement.la, [I.mu for I in opinions], [I.la for I in opinions]).tolist()
 
     def pick_setting(self):
         """Selects the conversation setting based on the speaker's preferences."""
@@ -76,14 +108,12 @@ class Conversation:
     
     def save_state(self):
         """
-        Saves the state of the conversation based on the current setting.
+        Saves the state of the speaker and every listener of the conversation, see `StateSaver.save_state`.
 
         Returns:
             dict: A dictionary containing the attributes of all participating agents that changed during the simulation.
         """
-        if self.setting == "one_to_one":
-            listener = self.agents[self.listeners["ids"][0]]
-            return {
-                self.speaker.id: self.speaker.Saver.save_state(self.topic, self.listeners["ids"], self.setting),
-                listener.id: listener.Saver.save_state(self.topic, [self.speaker.id], self.setting)
-            }
+        state = {self.speaker.id: self.speaker.Saver.save_state(self.topic, self.listeners["ids"], self.setting)}
+        for id in self.listeners["ids"]:
+            state[id] = self.agents[id].Saver.save_state(self.topic, [self.speaker.id], self.setting)
+        return state
@@ -1,9 +1,14 @@
 import os
 from timeit import default_timer as timer
-from helper import launch_parallel
+from helper import launch_parallel, Progress, TaskCosts, StepRecords
+from helper.records import make_transfer_path
+from helper.result_stream import seed_file, read_steps, discard_manifest
 from .simulation import Simulation
+from .information_theory import Ift
+from .information_theory.cache import format_cache_stats
+from .result_store import ResultStore
 from config import init_conf
-from helper import make_outfile_name, save_data_as_json
+from helper import make_outfile_name, save_results, results_exist
 
 class Game:
     """
@@ -16,20 +21,32 @@ class Game:
             Each key defines the character for that specific agent. 
             If "all" is a key, all agents not mentioned will get that character.
         outfile_name (str): Name of the file to store simulation results.
+        name (str): Character setup, number of agents and rounds, e.g. "04_ordinary_NA=3_NR=300". Names the game in
+            progress reports and its seeds in the TASK_COSTS_FILE.
+        store (ResultStore): Per-seed result cache if RESULT_CACHE is set and the honesties are not random, otherwise
+            None.
         simulations (list): List of `Simulation` instances.
+        streaming (bool): If True (RESULT_FORMAT "jsonl" and write_to_file), every simulation streams its result into
+            its seed file in the outfile_name folder instead of returning it.
+        stored (dict): {seed: result} loaded from the store by `prepare`.
     """
 
-    def __init__(self, characters_setup: dict = None, write_to_file = True):
+    def __init__(self, characters_setup: dict = None, write_to_file = True, conf: callable = None):
         """
         Initializes the game with character setup and configuration.
 
         Args:
             characters_setup (dict): Dictionary specifying agent characters.
+            conf (callable, optional): Configuration, e.g. from `init_conf(overrides)`. Defaults to config.yml.
         """
-        self.conf = init_conf()
+        self.conf = conf or init_conf()
         self.characters_setup = characters_setup if characters_setup else self.conf("characters_dict")[0]
         self.write_to_file = write_to_file
-        self.outfile_name = make_outfile_name(self.characters_setup)
+        self.outfile_name = make_outfile_name(self.characters_setup, self.conf)
+        self.name = os.path.basename(self.outfile_name).split("_NST=")[0]
+        self.store = ResultStore(self.characters_setup, self.conf) \
+            if self.conf("RESULT_CACHE") and ResultStore.is_reproducible(self.conf) else None
+        self.streaming = write_to_file and self.conf("RESULT_FORMAT") == "jsonl"
         self.setup_simulations()
 
     def setup_simulations(self) -> None:
@@ -40,34 +57,182 @@ class Game:
         """
         Runs the simulations and passes results to output function.
 
-        If the results file exists and override is False, skips the simulation.
+        Without RESULT_CACHE, the simulation is skipped if the results file exists and override is False.
+        With RESULT_CACHE, stored seeds are loaded from the `ResultStore` and only the missing ones are played
+        (all of them if override is True). To run several games with one pool, use `run_games`.
 
         Args:
-            override (bool): If True, runs simulations even if the output file exists.
+            override (bool): If True, runs simulations even if the output file exists or their results are stored.
         """
         start_time = timer()
+        missing = self.prepare(override)
+        if missing is not None:
+            return self.finish(missing, self.play(missing), start_time)
 
-        if not os.path.exists(self.outfile_name) or override:
-            if len(self.simulations) == 1:
-                results = [self.simulations[0].play()]
-            else:
-                results = launch_parallel(self.simulations, play_simulation)
-            print(f"Time elapsed: {round(timer() - start_time, 3)}s")
-            return self.output(results, self.outfile_name)
-        else:
+    def prepare(self, override: bool) -> list[Simulation] | None:
+        """
+        Loads the stored results and returns the simulations that still have to be played.
+
+        When streaming, the manifest of an existing folder is removed first, so that a run that fails while writing
+        the seeds doesn't leave a folder of old and new seeds that counts as complete.
+
+        Args:
+            override (bool): If True, all simulations are played.
+
+        Returns:
+            list[Simulation] | None: Simulations to play, or None if the game is skipped because its file exists.
+        """
+        if self.store is None and results_exist(self.outfile_name) and not override:
             print("Simulation is already in processor folder.")
+            return None
+        if self.streaming:
+            discard_manifest(self.outfile_name)
+        self.stored = {} if override else self.load_stored()
+        missing = [sim for sim in self.simulations if sim.id not in self.stored]
+        for sim in missing:
+            sim.outfile = seed_file(self.outfile_name, sim.id) if self.streaming else None
+        return missing
+
+    def finish(self, missing: list[Simulation], outputs: list[dict], start_time: float = None) -> list | None:
+        """
+        Stores the new results, merges them with the stored ones in seed order and passes them to the output function.
+
+        Records sent back as a descriptor (RESULT_TRANSFER "memmap") are mapped here without copying. Streamed
+        results stay in their seed files and are only finalized by the output function. The KL cache shards the
+        workers saved are merged into the KL_CACHE_FILE.
+
+        Args:
+            missing (list[Simulation]): The simulations returned by `prepare`.
+            outputs (list[dict]): Their outputs of `play_simulation`.
+            start_time (float, optional): Start of the run, for the elapsed time. If None (the game shared a pool
+                with other games), the playing time of its own simulations is reported instead. Defaults to None.
+
+        Returns:
+            list | None: The results if write_to_file is False.
+        """
+        outputs = [receive_output(output) for output in outputs]
+        self.store_results(missing, outputs)
+        self.update_task_costs(outputs)
+        Ift.merge_cache()
+        new_results = {sim.id: output.get("result", output.get("stream")) for sim, output in zip(missing, outputs)}
+        results = {**self.stored, **new_results}
+        results = [results[sim.id] for sim in self.simulations]
+        timing = (f"Time elapsed: {round(timer() - start_time, 3)}s" if start_time is not None else
+                  f"Simulation time: {round(sum(output.get('time', 0) for output in outputs), 3)}s over {len(outputs)} seeds")
+        print(timing + self.cache_report(outputs) + self.straggler_report(missing, outputs)
+              + (f" | {len(self.stored)} of {len(results)} seeds from result cache" if self.store else ""))
+        return self.output(results, self.outfile_name)
+
+    def play(self, simulations: list[Simulation]) -> list[dict]:
+        """
+        Plays simulations with the configured ENGINE.
+
+        With ENGINE "jax", all simulations are played at once by the `JaxEngine`.
+
+        Args:
+            simulations (list[Simulation]): Simulations to play.
+
+        Returns:
+            list[dict]: Output of `play_simulation` for every simulation, in order.
+        """
+        if not simulations:
+            return []
+        if self.conf("ENGINE") == "jax":
+            from .jax_engine import JaxEngine
+            return [{"result": result, "cache": None} for result in JaxEngine(self.conf).run(simulations)]
+        if len(simulations) == 1:
+            return [play_simulation(simulations[0])]
+        progress = Progress([self.name] * len(simulations), interval=self.conf("PROGRESS_INTERVAL"))
+        return launch_parallel(simulations, play_simulation, warm_up_worker,
+                               dynamic=self.conf("SCHEDULING") == "dynamic", progress=progress)
+
+    def load_stored(self) -> dict:
+        """
+        Loads the stored results of the simulations.
+
+        Returns:
+            dict: {seed: result} of every simulation found in the `ResultStore`, empty without RESULT_CACHE.
+        """
+        if self.store is None:
+            return {}
+        results = {sim.id: self.store.load(sim) for sim in self.simulations}
+        return {seed: result for seed, result in results.items() if result is not None}
+
+    def store_results(self, simulations: list[Simulation], outputs: list[dict]) -> None:
+        """
+        Saves new results in the `ResultStore` if RESULT_CACHE is set. Streamed results are read back from their
+        seed files one at a time.
+
+        Args:
+            simulations (list[Simulation]): The played simulations.
+            outputs (list[dict]): Their outputs of `play_simulation`.
+        """
+        if self.store is not None:
+            for sim, output in zip(simulations, outputs):
+                if "stream" in output:
+                    output = {"result": StepRecords.from_result(list(read_steps(output["stream"])))}
+                self.store.save(sim, output["result"])
+
+    def cache_report(self, outputs: list[dict]) -> str:
+        """
+        Sums up the KL cache counters of all simulations.
+
+        Args:
+            outputs (list[dict]): Outputs of `play_simulation`.
+
+        Returns:
+            str: Cache summary to append to the elapsed time, or an empty string if caching is disabled.
+        """
+        stats = [output["cache"] for output in outputs if output["cache"]]
+        if not stats:
+            return ""
+        return " | " + format_cache_stats({key: sum(s[key] for s in stats) for key in stats[0]})
+
+    def straggler_report(self, simulations: list[Simulation], outputs: list[dict]) -> str:
+        """
+        Names the played simulations that took more than twice the median playing time, see `Progress.stragglers`.
+
+        Args:
+            simulations (list[Simulation]): The played simulations.
+            outputs (list[dict]): Their outputs of `play_simulation`.
+
+        Returns:
+            str: Seed and playing time of every straggler, slowest first, to append to the elapsed time, or an empty
+                string if there is none.
+        """
+        progress = Progress([self.name] * len(outputs))
+        for index, output in enumerate(outputs):
+            if "time" in output:
+                progress.record(index, output["time"])
+        slow = progress.stragglers()
+        if not slow:
+            return ""
+        return " | stragglers: " + ", ".join(f"seed {simulations[index].id} ({round(progress.runtimes[index], 3)}s)"
+                                             for index in slow)
+
+    def update_task_costs(self, outputs: list[dict]) -> None:
+        """
+        Saves the mean playing time per seed of this game in the TASK_COSTS_FILE, to order the tasks of later runs.
+
+        Args:
+            outputs (list[dict]): Outputs of `play_simulation`.
+        """
+        times = [output["time"] for output in outputs if "time" in output]
+        if self.conf("TASK_COSTS_FILE") and times:
+            TaskCosts(self.conf("TASK_COSTS_FILE")).update(self.name, times)
 
     def output(self, results: list, filename: str) -> None:
         """
-        Saves simulation results to a JSON file.
+        Saves simulation results in the RESULT_FORMAT of the file name: columnar .npz (with RESULT_PRECISION), a .jsonl
+        folder (finalized with its manifest) or JSON.
 
         Args:
-            results (list): List of simulation results.
+            results (list): List of simulation results, each a list of dicts, `StepRecords` or a streamed seed file.
             filename (str): Filename to save the results.
         """
         if self.write_to_file:
             start = timer()
-            save_data_as_json(results, filename)
+            save_results(results, filename, self.conf("RESULT_PRECISION"))
             print(f"Saving time: {round(timer() - start, 2)}s")
         else:
             return results
@@ -77,10 +242,50 @@ def play_simulation(sim: Simulation) -> dict:
     """
     Plays a simulation. This is just a function for parallel processing.
 
+    The KL cache lives in the process that plays the simulation, so the cache counters
+    of this simulation are returned along with the result and the cache is saved to the shard of the process.
+
+    With RESULT_TRANSFER "memmap", the simulation writes its records into a memory-mapped file and only the
+    descriptor of the file ("records") is returned instead of the result, so it isn't pickled back to the parent.
+    A simulation with an outfile streams its result there and only the file name ("stream") is returned.
+
     Args:
         sim (Simulation): A `Simulation` instance.
 
     Returns:
-        dict: The result of the simulation.
+        dict: The result of the simulation ("result"), the descriptor of its records ("records") or its streamed file
+            ("stream"), its KL cache counters ("cache") and its playing time ("time").
+    """
+    start = timer()
+    before = Ift.cache_stats()
+    if sim.outfile:
+        sim.play_stream(sim.outfile)
+        result = {"stream": sim.outfile}
+    elif sim.conf("RESULT_TRANSFER") == "memmap":
+        result = {"records": sim.play_records(make_transfer_path(sim.conf("RESULT_TRANSFER_FOLDER"))).descriptor()}
+    else:
+        result = {"result": sim.play()}
+    Ift.save_cache()
+    after = Ift.cache_stats()
+    cache = {key: after[key] - before[key] for key in ("hits", "misses", "evictions")} if after else None
+    return {**result, "cache": cache, "time": timer() - start}
+
+def receive_output(output: dict) -> dict:
+    """
+    Maps the records of an output of `play_simulation` that were sent back as a descriptor.
+
+    Args:
+        output (dict): Output of `play_simulation`.
+
+    Returns:
+        dict: The output with the `StepRecords` as "result".
     """
-    return sim.play()
+    if "records" not in output:
+        return output
+    output = dict(output)
+    output["result"] = StepRecords.attach(output.pop("records"))
+    return output
+
+def warm_up_worker() -> None:
+    """Compiles the JAX kernels of the KL solver once when a worker of the pool is started."""
+    Ift.warm_up()
@@ -1,10 +1,13 @@
 import numpy as np
-from scipy.special import digamma, betaln
+from scipy.special import digamma
 from scipy.optimize import minimize
 from jax import grad, jacfwd, jacrev, jit
 from jax.numpy import maximum
 from jax.scipy.special import gammaln
 from .info import Info
+from .solvers import beta_KL, newton_minimize_KL, maximum_lie_size, maximum_lie_size_many
+from .cache import LRUCache, merge_shards
+from .kl_table import KLTable
 from config import init_conf
 
 class IFT:
@@ -13,8 +16,22 @@ class IFT:
     """
 
     def __init__(self) -> None:
-        """Initializes IFT with configuration settings."""
+        """Initializes IFT with configuration settings and the optional KL minimization cache.
+
+        The interpolation table of the "TABLE" mode is only loaded (and built) by the first minimization that uses it.
+        """
         self.conf = init_conf()
+        self.cache = None
+        if self.conf("KL_CACHE_SIZE"):
+            settings = tuple(self.conf(key) for key in ("MINIMIZE_FUNCTION", "MIN_KL", "MAX_COUNT"))
+            self.cache = LRUCache(self.conf("KL_CACHE_SIZE"), self.conf("KL_CACHE_DECIMALS"), self.conf("KL_CACHE_FILE"),
+                                  settings)
+        self.table = None
+
+    def load_table(self) -> KLTable:
+        """Loads (and builds on first use) the interpolation table for the "TABLE" mode."""
+        return KLTable(self.conf("TABLE_U_MIN"), self.conf("TABLE_U_MAX"), self.conf("TABLE_SIZE"),
+                       self.conf("TABLE_MAX_ERROR"), self.conf("TABLE_FOLDER"), self.conf("MIN_KL"))
 
     def match(self, trust: float, Itruth: Info, Ilie: Info, Istart: Info) -> Info:
         """Matches moments based on trust level.
@@ -47,6 +64,58 @@ class IFT:
         mu, la = self.minimize_KL(u, v, Istart.mu, Istart.la)
         return Info(mu, la)
     
+    def match_batch(self, trust: list[float], Itruth: list[Info], Ilie: list[Info], Istart: list[Info]) -> list[Info]:
+        """Matches moments for many (trust, Itruth, Ilie) triples in one vectorized pass.
+
+        Equivalent to calling `match` for every entry. The trust == 0 and trust == 1
+        shortcuts are applied by masks, all other entries share one KL minimization.
+
+        Args:
+            trust (list[float]): Trust levels between 0 and 1.
+            Itruth (list[Info]): Info instances representing the truthful distributions.
+            Ilie (list[Info]): Info instances representing the deceptive distributions.
+            Istart (list[Info]): Starting Info instances (replaced by matched moments, as in `match`).
+
+        Returns:
+            list[Info]: The matched distributions in the order of the inputs.
+        """
+        trust = np.asarray(trust, dtype=float)
+        results = [Ilie[i] if t == 0 else Itruth[i] for i, t in enumerate(trust)]
+        idx = np.flatnonzero((trust != 0) & (trust != 1))
+        if not len(idx):
+            return results
+
+        t = trust[idx]
+        truth_mu, truth_la = np.array([[Itruth[i].mu, Itruth[i].la] for i in idx]).T
+        lie_mu, lie_la = np.array([[Ilie[i].mu, Ilie[i].la] for i in idx]).T
+        start_mu, start_la = self.match_moments_many(t, truth_mu, truth_la, lie_mu, lie_la)
+        digamma_truth, digamma_lie = digamma(truth_mu + truth_la + 2), digamma(lie_mu + lie_la + 2)
+        u = t * (digamma_truth - digamma(truth_mu + 1)) + (1 - t) * (digamma_lie - digamma(lie_mu + 1))
+        v = t * (digamma_truth - digamma(truth_la + 1)) + (1 - t) * (digamma_lie - digamma(lie_la + 1))
+        mu, la = self.minimize_KL_many(u, v, start_mu, start_la)
+        for i, m, l in zip(idx, mu, la):
+            results[i] = Info(float(m), float(l))
+        return results
+
+    def match_moments_many(self, trust: np.ndarray, truth_mu: np.ndarray, truth_la: np.ndarray,
+                           lie_mu: np.ndarray, lie_la: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+        """Array version of `match_moments` working on the Info parameters directly.
+
+        Args:
+            trust (np.ndarray): Trust levels between 0 and 1.
+            truth_mu, truth_la (np.ndarray): Parameters of the truthful distributions.
+            lie_mu, lie_la (np.ndarray): Parameters of the deceptive distributions.
+
+        Returns:
+            tuple[np.ndarray, np.ndarray]: mu and la of the matched moments.
+        """
+        mh = (truth_mu + 1) / (truth_mu + truth_la + 2)
+        mn = (lie_mu + 1) / (lie_mu + lie_la + 2)
+        mean = trust * mh + (1 - trust) * mn
+        var = trust * (mh * (1 - mh) / (truth_mu + truth_la + 3) + mh**2) + \
+              (1 - trust) * (mn * (1 - mn) / (lie_mu + lie_la + 3) + mn**2) - mean**2
+        return mean ** 2 * (1 - mean) / var - mean - 1, mean * (1 - mean) ** 2 / var + mean - 2
+
     def match_moments(self, trust: float, Itruth: Info, Ilie: Info) -> Info:
         """Matches moments between two Info instances based on trust level.
 
@@ -90,15 +159,65 @@ class IFT:
         Returns:
             float: The Kullback-Leibler divergence between IP and IQ.
         """
-        muP, muQ = IP.mu, IQ.mu
-        laP, laQ = IP.la, IQ.la
-        digamma_muP_laP = digamma(muP + laP + 2)
-        temp = (
-            (muP - muQ) * (digamma(muP + 1) - digamma_muP_laP) +
-            (laP - laQ) * (digamma(laP + 1) - digamma_muP_laP) +
-            betaln(muQ + 1, laQ + 1) - betaln(muP + 1, laP + 1)
-        )
-        return temp
+        return beta_KL(IP.mu, IP.la, IQ.mu, IQ.la)
+
+    def KL_many(self, P_mu, P_la, Q_mu, Q_la) -> np.ndarray:
+        """Calculates Kullback-Leibler divergences between Beta distributions given as arrays of parameters.
+
+        Args:
+            P_mu (array_like): First shape parameter(s) of the first distribution(s).
+            P_la (array_like): Second shape parameter(s) of the first distribution(s).
+            Q_mu (array_like): First shape parameter(s) of the second distribution(s).
+            Q_la (array_like): Second shape parameter(s) of the second distribution(s).
+
+        Returns:
+            np.ndarray: The divergences with the broadcast shape of the inputs.
+        """
+        return beta_KL(*(np.asarray(x, dtype=float) for x in (P_mu, P_la, Q_mu, Q_la)))
+
+    def pairwise_KL(self, infos: list[Info]) -> np.ndarray:
+        """Calculates the Kullback-Leibler divergences between all pairs of Info instances,
+        e.g. between the opinions of all agents on one topic.
+
+        Args:
+            infos (list[Info]): Info instances to compare.
+
+        Returns:
+            np.ndarray: Matrix whose entry [i, j] is KL(infos[i], infos[j]).
+        """
+        mu = np.array([info.mu for info in infos], dtype=float)
+        la = np.array([info.la for info in infos], dtype=float)
+        return self.KL_many(mu[:, None], la[:, None], mu[None, :], la[None, :])
+
+    def maximum_lie_size(self, assumed_opinion: Info, tolerance: float, friend: bool) -> float:
+        """Finds the lie size x with KL(assumed_opinion + Info(x, 0), assumed_opinion) = tolerance.
+
+        Args:
+            assumed_opinion (Info): Opinion the lie is added to.
+            tolerance (float): KL divergence the lie may cause.
+            friend (bool): Whether the lie is Info(x, 0) (True) or Info(0, x) (False).
+
+        Returns:
+            float: The maximum lie size.
+        """
+        return maximum_lie_size(assumed_opinion.mu, assumed_opinion.la, tolerance, friend,
+                                tol=self.conf("NEWTON_TOL"), max_iter=self.conf("NEWTON_MAX_ITER"))
+
+    def maximum_lie_size_many(self, assumed_opinions: list[Info], tolerances: np.ndarray, friends: np.ndarray) -> np.ndarray:
+        """Batch version of `maximum_lie_size` for many (assumed opinion, tolerance) pairs.
+
+        Args:
+            assumed_opinions (list[Info]): Opinions the lies are added to.
+            tolerances (np.ndarray): KL divergences the lies may cause.
+            friends (np.ndarray): Whether each lie is Info(x, 0) (True) or Info(0, x) (False).
+
+        Returns:
+            np.ndarray: The maximum lie sizes.
+        """
+        mu = np.array([info.mu for info in assumed_opinions], dtype=float)
+        la = np.array([info.la for info in assumed_opinions], dtype=float)
+        return maximum_lie_size_many(mu, la, tolerances, friends,
+                                     tol=self.conf("NEWTON_TOL"), max_iter=self.conf("NEWTON_MAX_ITER"))
 
     def get_info_difference(self, P: Info, Q: Info) -> Info:
         """Returns the difference between two Info instances.
@@ -112,16 +231,41 @@ class IFT:
         """
         if (result := P - Q).check_positive():
             return result
-        return Info(0, 0)
+        return Info.ZERO
     
     def minimize_KL(self, u: float, v: float, mu_start: float = 0, la_start: float = 0) -> tuple[float, float]:
-        """Minimizes the KL divergence based on specified moments.
+        """Minimizes the KL divergence based on specified moments. Results are memoized if KL_CACHE_SIZE > 0.
+
+        Args:
+            u (float): First moment.
+            v (float): Second moment.
+            mu_start (float, optional): Initial guess for mu. Defaults to 0.
+            la_start (float, optional): Initial guess for la. Defaults to 0.
+
+        Returns:
+            tuple[float, float]: A tuple containing the optimized mu and la values.
+        """
+        if self.cache is None:
+            return self.solve_KL(u, v, mu_start, la_start)
+        key = self.cache.key(u, v)
+        if (result := self.cache.get(key)) is None:
+            result = self.solve_KL(u, v, mu_start, la_start)
+            self.cache.put(key, result)
+        return result
+
+    def warm_up(self) -> None:
+        """Runs one KL minimization (without the cache), so that the JAX kernels of the solver are compiled."""
+        self.solve_KL(1.0, 1.0)
+
+    def solve_KL(self, u: float, v: float, mu_start: float = 0, la_start: float = 0, method: str = None) -> tuple[float, float]:
+        """Runs the KL minimization selected by MINIMIZE_FUNCTION.
 
         Args:
             u (float): First moment.
             v (float): Second moment.
             mu_start (float, optional): Initial guess for mu. Defaults to 0.
             la_start (float, optional): Initial guess for la. Defaults to 0.
+            method (str, optional): Overrides MINIMIZE_FUNCTION. Defaults to None.
 
         Returns:
             tuple[float, float]: A tuple containing the optimized mu and la values.
@@ -135,8 +279,9 @@ class IFT:
         def hes_loss(J: np.ndarray) -> np.ndarray:
             return jhessLoss(u, v, self.conf("MIN_KL"), J)
 
+        method = method or self.conf("MINIMIZE_FUNCTION")
         initial_guess = [mu_start, la_start]
-        if self.conf("MINIMIZE_FUNCTION") == "ACCURATE":
+        if method == "ACCURATE":
             fun0, fun1, res1 = 1, 0, initial_guess
             while fun1 < fun0:
                 res0 = minimize(rev_loss, res1, method="trust-exact", jac=jac_loss, hess=hes_loss, tol=self.conf("GTOL"))
@@ -145,9 +290,118 @@ class IFT:
                 fun1, res1 = res1.fun, res1.x
             return res1[0], res1[1]
         
-        elif self.conf("MINIMIZE_FUNCTION") == "SHORT":
+        elif method == "SHORT":
             res0 = minimize(rev_loss, initial_guess, method="trust-exact", jac=jac_loss, hess=hes_loss, tol=self.conf("GTOL")).x
             return res0[0], res0[1]
+
+        elif method == "NEWTON":
+            mu, la = self.newton_minimize_KL(u, v, mu_start, la_start)
+            return float(mu), float(la)
+
+        elif method == "TABLE":
+            mu, la = self.table_minimize_KL(u, v, mu_start, la_start)
+            return float(mu[0]), float(la[0])
+
+    def minimize_KL_many(self, u: np.ndarray, v: np.ndarray, mu_start: np.ndarray, la_start: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+        """Minimizes the KL divergence for arrays of moments with the configured MINIMIZE_FUNCTION.
+
+        "NEWTON" and "TABLE" solve all pairs in one vectorized call, the scipy based modes fall back to one call per pair.
+        With the KL cache enabled, only the pairs that miss the cache are solved.
+
+        Args:
+            u (np.ndarray): First moments.
+            v (np.ndarray): Second moments.
+            mu_start (np.ndarray): Initial guesses for mu.
+            la_start (np.ndarray): Initial guesses for la.
+
+        Returns:
+            tuple[np.ndarray, np.ndarray]: Arrays with the optimized mu and la values.
+        """
+        if self.cache is None:
+            return self.solve_KL_many(u, v, mu_start, la_start)
+
+        keys = [self.cache.key(*args) for args in zip(u, v)]
+        results = [self.cache.get(key) for key in keys]
+        missing = [i for i, result in enumerate(results) if result is None]
+        if missing:
+            mu, la = self.solve_KL_many(*(np.asarray(x)[missing] for x in (u, v, mu_start, la_start)))
+            for i, m, l in zip(missing, mu, la):
+                results[i] = (float(m), float(l))
+                self.cache.put(keys[i], results[i])
+        return np.array([r[0] for r in results]), np.array([r[1] for r in results])
+
+    def solve_KL_many(self, u: np.ndarray, v: np.ndarray, mu_start: np.ndarray, la_start: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+        """Array version of `solve_KL`. Vectorized for "NEWTON" and "TABLE", one call per pair otherwise."""
+        if self.conf("MINIMIZE_FUNCTION") == "NEWTON":
+            return self.newton_minimize_KL(u, v, mu_start, la_start)
+        if self.conf("MINIMIZE_FUNCTION") == "TABLE":
+            return self.table_minimize_KL(u, v, mu_start, la_start)
+        results = [self.solve_KL(*args) for args in zip(u, v, mu_start, la_start)]
+        return np.array([r[0] for r in results]), np.array([r[1] for r in results])
+
+    def cache_stats(self) -> dict:
+        """Returns the counters of the KL cache, or None if caching is disabled."""
+        return self.cache.stats() if self.cache else None
+
+    def save_cache(self) -> None:
+        """Saves the KL cache to the shard of this process if a KL_CACHE_FILE is configured."""
+        if self.cache:
+            self.cache.save()
+
+    def merge_cache(self) -> None:
+        """Merges the KL cache shards of all processes into the KL_CACHE_FILE, see `merge_shards`."""
+        if self.cache and self.cache.filename:
+            merge_shards(self.cache.filename, self.cache.size)
+
+    def newton_minimize_KL(self, u, v, mu_start=0, la_start=0) -> tuple[np.ndarray, np.ndarray]:
+        """Minimizes the KL divergence for many moment pairs at once with the native Newton solver.
+
+        Pairs that the Newton solver doesn't converge (failed line search, NEWTON_MAX_ITER reached or moments that
+        miss (u, v) by more than NEWTON_SHORT_TOL) are solved again one by one with the "SHORT" mode.
+
+        Args:
+            u (array_like): First moment(s).
+            v (array_like): Second moment(s).
+            mu_start (array_like, optional): Initial guess(es) for mu. Defaults to 0.
+            la_start (array_like, optional): Initial guess(es) for la. Defaults to 0.
+
+        Returns:
+            tuple[np.ndarray, np.ndarray]: Arrays with the optimized mu and la values.
+        """
+        u, v, mu_start, la_start = np.broadcast_arrays(*(np.asarray(x, dtype=float) for x in (u, v, mu_start, la_start)))
+        mu, la, converged = newton_minimize_KL(u, v, mu_start, la_start, MIN_KL=self.conf("MIN_KL"),
+                                               tol=self.conf("NEWTON_TOL"), max_iter=self.conf("NEWTON_MAX_ITER"),
+                                               residual_tol=self.conf("NEWTON_SHORT_TOL"), full_output=True)
+        for i in np.flatnonzero(~converged):
+            mu.flat[i], la.flat[i] = self.solve_KL(u.flat[i], v.flat[i], mu_start.flat[i], la_start.flat[i], method="SHORT")
+        return mu, la
+
+    def table_minimize_KL(self, u, v, mu_start=0, la_start=0) -> tuple[np.ndarray, np.ndarray]:
+        """Looks up the KL minimization in the interpolation table, solving misses with the Newton solver.
+
+        Args:
+            u (array_like): First moment(s).
+            v (array_like): Second moment(s).
+            mu_start (array_like, optional): Initial guess(es) for mu of the fallback. Defaults to 0.
+            la_start (array_like, optional): Initial guess(es) for la of the fallback. Defaults to 0.
+
+        Returns:
+            tuple[np.ndarray, np.ndarray]: Arrays with the optimized mu and la values.
+        """
+        self.table = self.table or self.load_table()
+        return self.table.solve(u, v, mu_start, la_start, solver=self.newton_minimize_KL)
+
+    def table_accuracy_report(self, n_samples: int = 200) -> dict:
+        """Compares the interpolation table with the "ACCURATE" mode on random moment pairs.
+
+        Args:
+            n_samples (int, optional): Number of sampled moment pairs. Defaults to 200.
+
+        Returns:
+            dict: Fraction of queries served from the table and the maximum and mean relative error.
+        """
+        self.table = self.table or self.load_table()
+        return self.table.accuracy_report(lambda u, v: self.solve_KL(u, v, method="ACCURATE"), n_samples)
         
 @jit
 def jLoss(u: float, v: float, MIN_KL: float, J: np.ndarray) -> float:
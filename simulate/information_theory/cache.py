@@ -0,0 +1,148 @@
+import os
+import glob
+import pickle
+from itertools import islice
+from collections import OrderedDict
+
+
+class LRUCache:
+    """
+    Bounded least-recently-used cache for results of the KL minimization.
+
+    Keys are quantized (u, v) moment pairs, so inputs that only differ by floating point noise share an entry.
+    They start with the settings the results depend on, so a persisted cache never serves results computed
+    with a different configuration.
+
+    Attributes:
+        size (int): Maximum number of entries.
+        decimals (int): Number of decimals the moments are rounded to for the key.
+        settings (tuple): Values that are prepended to every key.
+        filename (str): Optional file to persist the cache across runs and worker processes. Every process saves
+            its entries to its own shard next to it (see `shard_path`), which `merge_shards` merges into the file.
+        hits (int): Number of successful lookups.
+        misses (int): Number of failed lookups.
+        evictions (int): Number of entries dropped because the cache was full.
+        changed (bool): True if entries were added since the last save.
+    """
+
+    def __init__(self, size: int, decimals: int, filename: str = None, settings: tuple = ()) -> None:
+        """Initializes an empty cache and loads the persisted entries if the file exists.
+
+        Args:
+            size (int): Maximum number of entries.
+            decimals (int): Number of decimals the moments are rounded to for the key.
+            filename (str, optional): File to load from and save to. Defaults to None.
+            settings (tuple, optional): Values that are prepended to every key. Defaults to ().
+        """
+        self.size = size
+        self.decimals = decimals
+        self.settings = tuple(settings)
+        self.filename = filename
+        self.entries = OrderedDict()
+        self.hits, self.misses, self.evictions = 0, 0, 0
+        self.changed = False
+        if filename and os.path.exists(filename):
+            self.entries = newest(load_entries(filename), size)
+
+    def key(self, *values: float) -> tuple:
+        """Returns the quantized key for the given values, prefixed with the settings."""
+        return self.settings + tuple(round(float(value), self.decimals) for value in values)
+
+    def get(self, key: tuple) -> any:
+        """Returns the cached value and marks it as recently used, or None if the key is missing."""
+        if key in self.entries:
+            self.hits += 1
+            self.entries.move_to_end(key)
+            return self.entries[key]
+        self.misses += 1
+        return None
+
+    def put(self, key: tuple, value: any) -> None:
+        """Stores a value and evicts the least recently used entries if the cache is full."""
+        self.entries[key] = value
+        self.entries.move_to_end(key)
+        self.changed = True
+        self.trim()
+
+    def trim(self) -> None:
+        """Drops the least recently used entries until the cache fits its size."""
+        while len(self.entries) > self.size:
+            self.entries.popitem(last=False)
+            self.evictions += 1
+
+    def stats(self) -> dict:
+        """Returns the hit, miss and eviction counters and the current number of entries."""
+        return {"hits": self.hits, "misses": self.misses, "evictions": self.evictions, "entries": len(self.entries)}
+
+    def shard_path(self) -> str:
+        """Returns the shard of the cache file that this process saves to."""
+        return f"{self.filename}.{os.getpid()}.shard"
+
+    def save(self) -> None:
+        """Saves the in-memory entries to the shard of this process if they changed since the last save.
+
+        No other process writes the shard, so it is only replaced atomically for `merge_shards`, which may read it
+        at any time.
+        """
+        if not self.filename or not self.changed:
+            return
+        write_entries(self.entries, self.shard_path())
+        self.changed = False
+
+
+def load_entries(filename: str) -> OrderedDict:
+    """Loads persisted entries, least recently used first. Unreadable files are treated as empty."""
+    try:
+        with open(filename, "rb") as file:
+            return pickle.load(file)
+    except (OSError, EOFError, pickle.UnpicklingError):
+        return OrderedDict()
+
+def write_entries(entries: OrderedDict, filename: str) -> None:
+    """Writes entries to a temporary file and replaces the file atomically."""
+    os.makedirs(os.path.dirname(filename) or ".", exist_ok=True)
+    tmp_filename = f"{filename}.{os.getpid()}.tmp"
+    with open(tmp_filename, "wb") as file:
+        pickle.dump(entries, file)
+    os.replace(tmp_filename, filename)
+
+def newest(entries: OrderedDict, size: int) -> OrderedDict:
+    """Returns the `size` most recently used entries."""
+    return OrderedDict(islice(entries.items(), max(0, len(entries) - size), None))
+
+def merge_shards(filename: str, size: int) -> None:
+    """Merges the shards of all processes into the cache file and removes them.
+
+    Called by the parent process once per game, when no worker is saving. Shards count as more recent than the
+    entries of the file, newer shards as more recent than older ones; the least recently used entries beyond `size`
+    are dropped.
+
+    Args:
+        filename (str): The cache file.
+        size (int): Maximum number of entries.
+    """
+    shards = sorted(glob.glob(f"{glob.escape(filename)}.*.shard"), key=os.path.getmtime)
+    if not shards:
+        return
+    entries = load_entries(filename) if os.path.exists(filename) else OrderedDict()
+    for shard in shards:
+        for key, value in load_entries(shard).items():
+            entries[key] = value
+            entries.move_to_end(key)
+    write_entries(newest(entries, size), filename)
+    for shard in shards:
+        os.remove(shard)
+
+
+def format_cache_stats(stats: dict) -> str:
+    """Formats cache counters for printing, e.g. next to the elapsed time of a game.
+
+    Args:
+        stats (dict): Counters as returned by `LRUCache.stats`.
+
+    Returns:
+        str: Human-readable summary including the hit rate.
+    """
+    lookups = stats["hits"] + stats["misses"]
+    hit_rate = 100 * stats["hits"] / lookups if lookups else 0
+    return f"KL cache: {stats['hits']} hits, {stats['misses']} misses ({hit_rate:.1f}% hit rate), {stats['evictions']} evictions"
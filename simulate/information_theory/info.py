@@ -1,32 +1,51 @@
+import numpy as np
 MAX_COUNT = 1e6
 
 class Info:
     """
     Represents information with parameters for a Beta distribution.
     Instances of this class are the main mathematical object for Information Theoretical calculations in simulation.
+    Instances are immutable, so they can be shared freely, e.g. the constants `Info.ZERO`, `Info.TRUE` and `Info.FALSE`.
 
     Attributes:
         mu (float): First shape parameter of the Beta distribution.
         la (float): Second shape parameter of the Beta distribution.
         mean (float): Mean of the Beta distribution calculated from mu and la.
     """
+    __slots__ = ("mu", "la")
 
     def __init__(self, mu: float = 0, la: float = 0) -> None:
         """
-        Initializes Info with mu and la parameters.
+        Initializes Info with mu and la parameters. Counts beyond MAX_COUNT are rescaled.
 
         Args:
             mu (float): First shape parameter (default is 0).
             la (float): Second shape parameter (default is 0).
         """
-        MIN_KL = -0.9999
-        self.mu, self.la = max(mu, MIN_KL), max(la, MIN_KL)
-        total = mu+la
         if (total := mu + la) > MAX_COUNT: #limit to a million counts
             mu = MAX_COUNT * mu / total # rescaled
             la = MAX_COUNT * la / total # rescaled
-        self.mu, self.la = mu, la
-    
+        _set_mu(self, mu)
+        _set_la(self, la)
+
+    @classmethod
+    def _make(cls, mu: float, la: float) -> 'Info':
+        """Creates an Info from values that are known to be valid, skipping the MAX_COUNT check."""
+        info = object.__new__(cls)
+        _set_mu(info, mu)
+        _set_la(info, la)
+        return info
+
+    def __setattr__(self, name: str, value: any) -> None:
+        raise AttributeError("Info is immutable")
+
+    def __delattr__(self, name: str) -> None:
+        raise AttributeError("Info is immutable")
+
+    def __reduce__(self) -> tuple:
+        """Pickles Info by its parameters."""
+        return (Info._make, (self.mu, self.la))
+
     @property
     def mean(self):
         """Returns mean of the Beta distribution"""
@@ -47,6 +66,8 @@ class Info:
 
     def __mul__(self, a: float) -> 'Info':
         """Multiplies by a scalar."""
+        if 0 <= a <= 1:  # cannot exceed MAX_COUNT
+            return Info._make(a * self.mu, a * self.la)
         return Info(a * self.mu, a * self.la)
 
     def __rmul__(self, a: float) -> 'Info':
@@ -54,20 +75,21 @@ class Info:
         return self * a
     
     def round(self, digits: int) -> 'Info':
-        """Rounds mu and la to specified digits."""
-        self.mu = round(self.mu, digits)
-        self.la = round(self.la, digits)
-        return self
+        """Returns a new Info with mu and la rounded to specified digits."""
+        return Info._make(round(self.mu, digits), round(self.la, digits))
     
     def round_mean(self) -> float:
         """Returns the rounded mean value."""
         return float(round(self.mean, 3))
 
     def draw(self) -> float:
-        """Draws a sample from the Beta distribution."""
-        from scipy.stats import beta as Beta
-        return Beta.random_state.beta(self.mu + 1, self.la + 1)
+        """Draws a sample from the Beta distribution with the global random state (as scipy.stats.beta does)."""
+        return np.random.beta(self.mu + 1, self.la + 1)
     
     def check_positive(self) -> bool:
         """Checks if mu and la are non-negative."""
         return (self.mu >= 0) & (self.la >= 0)
+
+
+_set_mu, _set_la = Info.mu.__set__, Info.la.__set__
+Info.ZERO, Info.TRUE, Info.FALSE = Info(0, 0), Info(1, 0), Info(0, 1)
@@ -0,0 +1,174 @@
+import os
+import numpy as np
+from .solvers import newton_minimize_KL, approximate_start
+
+
+class KLTable:
+    """
+    Precomputed interpolation table for the KL projection (u, v) -> (mu, la).
+
+    The map is tabulated once on a log-spaced grid in u and v and stored as a single `.npy` file,
+    which is opened memory-mapped and read-only, so all pool workers share the same pages.
+    The table holds the difference between log(1 + mu), log(1 + la) and the closed-form
+    `approximate_start`; this residual is smooth and is interpolated bilinearly in (log u, log v).
+    For every grid cell the interpolation error at the cell center is stored as well; queries outside
+    the grid or in cells whose error exceeds `max_error` are reported as misses and must be solved exactly.
+
+    Attributes:
+        u_min (float): Lower bound of the grid in u and v.
+        u_max (float): Upper bound of the grid in u and v.
+        size (int): Number of grid points per axis.
+        max_error (float): Largest accepted relative interpolation error of a cell.
+        table (np.ndarray): Array of shape (size, size, 3) with the residuals of mu and la at the grid points
+            and the interpolation error of the cell starting at that point.
+    """
+
+    def __init__(self, u_min: float, u_max: float, size: int, max_error: float, folder: str, MIN_KL: float) -> None:
+        """Loads the table for the given grid from `folder`, building and saving it first if necessary.
+
+        Args:
+            u_min (float): Lower bound of the grid in u and v.
+            u_max (float): Upper bound of the grid in u and v.
+            size (int): Number of grid points per axis.
+            max_error (float): Largest accepted relative interpolation error of a cell.
+            folder (str): Folder where the table is stored.
+            MIN_KL (float): Lower bound for mu and la used by the exact solver.
+        """
+        self.u_min, self.u_max, self.size = u_min, u_max, size
+        self.max_error = max_error
+        self.MIN_KL = MIN_KL
+        self.log_grid = np.linspace(np.log(u_min), np.log(u_max), size)
+        self.step = self.log_grid[1] - self.log_grid[0]
+
+        self.filename = os.path.join(folder, f"kl_table_{u_min:g}_{u_max:g}_{size}_{MIN_KL:g}.npy")
+        if not os.path.exists(self.filename):
+            self.build()
+        self.table = np.load(self.filename, mmap_mode="r")
+
+    def build(self) -> None:
+        """Solves the KL projection on all grid points and cell centers and writes the table atomically."""
+        u, v = np.meshgrid(np.exp(self.log_grid), np.exp(self.log_grid), indexing="ij")
+        feasible = np.exp(-u) + np.exp(-v) < 1  # by Jensen's inequality, no Beta distribution has moments outside
+        table = np.full((self.size, self.size, 3), np.inf)
+        mu, la = newton_minimize_KL(u[feasible], v[feasible], MIN_KL=self.MIN_KL)
+        mu_approx, la_approx = approximate_start(u[feasible], v[feasible], self.MIN_KL)
+        table[feasible, 0] = np.log1p(mu) - np.log1p(mu_approx)
+        table[feasible, 1] = np.log1p(la) - np.log1p(la_approx)
+        self.table = table
+
+        centers = np.exp(self.log_grid[:-1] + 0.5 * self.step)
+        u_c, v_c = np.meshgrid(centers, centers, indexing="ij")
+        mu_c, la_c = np.full(u_c.shape, np.nan), np.full(u_c.shape, np.nan)
+        feasible = np.exp(-u_c) + np.exp(-v_c) < 1
+        mu_c[feasible], la_c[feasible] = newton_minimize_KL(u_c[feasible], v_c[feasible], MIN_KL=self.MIN_KL)
+        mu_i, la_i, _ = self.interpolate(u_c, v_c)
+        error = np.maximum(np.abs(mu_i - mu_c) / (1 + np.abs(mu_c)), np.abs(la_i - la_c) / (1 + np.abs(la_c)))
+        table[:-1, :-1, 2] = np.where(np.isfinite(error), error, np.inf)
+
+        os.makedirs(os.path.dirname(self.filename) or ".", exist_ok=True)
+        tmp_filename = f"{self.filename}.{os.getpid()}.tmp.npy"
+        np.save(tmp_filename, table)
+        os.replace(tmp_filename, self.filename)
+
+    def interpolate(self, u: np.ndarray, v: np.ndarray) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """Bilinear interpolation of the table.
+
+        Args:
+            u (np.ndarray): First moments.
+            v (np.ndarray): Second moments.
+
+        Returns:
+            tuple[np.ndarray, np.ndarray, np.ndarray]: Interpolated mu and la, and the indices (i, j) of the
+                cells (stacked along the last axis; -1 where the query lies outside of the grid).
+        """
+        with np.errstate(divide="ignore", invalid="ignore"):
+            x = (np.log(u) - self.log_grid[0]) / self.step
+            y = (np.log(v) - self.log_grid[0]) / self.step
+        inside = (x >= 0) & (x <= self.size - 1) & (y >= 0) & (y <= self.size - 1)
+        i = np.clip(np.where(inside, x, 0).astype(int), 0, self.size - 2)
+        j = np.clip(np.where(inside, y, 0).astype(int), 0, self.size - 2)
+        fx, fy = (np.where(inside, x, 0) - i)[..., None], (np.where(inside, y, 0) - j)[..., None]
+
+        t = self.table
+        cells = np.where(inside[..., None], np.stack([i, j], axis=-1), -1)
+        mu_approx, la_approx = approximate_start(u, v, self.MIN_KL)
+        with np.errstate(invalid="ignore"):
+            values = ((1 - fx) * (1 - fy) * t[i, j, :2] + fx * (1 - fy) * t[i + 1, j, :2] +
+                      (1 - fx) * fy * t[i, j + 1, :2] + fx * fy * t[i + 1, j + 1, :2])
+            mu = np.expm1(np.log1p(mu_approx) + values[..., 0])
+            la = np.expm1(np.log1p(la_approx) + values[..., 1])
+        return mu, la, cells
+
+    def lookup(self, u, v) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """Looks up (mu, la) for arrays of moments.
+
+        Args:
+            u (array_like): First moments.
+            v (array_like): Second moments.
+
+        Returns:
+            tuple[np.ndarray, np.ndarray, np.ndarray]: Interpolated mu and la, and a boolean mask that is False
+                where the query is outside of the grid or the cell error exceeds `max_error`.
+        """
+        u, v = np.broadcast_arrays(np.asarray(u, dtype=float), np.asarray(v, dtype=float))
+        mu, la, cells = self.interpolate(u, v)
+        inside = cells[..., 0] >= 0
+        error = np.where(inside, self.table[cells[..., 0], cells[..., 1], 2], np.inf)
+        return mu, la, inside & (error <= self.max_error) & np.isfinite(mu) & np.isfinite(la)
+
+    def solve(self, u, v, mu_start=0, la_start=0, tol: float = 1e-12, max_iter: int = 100,
+              solver=None) -> tuple[np.ndarray, np.ndarray]:
+        """Looks up (mu, la) and falls back to the exact Newton solver for all misses.
+
+        Args:
+            u (array_like): First moments.
+            v (array_like): Second moments.
+            mu_start (array_like, optional): Initial guesses for the fallback. Defaults to 0.
+            la_start (array_like, optional): Initial guesses for the fallback. Defaults to 0.
+            tol (float, optional): Tolerance of the fallback solver. Defaults to 1e-12.
+            max_iter (int, optional): Maximum iterations of the fallback solver. Defaults to 100.
+            solver (callable, optional): Fallback (u, v, mu_start, la_start) -> (mu, la) for arrays, e.g.
+                `IFT.newton_minimize_KL`. Defaults to `newton_minimize_KL` with `tol` and `max_iter`.
+
+        Returns:
+            tuple[np.ndarray, np.ndarray]: mu and la for every (u, v) pair.
+        """
+        u, v, mu_start, la_start = np.broadcast_arrays(*(np.atleast_1d(np.asarray(x, dtype=float)) for x in (u, v, mu_start, la_start)))
+        mu, la, ok = self.lookup(u, v)
+        if not ok.all():
+            solver = solver or (lambda *args: newton_minimize_KL(*args, MIN_KL=self.MIN_KL, tol=tol, max_iter=max_iter))
+            mu[~ok], la[~ok] = solver(u[~ok], v[~ok], mu_start[~ok], la_start[~ok])
+        return mu, la
+
+    def accuracy_report(self, reference, n_samples: int = 200, seed: int = 0) -> dict:
+        """Compares table results with a reference solver on moments of random Info mixtures.
+
+        Args:
+            reference (callable): Function (u, v) -> (mu, la) for a single pair, e.g. the "ACCURATE" mode.
+            n_samples (int, optional): Number of sampled moment pairs. Defaults to 200.
+            seed (int, optional): Seed for sampling the moment pairs. Defaults to 0.
+
+        Returns:
+            dict: Fraction of queries served from the table, and the maximum and mean relative error
+                of the served queries.
+        """
+        from scipy.special import digamma
+        rng = np.random.default_rng(seed)
+        mu = rng.exponential(20, (n_samples, 2)) - 0.5
+        la = rng.exponential(20, (n_samples, 2)) - 0.5
+        trust = rng.uniform(0, 1, n_samples)
+        u = trust * (digamma(mu[:, 0] + la[:, 0] + 2) - digamma(mu[:, 0] + 1)) + \
+            (1 - trust) * (digamma(mu[:, 1] + la[:, 1] + 2) - digamma(mu[:, 1] + 1))
+        v = trust * (digamma(mu[:, 0] + la[:, 0] + 2) - digamma(la[:, 0] + 1)) + \
+            (1 - trust) * (digamma(mu[:, 1] + la[:, 1] + 2) - digamma(la[:, 1] + 1))
+
+        mu_t, la_t, ok = self.lookup(u, v)
+        ref = np.array([reference(*pair) for pair in zip(u[ok], v[ok])]).reshape(-1, 2)
+        error = np.maximum(np.abs(mu_t[ok] - ref[:, 0]) / (1 + np.abs(ref[:, 0])),
+                           np.abs(la_t[ok] - ref[:, 1]) / (1 + np.abs(ref[:, 1])))
+        return {
+            "n_samples": n_samples,
+            "table_rate": float(ok.mean()),
+            "max_error": float(error.max()) if len(error) else 0.0,
+            "mean_error": float(error.mean()) if len(error) else 0.0,
+        }
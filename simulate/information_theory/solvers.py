@@ -0,0 +1,284 @@
+import math
+import numpy as np
+from scipy.special import betaln, digamma, gammaln, polygamma, zeta
+
+
+def kl_loss(u: np.ndarray, v: np.ndarray, MIN_KL: float, mu: np.ndarray, la: np.ndarray) -> np.ndarray:
+    """NumPy version of the loss that is minimized by the KL projection (same as `jLoss`).
+
+    Args:
+        u (np.ndarray): First moment(s).
+        v (np.ndarray): Second moment(s).
+        MIN_KL (float): Lower bound for mu and la. Below it, the loss continues quadratically.
+        mu (np.ndarray): Current value(s) for mu.
+        la (np.ndarray): Current value(s) for la.
+
+    Returns:
+        np.ndarray: Loss value for every (u, v) pair.
+    """
+    mu_c, la_c = np.maximum(mu, MIN_KL), np.maximum(la, MIN_KL)
+    return (mu_c * u + la_c * v +
+            gammaln(mu_c + 1) + gammaln(la_c + 1) - gammaln(mu_c + la_c + 2) +
+            (mu - mu_c) ** 2 + (la - la_c) ** 2)
+
+
+def beta_KL(P_mu, P_la, Q_mu, Q_la):
+    """Kullback-Leibler divergence between Beta(P_mu + 1, P_la + 1) and Beta(Q_mu + 1, Q_la + 1).
+
+    Works on Python floats as well as on arrays, so scalar callers avoid the array conversion overhead.
+
+    Args:
+        P_mu (float | np.ndarray): First shape parameter(s) of the first distribution(s).
+        P_la (float | np.ndarray): Second shape parameter(s) of the first distribution(s).
+        Q_mu (float | np.ndarray): First shape parameter(s) of the second distribution(s).
+        Q_la (float | np.ndarray): Second shape parameter(s) of the second distribution(s).
+
+    Returns:
+        float | np.ndarray: The divergence(s).
+    """
+    digamma_P = digamma(P_mu + P_la + 2)
+    return (
+        (P_mu - Q_mu) * (digamma(P_mu + 1) - digamma_P) +
+        (P_la - Q_la) * (digamma(P_la + 1) - digamma_P) +
+        betaln(Q_mu + 1, Q_la + 1) - betaln(P_mu + 1, P_la + 1)
+    )
+
+
+def kl_gradient_hessian(u: np.ndarray, v: np.ndarray, MIN_KL: float, mu: np.ndarray, la: np.ndarray) -> tuple:
+    """Analytic gradient and Hessian of `kl_loss` using digamma and trigamma functions.
+
+    Args:
+        u (np.ndarray): First moment(s).
+        v (np.ndarray): Second moment(s).
+        MIN_KL (float): Lower bound for mu and la.
+        mu (np.ndarray): Current value(s) for mu.
+        la (np.ndarray): Current value(s) for la.
+
+    Returns:
+        tuple: (g_mu, g_la, h_mumu, h_mula, h_lala), each with the shape of the inputs.
+    """
+    free_mu, free_la = mu > MIN_KL, la > MIN_KL
+    mu_c, la_c = np.maximum(mu, MIN_KL), np.maximum(la, MIN_KL)
+    digamma_s, trigamma_s = digamma(mu_c + la_c + 2), polygamma(1, mu_c + la_c + 2)
+
+    g_mu = np.where(free_mu, u + digamma(mu_c + 1) - digamma_s, 2 * (mu - MIN_KL))
+    g_la = np.where(free_la, v + digamma(la_c + 1) - digamma_s, 2 * (la - MIN_KL))
+    h_mumu = np.where(free_mu, polygamma(1, mu_c + 1) - trigamma_s, 2)
+    h_lala = np.where(free_la, polygamma(1, la_c + 1) - trigamma_s, 2)
+    h_mula = np.where(free_mu & free_la, -trigamma_s, 0)
+    return g_mu, g_la, h_mumu, h_mula, h_lala
+
+
+def approximate_start(u: np.ndarray, v: np.ndarray, MIN_KL: float) -> tuple[np.ndarray, np.ndarray]:
+    """Closed-form starting point from the approximation digamma(x) ~ log(x - 1/2).
+
+    Args:
+        u (np.ndarray): First moment(s).
+        v (np.ndarray): Second moment(s).
+        MIN_KL (float): Lower bound for mu and la.
+
+    Returns:
+        tuple[np.ndarray, np.ndarray]: Approximate mu and la.
+    """
+    p, q = np.exp(-u), np.exp(-v)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        s = (1 - 0.5 * (p + q)) / (1 - p - q)
+    s = np.where(np.isfinite(s) & (s > 1), s, 2)
+    mu = np.maximum(p * (s - 0.5) - 0.5, 0.5 * (MIN_KL - 1))
+    la = np.maximum(q * (s - 0.5) - 0.5, 0.5 * (MIN_KL - 1))
+    return mu, la
+
+
+def newton_minimize_KL(u, v, mu_start=0, la_start=0, MIN_KL: float = -0.99999, tol: float = 1e-12,
+                       max_iter: int = 100, residual_tol: float = np.inf, full_output: bool = False) -> tuple:
+    """Vectorized damped Newton solver for the Beta KL projection.
+
+    Finds (mu, la) with digamma(mu + la + 2) - digamma(mu + 1) = u and
+    digamma(mu + la + 2) - digamma(la + 1) = v for every (u, v) pair at once.
+    The loss is convex, so Newton steps with a backtracking line search converge
+    from the better of the given start and a closed-form approximation.
+
+    A pair counts as converged when its Newton step is below `tol` and its moments match (u, v) within
+    `residual_tol`, or when its gradient is within the rounding error of the digamma terms (in the flat valleys of
+    large mu and la, the step size alone never gets below `tol`). Steps whose predicted decrease is below the rounding
+    error of the loss are taken without line search. A pair whose line search finds no decrease of the loss otherwise
+    stops there and is not converged, nor are pairs that reach `max_iter`.
+
+    Args:
+        u (array_like): First moment(s).
+        v (array_like): Second moment(s).
+        mu_start (array_like, optional): Initial guess for mu. Defaults to 0.
+        la_start (array_like, optional): Initial guess for la. Defaults to 0.
+        MIN_KL (float, optional): Lower bound for mu and la. Defaults to -0.99999.
+        tol (float, optional): Relative step size at which a pair counts as converged. Defaults to 1e-12.
+        max_iter (int, optional): Maximum number of Newton iterations. Defaults to 100.
+        residual_tol (float, optional): Largest accepted mismatch of the moments (the gradient of the loss in the
+            free parameters). Defaults to no check.
+        full_output (bool, optional): If True, the mask of converged pairs is returned as well. Defaults to False.
+
+    Returns:
+        tuple: Optimized mu and la with the broadcast shape of the inputs, and with `full_output` the boolean
+            mask of converged pairs.
+    """
+    u, v, mu_start, la_start = np.broadcast_arrays(*(np.asarray(x, dtype=float) for x in (u, v, mu_start, la_start)))
+    mu_approx, la_approx = approximate_start(u, v, MIN_KL)
+    valid_start = np.isfinite(mu_start) & np.isfinite(la_start)
+    mu_start, la_start = np.where(valid_start, mu_start, mu_approx), np.where(valid_start, la_start, la_approx)
+    use_start = kl_loss(u, v, MIN_KL, mu_start, la_start) < kl_loss(u, v, MIN_KL, mu_approx, la_approx)
+    mu, la = np.where(use_start, mu_start, mu_approx), np.where(use_start, la_start, la_approx)
+
+    active = np.ones(u.shape, dtype=bool)
+    converged = np.zeros(u.shape, dtype=bool)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        for _ in range(max_iter):
+            uu, vv, m, l = u[active], v[active], mu[active], la[active]
+            g_mu, g_la, h_mumu, h_mula, h_lala = kl_gradient_hessian(uu, vv, MIN_KL, m, l)
+            det = h_mumu * h_lala - h_mula ** 2
+            d_mu = (h_lala * g_mu - h_mula * g_la) / det
+            d_la = (h_mumu * g_la - h_mula * g_mu) / det
+
+            loss, t = kl_loss(uu, vv, MIN_KL, m, l), np.ones_like(m)
+            for _ in range(30):
+                worse = ~(kl_loss(uu, vv, MIN_KL, m - t * d_mu, l - t * d_la) <= loss)
+                if not worse.any():
+                    break
+                t = np.where(worse, 0.5 * t, t)
+            # near the optimum, the decrease of a Newton step is below the rounding error of the loss terms, so the
+            # line search can't see it and the full step is taken
+            mu_c, la_c = np.maximum(m, MIN_KL), np.maximum(l, MIN_KL)
+            loss_noise = 64 * np.finfo(float).eps * (1 + np.abs(mu_c * uu) + np.abs(la_c * vv) + np.abs(gammaln(mu_c + 1))
+                                                     + np.abs(gammaln(la_c + 1)) + np.abs(gammaln(mu_c + la_c + 2)))
+            unresolved = worse & (g_mu * d_mu + g_la * d_la <= loss_noise)
+            worse &= ~unresolved
+            t = np.where(unresolved, 1, np.where(worse, 0, t))
+
+            step_mu, step_la = np.where(worse, 0, t * d_mu), np.where(worse, 0, t * d_la)
+            mu[active], la[active] = m - step_mu, l - step_la
+            small = (np.abs(d_mu) <= tol * (1 + np.abs(m))) & (np.abs(d_la) <= tol * (1 + np.abs(l)))
+            done = (np.abs(step_mu) <= tol * (1 + np.abs(m))) & (np.abs(step_la) <= tol * (1 + np.abs(l)))
+            # a gradient within the rounding error of its digamma terms is the optimum as far as floating point can tell
+            noise = 16 * np.finfo(float).eps * (1 + 2 * np.abs(digamma(mu_c + la_c + 2)))
+            stalled = (np.abs(np.where(m > MIN_KL, g_mu, 0)) <= noise * (1 + np.abs(uu))) & \
+                (np.abs(np.where(l > MIN_KL, g_la, 0)) <= noise * (1 + np.abs(vv)))
+            converged[active] = small | (done & ~worse) | stalled
+            active[active] = ~(done | worse | stalled)
+            if not active.any():
+                break
+        converged &= ~active
+        if np.isfinite(residual_tol):
+            g_mu, g_la, *_ = kl_gradient_hessian(u, v, MIN_KL, mu, la)
+            residual = np.maximum(np.where(mu > MIN_KL, np.abs(g_mu), 0), np.where(la > MIN_KL, np.abs(g_la), 0))
+            converged &= residual <= residual_tol
+    return (mu, la, converged) if full_output else (mu, la)
+
+
+def lie_KL(mu: np.ndarray, la: np.ndarray, y: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+    """KL divergence between Info(mu + y, la) and Info(mu, la) and its derivative with respect to y.
+
+    The derivative follows from the derivative of betaln and simplifies to
+    y * (trigamma(mu + y + 1) - trigamma(mu + y + la + 2)), which is positive for y > 0.
+
+    Args:
+        mu (np.ndarray): Shape parameter that the lie is added to.
+        la (np.ndarray): Other shape parameter.
+        y (np.ndarray): Size of the lie.
+
+    Returns:
+        tuple[np.ndarray, np.ndarray]: KL divergence and its derivative for every input.
+    """
+    a, s = mu + y + 1, mu + y + la + 2
+    kl = y * (digamma(a) - digamma(s)) + betaln(mu + 1, la + 1) - betaln(a, la + 1)
+    return kl, y * (zeta(2, a) - zeta(2, s))  # zeta(2, x) is the trigamma function
+
+
+def maximum_lie_size_many(mu, la, tolerance, friend=True, tol: float = 1e-12, max_iter: int = 100) -> np.ndarray:
+    """Vectorized solver for the lie size y with KL(A + Info(y, 0), A) = tolerance, A = Info(mu, la).
+
+    For foes the lie is Info(0, y), i.e. mu and la swap roles. The KL divergence grows monotonically in y,
+    quadratically for small and logarithmically for large lies, so the root is found by Newton steps on
+    log KL over log y. Each step updates a bracket around the root and falls back to bisection whenever
+    a Newton step leaves it.
+
+    Args:
+        mu (array_like): First shape parameter(s) of the assumed opinion.
+        la (array_like): Second shape parameter(s) of the assumed opinion.
+        tolerance (array_like): KL divergence(s) the lie may cause.
+        friend (array_like, optional): Whether the lie is added to mu (True) or la (False). Defaults to True.
+        tol (float, optional): Relative step size at which a lie counts as converged. Defaults to 1e-12.
+        max_iter (int, optional): Maximum number of iterations. Defaults to 100.
+
+    Returns:
+        np.ndarray: Lie sizes with the broadcast shape of the inputs; 0 for non-positive tolerances.
+    """
+    mu, la, tolerance, friend = np.broadcast_arrays(np.asarray(mu, dtype=float), np.asarray(la, dtype=float),
+                                                    np.asarray(tolerance, dtype=float), np.asarray(friend, dtype=bool))
+    shape = mu.shape
+    mu, la, tolerance, friend = (np.atleast_1d(x) for x in (mu, la, tolerance, friend))
+    m, l = np.where(friend, mu, la), np.where(friend, la, mu)
+    log_y = np.full(mu.shape, -np.inf)
+    active = tolerance > 0
+
+    with np.errstate(divide="ignore", invalid="ignore", over="ignore"):
+        curvature = 0.5 * (zeta(2, m + 1) - zeta(2, m + l + 2))  # KL ~ curvature * y^2 for small y
+        log_y[active] = 0.5 * np.log(tolerance[active] / curvature[active])
+        low, high = np.full(mu.shape, -np.inf), np.full(mu.shape, np.inf)
+        for _ in range(max_iter):
+            mm, ll, t, s = m[active], l[active], tolerance[active], log_y[active]
+            y = np.exp(s)
+            kl, dkl = lie_KL(mm, ll, y)
+            below = kl < t
+            lo, hi = np.where(below, s, low[active]), np.where(below, high[active], s)
+
+            s_new = s - (np.log(kl) - np.log(t)) * kl / (y * dkl)
+            outside = ~((s_new > lo) & (s_new < hi))
+            fallback = np.where(np.isfinite(lo) & np.isfinite(hi), 0.5 * (lo + hi), np.where(below, s + 1, s - 1))
+            s_new = np.where(outside, fallback, s_new)
+
+            log_y[active], low[active], high[active] = s_new, lo, hi
+            converged = (np.abs(s_new - s) <= tol) | (hi - lo <= tol)
+            active[active] = ~converged
+            if not active.any():
+                break
+    return np.exp(log_y).reshape(shape)
+
+
+def maximum_lie_size(mu: float, la: float, tolerance: float, friend: bool = True,
+                     tol: float = 1e-12, max_iter: int = 100) -> float:
+    """Scalar version of `maximum_lie_size_many`, without the array overhead for single lies.
+
+    Args:
+        mu (float): First shape parameter of the assumed opinion.
+        la (float): Second shape parameter of the assumed opinion.
+        tolerance (float): KL divergence the lie may cause.
+        friend (bool, optional): Whether the lie is added to mu (True) or la (False). Defaults to True.
+        tol (float, optional): Relative step size at which the lie counts as converged. Defaults to 1e-12.
+        max_iter (int, optional): Maximum number of iterations. Defaults to 100.
+
+    Returns:
+        float: Lie size; 0 for non-positive tolerances.
+    """
+    if not tolerance > 0:
+        return 0.0
+    m, l = (mu, la) if friend else (la, mu)
+    s = 0.5 * math.log(tolerance / (0.5 * (zeta(2, m + 1) - zeta(2, m + l + 2))))
+    low, high = -math.inf, math.inf
+    for _ in range(max_iter):
+        y = math.exp(s)
+        kl, dkl = lie_KL(m, l, y)
+        if kl < tolerance:
+            low = s
+        else:
+            high = s
+        if kl > 0 and dkl > 0:
+            s_new = s - (math.log(kl) - math.log(tolerance)) * kl / (y * dkl)
+        else:
+            s_new = math.nan
+        if not low < s_new < high:
+            if math.isfinite(low) and math.isfinite(high):
+                s_new = 0.5 * (low + high)
+            else:
+                s_new = s + 1 if kl < tolerance else s - 1
+        if abs(s_new - s) <= tol or high - low <= tol:
+            return math.exp(s_new)
+        s = s_new
+    return math.exp(s)
@@ -0,0 +1,413 @@
+import numpy as np
+import jax
+import jax.experimental
+import jax.numpy as jnp
+from jax import lax
+from jax.scipy.special import betaln, digamma, gammaln
+
+from config.config_loader.config_checker import check_jax_engine
+from helper import make_seed_dict
+from .information_theory.info import MAX_COUNT
+
+# float64 only inside the engine, the rest of the package keeps the jax default; moved out of experimental in newer jax
+enable_x64 = jax.enable_x64 if hasattr(jax, "enable_x64") else jax.experimental.enable_x64
+
+STREAMS = ("recipients", "topic", "egocentric", "aggressive", "honests", "lies", "blush")
+CHARACTER_FLAGS = ("honesty", "aggressive", "strategic", "listening", "shyness", "shameless",
+                   "disturbing", "flattering", "naive", "uncritical", "egocentric")
+RECORD_FIELDS = ("Iself", "Ipartner", "Iothers", "Jself", "Jpartner", "lastK", "kappa", "friendships", "Itopic")
+DRAWS_PER_STREAM = 3  # uniform draws per stream and conversation
+NEWTON_TOL, NEWTON_MAX_ITER, LINE_SEARCH_STEPS = 1e-12, 50, 20
+
+
+class JaxEngine:
+    """
+    Plays all simulations of a game at once with JAX ("jax" ENGINE).
+
+    One one_to_one conversation is a pure function over the array state of a simulation. `lax.scan` compiles
+    the n_rounds * n_agents conversations and `vmap` batches all seeds, so a game is a single XLA call.
+    Random draws use `jax.random` keys made from the seeds of `make_seed_dict`, so the runs are statistically
+    equivalent to the "python" engine, but not identical to it. The results have the format of `Simulation.play`.
+
+    Attributes:
+        conf (callable): Configuration of the game.
+    """
+
+    def __init__(self, conf: callable) -> None:
+        """Initializes the engine and checks that the configuration is supported.
+
+        Args:
+            conf (callable): Configuration of the game.
+
+        Raises:
+            ConfigError: If the configuration uses features the engine does not implement. Configurations with
+                ENGINE "jax" are already checked when they are loaded.
+        """
+        self.conf = conf
+        check_jax_engine(conf)
+
+    def run(self, simulations: list) -> list[list[dict]]:
+        """Plays the simulations and returns their results.
+
+        Args:
+            simulations (list[Simulation]): Simulations with the same number of agents. Only their setup is used.
+
+        Returns:
+            list[list[dict]]: The result of every simulation, as returned by `Simulation.play`.
+        """
+        with enable_x64(True):
+            state = self.stack([self.initial_state(sim) for sim in simulations])
+            params = self.stack([self.character_params(sim) for sim in simulations])
+            keys = jnp.stack([jnp.stack([jax.random.PRNGKey(make_seed_dict(sim.id, self.conf)[stream]) for stream in STREAMS])
+                              for sim in simulations])
+            n_steps = self.conf("n_rounds") * self.conf("n_agents")
+            records = jax.tree_util.tree_map(np.asarray, play_simulations(state, params, keys, self.constants(), n_steps))
+        return [self.to_results(sim, jax.tree_util.tree_map(lambda x: x[i], records))
+                for i, sim in enumerate(simulations)]
+
+    def stack(self, trees: list[dict]) -> dict:
+        """Stacks the state or parameters of all simulations along a new first axis."""
+        return jax.tree_util.tree_map(lambda *xs: jnp.stack(xs), *trees)
+
+    def constants(self) -> tuple:
+        """Returns the configuration values used inside the compiled step as hashable (key, value) pairs."""
+        keys = ("MIN_KL", "BLUSH_FREQ_LIE", "F_CAUTION", "Q", "CONTINUOUS_FRIENDSHIP", "SCALED_FLATTERING",
+                "FRIENDSHIP_AFFECTS_B", "FRIENDSHIP_AFFECTS_C", "RELATION_AFFECTS_B", "RELATION_AFFECTS_C")
+        return tuple((key, float(self.conf(key) or 0)) for key in keys)
+
+    def initial_state(self, sim) -> dict:
+        """Converts the freshly initialized agents of a simulation into arrays.
+
+        Args:
+            sim (Simulation): The simulation.
+
+        Returns:
+            dict: I, Iothers, J, friendships, K, kappa and the conversation counters as arrays.
+        """
+        infos = lambda infos: [[info.mu, info.la] for info in infos]
+        n = self.conf("n_agents")
+        return {
+            "I": jnp.array([infos(agent.I) for agent in sim.agents], dtype=float),
+            "Iothers": jnp.array([[infos(row) for row in agent.Iothers] for agent in sim.agents], dtype=float),
+            "J": jnp.array([[infos(row) for row in agent.J] for agent in sim.agents], dtype=float),
+            "friendships": jnp.array([infos(agent.friendships) for agent in sim.agents], dtype=float),
+            "K": jnp.array([agent.K for agent in sim.agents], dtype=float),
+            "kappa": jnp.array([agent.kappa for agent in sim.agents], dtype=float),
+            "n_partner": jnp.zeros((n, n)),
+            "n_topic": jnp.zeros((n, n)),
+        }
+
+    def character_params(self, sim) -> dict:
+        """Collects the character attributes of all agents of a simulation into arrays.
+
+        Args:
+            sim (Simulation): The simulation.
+
+        Returns:
+            dict: One float array per character attribute, plus "ordinary".
+        """
+        params = {flag: jnp.array([float(getattr(agent, flag)) for agent in sim.agents]) for flag in CHARACTER_FLAGS}
+        params["ordinary"] = jnp.array([agent.character == "ordinary" for agent in sim.agents])
+        return params
+
+    def to_results(self, sim, records: dict) -> list[dict]:
+        """Converts the records of the scan into the result format of `Simulation.play`.
+
+        Args:
+            sim (Simulation): The simulation, for the initial state of its agents.
+            records (dict): Speaker, listener, topic and the RECORD_FIELDS of both per conversation.
+
+        Returns:
+            list[dict]: The initial state followed by the changes of every conversation.
+        """
+        results = [{i: sim.agents[i].Saver.initial_state() for i in self.conf("agents")}]
+        for speaker, listener, topic, values in zip(records["speaker"].tolist(), records["listener"].tolist(),
+                                                    records["topic"].tolist(), records["values"].tolist()):
+            results.append({agent: self.agent_state(agent, partner, topic, dict(zip(RECORD_FIELDS, row)))
+                            for agent, partner, row in ((speaker, listener, values[0]), (listener, speaker, values[1]))})
+        return results
+
+    def agent_state(self, agent: int, partner: int, topic: int, values: dict) -> dict:
+        """Builds the state of one agent after a conversation like `StateSaver.save_state`."""
+        state = {"topic": topic, "partner": partner, "id": agent}
+        state.update({key: float(round(values[key], 3)) for key in ("Iself", "Ipartner", "Iothers", "Jself", "Jpartner")})
+        state.update({"lastK": values["lastK"], "kappa": values["kappa"]})
+        if topic == agent:
+            state["friendships"] = values["friendships"]
+        if topic not in [agent, partner]:
+            state["Itopic"] = values["Itopic"]
+        return state
+
+
+def play_simulation(state: dict, params: dict, keys: jnp.ndarray, constants: tuple, n_steps: int) -> dict:
+    """Plays all conversations of one simulation with `lax.scan`; every agent speaks once per round.
+
+    Args:
+        state (dict): Initial array state.
+        params (dict): Character attributes of the agents.
+        keys (jnp.ndarray): One PRNG key per random stream (in the order of STREAMS).
+        constants (tuple): Configuration values as (key, value) pairs.
+        n_steps (int): Number of conversations.
+
+    Returns:
+        dict: Speaker, listener, topic and the recorded values of both per conversation.
+    """
+    n, constants = state["I"].shape[0], dict(constants)
+
+    def step(state, t):
+        speaker = t % n
+        uniforms = jax.vmap(lambda key: jax.random.uniform(jax.random.fold_in(key, t), (DRAWS_PER_STREAM,)))(keys)
+        u = dict(zip(STREAMS, uniforms))
+        listener, topic = initiate(state, params, constants, u, speaker, n)
+
+        def exchange(state, k):
+            """The speaker talks to the listener (k = 0), then the listener responds (k = 1)."""
+            a, b = jnp.where(k == 0, speaker, listener), jnp.where(k == 0, listener, speaker)
+            state, statement, blush = talk(state, params, constants, u, k, a, b, topic)
+            return receive(state, params, constants, b, a, topic, statement, blush)
+
+        state, receptions = lax.scan(exchange, state, jnp.arange(2))
+        reception, response_reception = (jax.tree_util.tree_map(lambda x: x[k], receptions) for k in range(2))
+        state = update(state, constants, topic, ((speaker, listener, response_reception), (listener, speaker, reception)))
+
+        values = jnp.stack([record(state, speaker, listener, topic), record(state, listener, speaker, topic)])
+        return state, {"speaker": speaker, "listener": listener, "topic": topic, "values": values}
+
+    return lax.scan(step, state, jnp.arange(n_steps))[1]
+
+
+# compiled once per process for every combination of constants and number of conversations
+play_simulations = jax.jit(jax.vmap(play_simulation, in_axes=(0, 0, 0, None, None)), static_argnums=(3, 4))
+
+
+def initiate(state, params, constants, u, speaker, n):
+    """Picks the listener and the topic of a one_to_one conversation like `Initiator`."""
+    agents = jnp.arange(n)
+    others = agents != speaker
+    friendship = info_mean(state["friendships"][speaker])
+    relation = state["n_topic"][speaker] + state["n_partner"][speaker] * constants["Q"]
+
+    # listener: uniform for ordinary agents, otherwise the best ranked one
+    other = jnp.floor(u["recipients"][0] * (n - 1)).astype(int)
+    strategic = params["strategic"][speaker]
+    opinion = info_mean(state["I"][speaker])
+    weights = (relation ** constants["RELATION_AFFECTS_B"] * friendship ** constants["FRIENDSHIP_AFFECTS_B"] *
+               params["shyness"][speaker] * jnp.where(strategic > 0, opinion, 1 - opinion) ** jnp.abs(strategic))
+    listener = jnp.where(params["ordinary"][speaker], other + (other >= speaker),
+                         draw_max(u["recipients"][1], weights, others))
+
+    # topic: uniform for ordinary agents, otherwise self (egocentric) or the best weighted one
+    friend_weights = friendship ** constants["FRIENDSHIP_AFFECTS_C"]
+    aggressive = params["aggressive"][speaker] > u["aggressive"][2]
+    weights = (relation ** constants["RELATION_AFFECTS_C"] * friend_weights * params["shyness"][speaker] *
+               friend_weights * (1 - friend_weights) ** aggressive)
+    egocentric = params["egocentric"][speaker] > u["egocentric"][0]
+    topic = jnp.where(params["ordinary"][speaker], jnp.floor(u["topic"][0] * n).astype(int),
+                      jnp.where(egocentric, speaker, draw_max(u["topic"][1], weights, agents >= 0)))
+    return listener, topic
+
+
+def talk(state, params, constants, u, k, a, listener, topic):
+    """Lets agent `a` make a statement about `topic` to `listener` like `Sender.talk`, including the awareness update."""
+    state = {**state, "n_partner": state["n_partner"].at[a, listener].add(1),
+             "n_topic": state["n_topic"].at[a, topic].add(1)}
+    honest = u["honests"][k] <= params["honesty"][a]
+
+    assumed = state["Iothers"][a, listener, topic]
+    tolerance = -jnp.log1p(-u["lies"][k]) * state["kappa"][a] * constants["F_CAUTION"]
+    tolerance = jnp.where(params["disturbing"][a] > 0, 2 * tolerance, tolerance)
+    friendship = info_mean(state["friendships"][a, topic])
+    lie = maximum_lie_size(assumed, tolerance, friendship > 0.5)
+
+    aggressive = params["aggressive"][a] > u["aggressive"][k]
+    scaling = jnp.where(constants["SCALED_FLATTERING"] > 0, 1 - info_mean(state["I"][a, topic]), 1)
+    continuous = jnp.where(aggressive, jnp.array([2 * (friendship - 0.5) * lie, 0.]), 0.)
+    discrete = jnp.array([(friendship > 0.5) * lie, (friendship < 0.5) * lie])
+    lie_info = jnp.where(a == topic, jnp.where(aggressive, jnp.array([lie, 0.]), 0.),
+               jnp.where((params["flattering"][a] > 0) & (topic == listener), jnp.array([lie * scaling, 0.]),
+               jnp.where(constants["CONTINUOUS_FRIENDSHIP"] > 0, continuous, discrete)))
+
+    statement = jnp.where(honest, state["I"][a, topic], make_info(assumed + lie_info))
+    blush = ~honest & (constants["BLUSH_FREQ_LIE"] > u["blush"][k] + params["shameless"][a])
+    state = {**state, "J": state["J"].at[a, a, topic].set(statement),
+             "I": state["I"].at[a, a].set(make_info(state["I"][a, a] + jnp.array([honest, ~honest], dtype=float)))}
+    return state, statement, blush
+
+
+def receive(state, params, constants, l, speaker, topic, statement, blush):
+    """Lets agent `l` receive a statement like `Receiver.receive`; the belief update is returned for `update`."""
+    n = state["I"].shape[0]
+
+    # friendship update if the listener is the topic
+    others = (jnp.arange(n) != l) & (jnp.arange(n) != speaker)
+    x_median = jnp.nanmedian(jnp.where(others, info_mean(state["J"][l, :, l]), jnp.nan))
+    current = state["friendships"][l, speaker]
+    mean = info_mean(statement)
+    update = jnp.where(mean > x_median, jnp.array([1., 0.]), jnp.where(mean < x_median, jnp.array([0., 1.]), current))
+    friendship = jnp.where(constants["CONTINUOUS_FRIENDSHIP"] > 0, make_info(current + update), update)
+    state = {**state, "friendships": state["friendships"].at[l, speaker].set(jnp.where(topic == l, friendship, current))}
+
+    # trust, including the surprise and kappa update
+    assumed_honesty = info_mean(state["I"][l, speaker])
+    listening = params["listening"][l] > 0
+    trusts_blindly = (params["naive"][l] > 0) | (listening & (speaker == topic) & (mean < assumed_honesty))
+    surprised = ~(params["naive"][l] > 0) & ~blush & ~trusts_blindly & listening & ~(params["uncritical"][l] > 0)
+    surprise = kl(statement, state["I"][l, topic])
+    K = jnp.where(surprised, jnp.append(state["K"][l, 1:], surprise), state["K"][l])
+    factor = jnp.where(surprised, 0.5 * (surprise / (state["kappa"][l] + 1e-6)) ** 2, 1.)
+    trust = assumed_honesty / (assumed_honesty + factor * (1 - constants["BLUSH_FREQ_LIE"] * (1 - assumed_honesty)))
+    trust = jnp.where(params["naive"][l] > 0, 1., jnp.where(blush, 0., jnp.where(trusts_blindly, 1., trust)))
+    state = {**state, "K": state["K"].at[l].set(K),
+             "kappa": state["kappa"].at[l].set(jnp.where(surprised, jnp.median(K) / jnp.sqrt(jnp.pi), state["kappa"][l]))}
+
+    # interpretation of the statement about the speaker and the topic
+    Inew = info_difference(statement, state["Iothers"][l, speaker, topic])
+    speaker_truth = jnp.where(speaker == topic, make_info(make_info(statement + jnp.array([1., 0.])) + Inew),
+                              make_info(state["I"][l, speaker] + jnp.array([1., 0.])))
+    speaker_lie = make_info(state["I"][l, speaker] + jnp.array([0., 1.]))
+    topic_truth, topic_lie = make_info(Inew + state["I"][l, topic]), state["I"][l, topic]
+    reception = {"trust": trust, "speaker": (speaker_truth, speaker_lie), "topic": (topic_truth, topic_lie)}
+
+    # theory of mind
+    Iothers = make_info(make_info(statement * trust) + make_info(state["Iothers"][l, speaker, topic] * (1 - trust)))
+    state = {**state, "Iothers": state["Iothers"].at[l, speaker, topic].set(Iothers),
+             "J": state["J"].at[l, speaker, topic].set(statement)}
+    return state, reception
+
+
+def update(state, constants, topic, updates):
+    """Updates the opinions of the agents about the topic and their partner like `Updater.update`.
+
+    `updates` holds (agent, speaker, reception) in the order of the updates in `Conversation`.
+    """
+    I = state["I"]
+    for a, speaker, reception in updates:
+        topic_match = match(reception["trust"], *reception["topic"], constants["MIN_KL"])
+        I = I.at[a, topic].set(jnp.where(speaker != topic, topic_match, I[a, topic]))
+        I = I.at[a, speaker].set(match(reception["trust"], *reception["speaker"], constants["MIN_KL"]))
+    return {**state, "I": I}
+
+
+def record(state, a, partner, topic):
+    """Returns the RECORD_FIELDS of agent `a` after a conversation."""
+    return jnp.array([
+        info_mean(state["I"][a, a]), info_mean(state["I"][a, partner]), info_mean(state["Iothers"][a, partner, topic]),
+        info_mean(state["J"][a, a, topic]), info_mean(state["J"][a, partner, topic]), state["K"][a, -1],
+        state["kappa"][a], info_mean(state["friendships"][a, partner]), info_mean(state["I"][a, topic])
+    ])
+
+
+def draw_max(u, weights, mask):
+    """Index of the maximum weight among `mask`, ties are broken by the uniform draw `u` like `draw_max_from_list`."""
+    weights = jnp.where(mask, weights, -jnp.inf)
+    ties = mask & (weights == weights.max())
+    return jnp.argmax(jnp.cumsum(ties) > jnp.floor(u * ties.sum()))
+
+
+def make_info(info):
+    """Rescales (mu, la) to at most MAX_COUNT counts like the `Info` constructor."""
+    total = info[0] + info[1]
+    return jnp.where(total > MAX_COUNT, MAX_COUNT * info / total, info)
+
+
+def info_mean(info):
+    """Mean of the Beta distribution(s) (mu, la) along the last axis."""
+    return (info[..., 0] + 1) / (info[..., 0] + info[..., 1] + 2)
+
+
+def info_difference(P, Q):
+    """P - Q if both parameters are non-negative, otherwise zero, like `Ift.get_info_difference`."""
+    difference = make_info(P - Q)
+    return jnp.where((difference >= 0).all(), difference, 0.)
+
+
+def kl(P, Q):
+    """Kullback-Leibler divergence between two Infos given as (mu, la), like `Ift.KL`."""
+    digamma_P = digamma(P[0] + P[1] + 2)
+    return ((P[0] - Q[0]) * (digamma(P[0] + 1) - digamma_P) + (P[1] - Q[1]) * (digamma(P[1] + 1) - digamma_P) +
+            betaln(Q[0] + 1, Q[1] + 1) - betaln(P[0] + 1, P[1] + 1))
+
+
+def match(trust, truth, lie, MIN_KL):
+    """Projects the trust-weighted mixture of truth and lie onto a Beta distribution like `Ift.match`."""
+    mh, mn = info_mean(truth), info_mean(lie)
+    mean = trust * mh + (1 - trust) * mn
+    var = (trust * (mh * (1 - mh) / (truth.sum() + 3) + mh ** 2) +
+           (1 - trust) * (mn * (1 - mn) / (lie.sum() + 3) + mn ** 2) - mean ** 2)
+    start = make_info(jnp.array([mean ** 2 * (1 - mean) / var - mean - 1, mean * (1 - mean) ** 2 / var + mean - 2]))
+
+    digamma_truth, digamma_lie = digamma(truth.sum() + 2), digamma(lie.sum() + 2)
+    u = trust * (digamma_truth - digamma(truth[0] + 1)) + (1 - trust) * (digamma_lie - digamma(lie[0] + 1))
+    v = trust * (digamma_truth - digamma(truth[1] + 1)) + (1 - trust) * (digamma_lie - digamma(lie[1] + 1))
+    matched = make_info(minimize_KL(u, v, start, MIN_KL))
+    return jnp.where(trust == 0, lie, jnp.where(trust == 1, truth, matched))
+
+
+def trigamma(x):
+    """Trigamma function for x > 0 by shifting x above 8 and the asymptotic series; cheaper to compile than `zeta`."""
+    shift = sum(1 / (x + k) ** 2 for k in range(8))
+    z = x + 8
+    return shift + 1 / z + 1 / (2 * z ** 2) + 1 / (6 * z ** 3) - 1 / (30 * z ** 5) + 1 / (42 * z ** 7) - 1 / (30 * z ** 9)
+
+
+def kl_loss(u, v, MIN_KL, mu, la):
+    """JAX version of `solvers.kl_loss`."""
+    mu_c, la_c = jnp.maximum(mu, MIN_KL), jnp.maximum(la, MIN_KL)
+    return (mu_c * u + la_c * v + gammaln(mu_c + 1) + gammaln(la_c + 1) - gammaln(mu_c + la_c + 2) +
+            (mu - mu_c) ** 2 + (la - la_c) ** 2)
+
+
+def minimize_KL(u, v, start, MIN_KL):
+    """Damped Newton minimization of the KL projection like `solvers.newton_minimize_KL`."""
+    p, q = jnp.exp(-u), jnp.exp(-v)
+    s = (1 - 0.5 * (p + q)) / (1 - p - q)
+    s = jnp.where(jnp.isfinite(s) & (s > 1), s, 2)
+    approx = jnp.maximum(jnp.array([p * (s - 0.5) - 0.5, q * (s - 0.5) - 0.5]), 0.5 * (MIN_KL - 1))
+    valid = jnp.isfinite(start).all() & (kl_loss(u, v, MIN_KL, *start) < kl_loss(u, v, MIN_KL, *approx))
+    steps = 0.5 ** jnp.arange(LINE_SEARCH_STEPS)
+
+    def newton_step(carry):
+        J, i, _ = carry
+        mu, la = J
+        free_mu, free_la = mu > MIN_KL, la > MIN_KL
+        mu_c, la_c = jnp.maximum(mu, MIN_KL), jnp.maximum(la, MIN_KL)
+        digamma_s, trigamma_s = digamma(mu_c + la_c + 2), trigamma(mu_c + la_c + 2)
+        g_mu = jnp.where(free_mu, u + digamma(mu_c + 1) - digamma_s, 2 * (mu - MIN_KL))
+        g_la = jnp.where(free_la, v + digamma(la_c + 1) - digamma_s, 2 * (la - MIN_KL))
+        h_mumu = jnp.where(free_mu, trigamma(mu_c + 1) - trigamma_s, 2.)
+        h_lala = jnp.where(free_la, trigamma(la_c + 1) - trigamma_s, 2.)
+        h_mula = jnp.where(free_mu & free_la, -trigamma_s, 0.)
+        det = h_mumu * h_lala - h_mula ** 2
+        d = jnp.array([h_lala * g_mu - h_mula * g_la, h_mumu * g_la - h_mula * g_mu]) / det
+
+        better = kl_loss(u, v, MIN_KL, mu - steps * d[0], la - steps * d[1]) <= kl_loss(u, v, MIN_KL, mu, la)
+        step = jnp.where(better.any(), steps[jnp.argmax(better)] * d, 0.)
+        return J - step, i + 1, (jnp.abs(step) > NEWTON_TOL * (1 + jnp.abs(J))).any()
+
+    converging = lambda carry: carry[2] & (carry[1] < NEWTON_MAX_ITER)
+    return lax.while_loop(converging, newton_step, (jnp.where(valid, start, approx), 0, True))[0]
+
+
+def maximum_lie_size(assumed, tolerance, friend):
+    """Lie size y with KL(assumed + Info(y, 0) or Info(0, y), assumed) = tolerance, like `solvers.maximum_lie_size`."""
+    m, l = jnp.where(friend, assumed[0], assumed[1]), jnp.where(friend, assumed[1], assumed[0])
+    positive = tolerance > 0
+    t = jnp.where(positive, tolerance, 1.)
+    s = 0.5 * jnp.log(t / (0.5 * (trigamma(m + 1) - trigamma(m + l + 2))))
+
+    def bracketed_newton_step(carry):
+        s, low, high, i, _ = carry
+        y = jnp.exp(s)
+        a, total = m + y + 1, m + y + l + 2
+        kl = y * (digamma(a) - digamma(total)) + betaln(m + 1, l + 1) - betaln(a, l + 1)
+        dkl = y * (trigamma(a) - trigamma(total))
+        below = kl < t
+        low, high = jnp.where(below, s, low), jnp.where(below, high, s)
+        s_new = s - (jnp.log(kl) - jnp.log(t)) * kl / (y * dkl)
+        fallback = jnp.where(jnp.isfinite(low) & jnp.isfinite(high), 0.5 * (low + high), jnp.where(below, s + 1, s - 1))
+        s_new = jnp.where((s_new > low) & (s_new < high), s_new, fallback)
+        return s_new, low, high, i + 1, jnp.abs(s_new - s) > NEWTON_TOL * (1 + jnp.abs(s))
+
+    converging = lambda carry: carry[4] & (carry[3] < NEWTON_MAX_ITER)
+    s = lax.while_loop(converging, bracketed_newton_step, (s, -jnp.inf, jnp.inf, 0, True))[0]
+    return jnp.where(positive, jnp.exp(s), 0.)
@@ -0,0 +1,100 @@
+import numpy as np
+
+
+class PlannedStream:
+    """
+    Replays values that were drawn from a random stream in advance, in the order they were drawn.
+
+    Stands in for the `RandomState` of a planned stream in the random dict, so the agents draw from it as usual.
+
+    Attributes:
+        values (list): The pre-drawn values (uniform or standard exponential).
+        position (int): Index of the next value.
+    """
+    __slots__ = ("values", "position")
+
+    def __init__(self, values: np.ndarray) -> None:
+        """Stores the pre-drawn values.
+
+        Args:
+            values (np.ndarray): Values in the order they were drawn.
+        """
+        self.values = values.tolist()
+        self.position = 0
+
+    def uniform(self) -> float:
+        """Returns the next value."""
+        value = self.values[self.position]
+        self.position += 1
+        return value
+
+    def exponential(self, scale: float = 1.0) -> float:
+        """Returns the next standard exponential value scaled like `RandomState.exponential`."""
+        return scale * self.uniform()
+
+
+class ConversationPlan:
+    """
+    Schedule of the random decisions of a simulation that do not depend on the agents' minds, drawn up front.
+
+    A stream is only drawn in advance if every draw from it is state-independent, so each `RandomState` is
+    consumed in exactly the same order as during a conversation-by-conversation run and results are identical.
+    - The setting of every conversation ("n_recipients") and the honesty draws ("honests", one per statement)
+      are always planned.
+    - If all agents are "ordinary", the listeners ("recipients") and topics ("topic") are random choices as well.
+      Then the speaker of every statement is known, hence which statements are lies, and the draws made for
+      lies ("lies", "aggressive", "blush") are planned too.
+    Strategic, egocentric or aggressive choices of other characters are still drawn during the conversation.
+
+    Attributes:
+        one_to_one (np.ndarray): Whether each conversation is one_to_one.
+        listeners (np.ndarray): Listener of each one_to_one conversation, -1 if not planned.
+        topics (np.ndarray): Topic of each conversation, -1 if not planned.
+    """
+
+    def __init__(self, random: dict, agents: list, conf: callable) -> None:
+        """Draws the plan and replaces the planned streams in `random` by `PlannedStream`s.
+
+        Args:
+            random (dict): Random dict of the simulation; it is shared with the agents.
+            agents (list[Agent]): Agents of the simulation.
+            conf (callable): Configuration of the simulation.
+        """
+        n, n_rounds = conf("n_agents"), conf("n_rounds")
+        speakers = np.tile(np.arange(n), n_rounds)
+        self.one_to_one = random["n_recipients"].uniform(size=len(speakers)) <= conf("p_one_to_one")
+        self.listeners = np.full(len(speakers), -1)
+        self.topics = np.full(len(speakers), -1)
+
+        ordinary = all(agent.character == "ordinary" for agent in agents)
+        if ordinary:
+            others = random["recipients"].randint(0, n - 1, size=self.one_to_one.sum())
+            self.listeners[self.one_to_one] = others + (others >= speakers[self.one_to_one])
+            self.topics = random["topic"].randint(0, n, size=len(speakers))
+
+        # every statement draws "honests": the speaker talks, in one_to_one conversations the listener responds
+        talks = np.stack([np.ones_like(self.one_to_one), self.one_to_one], axis=1)
+        talkers = np.stack([speakers, self.listeners], axis=1)[talks]
+        honests = random["honests"].uniform(size=len(talkers))
+        random["honests"] = PlannedStream(honests)
+
+        if ordinary:
+            n_lies = (honests > np.array([agent.honesty for agent in agents])[talkers]).sum()
+            random["lies"] = PlannedStream(random["lies"].standard_exponential(size=n_lies))
+            random["aggressive"] = PlannedStream(random["aggressive"].uniform(size=n_lies))
+            random["blush"] = PlannedStream(random["blush"].uniform(size=n_lies))
+
+    def initiation(self, t: int, agents: list[int]) -> tuple:
+        """Returns the planned setting, listeners and topic of conversation `t`.
+
+        Args:
+            t (int): Index of the conversation.
+            agents (list[int]): IDs of all agents.
+
+        Returns:
+            tuple: Setting, listeners (as returned by `Initiator.pick_listeners`) and topic; None where not planned.
+        """
+        listener, topic = int(self.listeners[t]), int(self.topics[t])
+        setting = "one_to_one" if self.one_to_one[t] else "one_to_all"
+        listeners = {"ids": [listener], "weights": [1]} if listener >= 0 else None
+        return setting, listeners, (agents[topic] if topic >= 0 else None)
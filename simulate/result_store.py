@@ -0,0 +1,104 @@
+import os
+import json
+import pickle
+import hashlib
+import numpy as np
+from helper import StepRecords, code_fingerprint
+from config import config as default_config
+
+class ResultStore:
+    """
+    Content-addressed store of simulation results, one file per seed.
+
+    Results are filed under a hash of everything that determines them: the configuration, the character setup and
+    the source code of the simulation (see `code_fingerprint`). Any change of a parameter (e.g. BLUSH_FREQ_LIE) or of
+    the code therefore leads to a different folder, i.e. a cache miss, while raising n_stat only plays the seeds that
+    are not stored yet.
+    Random honesties are drawn from the global random state and are not determined by the seed, so games with random
+    honesties are not stored at all (see `is_reproducible`). The honesties of a seed are still stored with its result
+    and checked on loading.
+
+    Attributes:
+        key (str): Hash of the configuration and the character setup.
+        folder (str): Folder of the per-seed result files.
+    """
+    VERSION = 1 # increase when the simulation changes its results, so that stored results are no longer used
+    # keys that don't change the result of a seed
+    IGNORED_KEYS = ("n_stat", "folder", "characters_dict", "sweep_dict", "RESULT_CACHE", "RESULT_CACHE_FOLDER",
+                    "KL_CACHE_FILE", "TABLE_FOLDER", "CONVERSATION_PLAN", "RANDOM_BLOCK_SIZE", "MIND_BACKEND",
+                    "SCHEDULING", "TASK_COSTS_FILE", "PROGRESS_INTERVAL", "RESULT_TRANSFER", "RESULT_TRANSFER_FOLDER",
+                    "RESULT_FORMAT", "RESULT_PRECISION", "STATISTICS_QUANTILES", "STATISTICS_CONFIDENCE",
+                    "POSTPROCESSING", "POSTPROCESSING_MIN_PARALLEL", "SELECT_CACHE",
+                    "SELECT_CACHE_FOLDER")
+
+    def __init__(self, characters_setup: dict, conf: callable) -> None:
+        """Hashes the configuration and the character setup.
+
+        Args:
+            characters_setup (dict): Character setup of the game.
+            conf (callable): Configuration of the game.
+        """
+        keys = set(default_config.conf) | set(getattr(getattr(conf, "__self__", None), "conf", {}))
+        content = {key: conf(key) for key in sorted(keys - set(self.IGNORED_KEYS))}
+        content.update({"characters": characters_setup, "version": self.VERSION, "code": code_fingerprint()})
+        self.key = hashlib.sha256(json.dumps(normalize(content), sort_keys=True).encode()).hexdigest()[:16]
+        self.folder = os.path.join(conf("RESULT_CACHE_FOLDER"), self.key)
+
+    @staticmethod
+    def is_reproducible(conf: callable) -> bool:
+        """Returns True if the seed determines the results of a game, i.e. its honesties are not drawn at random."""
+        return not (conf("RANDOM_HONESTIES") and not conf("honesties_dict"))
+
+    def path(self, seed: int) -> str:
+        """Returns the file of a seed."""
+        return os.path.join(self.folder, f"{seed}.pkl")
+
+    def load(self, sim) -> list | StepRecords | None:
+        """
+        Returns the stored result of a simulation.
+
+        Args:
+            sim (Simulation): The simulation (not played).
+
+        Returns:
+            list | StepRecords | None: The result, or None if it isn't stored or was played with different honesties.
+        """
+        try:
+            with open(self.path(sim.id), "rb") as file:
+                stored = pickle.load(file)
+        except (OSError, EOFError, pickle.UnpicklingError):
+            return None
+        return stored["result"] if stored["honesties"] == normalize(sim.honesties) else None
+
+    def save(self, sim, result: list | StepRecords) -> None:
+        """
+        Stores the result of a simulation. The file is replaced atomically, so parallel games can share a store.
+
+        Args:
+            sim (Simulation): The simulation.
+            result (list | StepRecords): Its result.
+        """
+        os.makedirs(self.folder, exist_ok=True)
+        tmp_path = f"{self.path(sim.id)}.{os.getpid()}.tmp"
+        with open(tmp_path, "wb") as file:
+            pickle.dump({"honesties": normalize(sim.honesties), "result": result}, file, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(tmp_path, self.path(sim.id))
+
+
+def normalize(value: any) -> any:
+    """
+    Converts a value into plain JSON types, with string keys and lists instead of tuples and arrays.
+
+    Args:
+        value (any): Config value, character setup or honesties.
+
+    Returns:
+        any: The normalized value.
+    """
+    if isinstance(value, dict):
+        return {str(key): normalize(item) for key, item in value.items()}
+    if isinstance(value, (list, tuple, np.ndarray)):
+        return [normalize(item) for item in value]
+    if isinstance(value, np.generic):
+        return value.item()
+    return value
@@ -0,0 +1,75 @@
+from timeit import default_timer as timer
+from helper import launch_parallel, Progress, TaskCosts
+from .game import Game, play_simulation, warm_up_worker
+
+def run_games(games: list[Game], override: bool = False) -> list:
+    """
+    Runs several games with one task queue, so all seeds of all games share the persistent worker pool.
+
+    Simulations of every game are flattened into (game index, simulation) tasks and their outputs are routed back
+    to their game, which stores and writes them like `Game.run` and reports the playing time of its own seeds.
+    The elapsed time of the whole batch is reported once at the end. Games with ENGINE "jax" play all their seeds at
+    once and are run on their own.
+    With SCHEDULING "dynamic" (read from the first game), the seeds of the games with the highest mean playing time
+    per seed in the TASK_COSTS_FILE are started first, and progress, throughput and ETA are reported per game.
+
+    Args:
+        games (list[Game]): Games to run, e.g. one per character setup.
+        override (bool, optional): If True, runs simulations even if the output file exists or their results are
+            stored. Defaults to False.
+
+    Returns:
+        list: The return value of `Game.run` of every game (None if it was skipped or wrote its results).
+    """
+    start_time = timer()
+    returns = [None] * len(games)
+    missing = {}
+    for index, game in enumerate(games):
+        if game.conf("ENGINE") == "jax":
+            returns[index] = game.run(override)
+        elif (simulations := game.prepare(override)) is not None:
+            missing[index] = simulations
+
+    tasks = [(index, sim) for index, simulations in missing.items() for sim in simulations]
+    outputs = [play_game_task(task) for task in tasks] if len(tasks) <= 1 else launch_game_tasks(games, tasks)
+
+    for index, simulations in missing.items():
+        game_outputs = [output for task_index, output in outputs if task_index == index]
+        returns[index] = games[index].finish(simulations, game_outputs)
+    print(f"Time elapsed for {len(games)} games: {round(timer() - start_time, 3)}s")
+    return returns
+
+
+def launch_game_tasks(games: list[Game], tasks: list[tuple]) -> list:
+    """
+    Plays the (game index, simulation) tasks of `run_games` in the worker pool.
+
+    Args:
+        games (list[Game]): The games.
+        tasks (list[tuple]): Index of the game and `Simulation` of every task.
+
+    Returns:
+        list: Output of `play_game_task` for every task, in order.
+    """
+    conf = games[0].conf
+    if conf("SCHEDULING") != "dynamic":
+        return launch_parallel(tasks, play_game_task, warm_up_worker)
+    names = [games[index].name for index, _ in tasks]
+    progress = Progress([index for index, _ in tasks], {index: game.name for index, game in enumerate(games)},
+                        interval=conf("PROGRESS_INTERVAL"))
+    return launch_parallel(tasks, play_game_task, warm_up_worker, dynamic=True,
+                           costs=TaskCosts(conf("TASK_COSTS_FILE")).estimate(names), progress=progress)
+
+
+def play_game_task(task: tuple) -> tuple:
+    """
+    Plays one simulation of `run_games`. This is just a function for parallel processing.
+
+    Args:
+        task (tuple): Index of the game and the `Simulation`.
+
+    Returns:
+        tuple: Index of the game and the output of `play_simulation`.
+    """
+    index, sim = task
+    return index, play_simulation(sim)
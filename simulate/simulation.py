@@ -1,23 +1,34 @@
 import numpy as np
+from typing import Iterator
 
-from helper import make_random_dict
+from helper import make_random_dict, StepRecords
+from helper.records import count_slots
+from helper.result_stream import StepWriter
 from .information_theory import Info
 from .agent import Agent
+from .agent.memory import SimulationMemory
 from .conversation import Conversation
+from .planner import ConversationPlan
 from evaluate import Logger
 
 class Simulation:
     """
     Manages the simulation process, including agent initialization, conversation scheduling, and running the simulation.
 
+    Only the seed and the setup are pickled (e.g. when sending the simulation to a worker); agents, random streams,
+    logger and conversations are rebuilt from them, so pickle a simulation before playing it.
+
     Attributes:
         conf (dict): Simulation configuration settings.
         random (dict): Randomized values generated using the seed.
         characters_setup (dict): Dictionary specifying character traits for agents.
         id (int): The unique identifier for this simulation (seed).
+        honesties (list): Honesty of every agent.
+        outfile (str): If set, `play_simulation` streams the result to this file instead of returning it.
         log (Logger): Logger for tracking simulation data.
+        memory (SimulationMemory): Minds of all agents for the "arrays" MIND_BACKEND, otherwise None.
         agents (list): List of initialized `Agent` objects.
-        conversations (list): List of scheduled `Conversation` objects.
+        conversations (list): One reusable `Conversation` per speaker.
     """
 
     def __init__(self, seed: int, characters_setup: dict, conf: dict):
@@ -30,58 +41,124 @@ class Simulation:
             conf (dict): Simulation configuration settings. Passed as arg to avoid loading again.
         """
         self.conf = conf
-        self.random = make_random_dict(seed)
         self.characters_setup = characters_setup
         self.id = seed
-        self.log = Logger(seed)
+        self.honesties = self.draw_honesties()
+        self.outfile = None
+        self.setup()
+
+    def __getstate__(self) -> dict:
+        """Pickles only the seed and the setup."""
+        return {key: self.__dict__[key] for key in ("conf", "characters_setup", "id", "honesties", "outfile")}
+
+    def __setstate__(self, state: dict) -> None:
+        """Restores the seed and the setup and rebuilds everything else."""
+        self.__dict__.update(state)
+        self.setup()
 
+    def setup(self) -> None:
+        """Creates the random streams, the logger, the agents and their conversations."""
+        self.random = make_random_dict(self.id, self.conf)
+        self.log = Logger(self.id)
         self.init_agents()
-        self.schedule_conversations()
+        self.conversations = [Conversation(speaker=agent, random=self.random, conf=self.conf, agents=self.agents)
+                              for agent in self.agents]
+
+    def draw_honesties(self) -> list:
+        """
+        Assigns honesty levels to the agents, either from the config or randomly.
+
+        Random honesties are drawn from the global random state, so they are drawn once here and kept in the setup.
+
+        Returns:
+            list: Honesty of every agent.
+        """
+        return (self.conf("honesties_dict") or 
+                sorted([Info.ZERO.draw() for _ in self.conf("agents")]) if self.conf("RANDOM_HONESTIES") 
+                else np.linspace(0, 1, self.conf("n_agents")))
 
     def init_agents(self):
         """
         Initializes agents for the simulation based on the configuration and character setup.
         
-        Agents are assigned honesty levels and characters either from the setup or randomly.
+        Agents get their honesty levels and characters from the setup.
         The random dict is simulation-specific, thus passed onto the simulation's agents.
         """
         agents = self.conf("agents")
-        honesties = (self.conf("honesties_dict") or 
-                    sorted([Info(0, 0).draw() for _ in agents]) if self.conf("RANDOM_HONESTIES") 
-                    else np.linspace(0, 1, self.conf("n_agents")))
         characters = [self.characters_setup.get(agent, self.characters_setup["all"]) for agent in agents]
         
-        self.agents = [Agent(id, honesties[id], character, self.random, self.log, self.conf) 
+        self.memory = SimulationMemory(self.conf("n_agents")) if self.conf("MIND_BACKEND") == "arrays" else None
+        self.agents = [Agent(id, self.honesties[id], character, self.random, self.log, self.conf, self.memory) 
                         for id, character in zip(agents, characters)]
     
-    def schedule_conversations(self) -> list[Conversation]:
+    def schedule_conversations(self) -> Iterator[Conversation]:
         """
-        Schedules conversations for the agents based on the configuration.
+        Schedules conversations for the agents lazily: every round, each agent speaks once.
 
-        Returns:
-            list[Conversation]: A list of `Conversation` objects scheduled for the simulation.
+        Yields:
+            Conversation: The reusable `Conversation` of the next speaker.
         """
-        self.conversations = [
-            Conversation(speaker=agent, random=self.random, 
-                         conf=self.conf, agents=self.agents)
-            for _ in range(self.conf("n_rounds"))
-            for _, agent in enumerate(self.agents)
-        ]
+        for _ in range(self.conf("n_rounds")):
+            yield from self.conversations
 
-    def play(self) -> list[dict]:
+    def steps(self) -> Iterator[dict]:
         """
-        Runs the simulation by processing each conversation round and logging the results.
+        Plays the simulation, yielding the initial state and then the changes of every conversation as they happen.
 
-        Returns:
-            list[dict]: A list of results containing initial states and outcomes of each conversation.
+        With CONVERSATION_PLAN, the state-independent random decisions are drawn up front by a `ConversationPlan`.
+
+        Yields:
+            dict: The initial states of all agents, then the result of each conversation.
         """
         print(f"Started simulation {self.id}")
         if self.conf("LOGGING"): self.log.initial_status(self.agents)
         
-        results = [{i: self.agents[i].Saver.initial_state() for i in self.conf("agents")}]
-        for t, c in enumerate(self.conversations):
+        yield {i: self.agents[i].Saver.initial_state() for i in self.conf("agents")}
+        plan = ConversationPlan(self.random, self.agents, self.conf) if self.conf("CONVERSATION_PLAN") else None
+        for t, c in enumerate(self.schedule_conversations()):
             if self.conf("LOGGING"): self.log.time(t)
-            results.append(c.run_conversation_protocol())
+            yield c.run_conversation_protocol(plan.initiation(t, self.conf("agents")) if plan else None)
 
         if self.conf("LOGGING"): self.log.save_data_as_json(self.characters_setup)
-        return results
+
+    def play(self) -> list[dict]:
+        """
+        Runs the simulation by processing each conversation round and logging the results.
+
+        Returns:
+            list[dict]: A list of results containing initial states and outcomes of each conversation.
+        """
+        return list(self.steps())
+
+    def play_records(self, path: str = None) -> StepRecords:
+        """
+        Runs the simulation and writes the result of every conversation into preallocated `StepRecords`.
+
+        Args:
+            path (str, optional): If given, the records are memory-mapped to this file. Defaults to None.
+
+        Returns:
+            StepRecords: The result of `play` as records.
+        """
+        steps = self.steps()
+        records = StepRecords.allocate(next(steps), self.conf("n_rounds") * self.conf("n_agents"), path,
+                                       count_slots(self.conf("n_agents"), self.conf("p_one_to_one")))
+        for t, entry in enumerate(steps, start=1):
+            records.write(t, entry)
+        return records
+
+    def play_stream(self, path: str) -> int:
+        """
+        Runs the simulation and writes the result of every conversation to a line-delimited JSON file as it happens,
+        so the history is never held in memory.
+
+        Args:
+            path (str): The seed file, see `StepWriter`.
+
+        Returns:
+            int: Number of written lines (initial state and conversations).
+        """
+        with StepWriter(path) as writer:
+            for entry in self.steps():
+                writer.write(entry)
+        return writer.n_lines
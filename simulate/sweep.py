@@ -0,0 +1,108 @@
+import os
+import json
+import hashlib
+import itertools
+from timeit import default_timer as timer
+from helper import save_data_as_json, results_exist
+from config import conf as default_conf, init_conf
+from config.config_loader.config_error import ConfigError
+from .game import Game
+from .scheduler import run_games
+from .result_store import normalize
+
+class Sweep:
+    """
+    Runs a game for every point of a parameter grid, with the simulations of all points in one worker pool.
+
+    Every grid point gets its own in-memory configuration (`init_conf(overrides)`), so config.yml is never edited.
+    The results of each point are written like a game's results, next to a manifest that lists all points. The file
+    name of a point holds a hash of its overrides (see `overrides_hash`), so changing a grid value never reuses the
+    file of other values.
+
+    Attributes:
+        name (str): Name of the sweep, used as its folder name.
+        folder (str): Folder of the result files and the manifest.
+        points (list[dict]): Index, overrides, characters, `Game` and result file (its outfile_name) of every grid point.
+    """
+    # read once per process by the information theory module, so they cannot differ between grid points
+    PROCESS_WIDE_KEYS = ("MINIMIZE_FUNCTION", "MIN_KL", "GTOL", "NEWTON_TOL", "NEWTON_MAX_ITER", "NEWTON_SHORT_TOL",
+                         "KL_CACHE_SIZE", "KL_CACHE_DECIMALS", "KL_CACHE_FILE", "TABLE_U_MIN", "TABLE_U_MAX",
+                         "TABLE_SIZE", "TABLE_MAX_ERROR", "TABLE_FOLDER")
+
+    def __init__(self, grid: dict | list[dict], characters_dict: list[dict] = None, name: str = "sweep",
+                 folder: str = None) -> None:
+        """Expands the grid and the character setups into grid points and sets up their games.
+
+        Args:
+            grid (dict | list[dict]): Either {key: [values]} (all combinations are run) or a list of override dicts.
+            characters_dict (list[dict], optional): Character setups, each combined with every override.
+                Defaults to characters_dict of config.yml.
+            name (str, optional): Name of the sweep. Defaults to "sweep".
+            folder (str, optional): Output folder. Defaults to the "sweeps/<name>" folder in the results folder.
+
+        Raises:
+            ConfigError: If an override changes a key that is read once per process.
+        """
+        self.name = name
+        self.folder = folder or os.path.join(default_conf("folder"), "sweeps", name)
+        self.points = []
+        for overrides, characters in itertools.product(self.expand_grid(grid), characters_dict or default_conf("characters_dict")):
+            for key in set(overrides) & set(self.PROCESS_WIDE_KEYS):
+                raise ConfigError(key, "read once per process, it can't be swept")
+            game = Game(conf=init_conf({**overrides, "characters_dict": [characters]}))
+            index = len(self.points)
+            game.outfile_name = os.path.join(self.folder, f"{index:03d}_{overrides_hash(overrides)}_"
+                                             + os.path.basename(game.outfile_name))
+            self.points.append({
+                "index": index, "overrides": overrides, "characters": game.characters_setup, "game": game,
+                "file": game.outfile_name
+            })
+
+    @staticmethod
+    def expand_grid(grid: dict | list[dict]) -> list[dict]:
+        """Returns the list of override dicts of a grid.
+
+        Args:
+            grid (dict | list[dict]): Either {key: [values]} or a list of override dicts.
+
+        Returns:
+            list[dict]: One dict of overrides per grid point.
+        """
+        if isinstance(grid, dict):
+            return [dict(zip(grid, values)) for values in itertools.product(*grid.values())]
+        return [dict(overrides) for overrides in grid]
+
+    def run(self, override: bool = False) -> dict:
+        """
+        Plays the simulations of all grid points in one pool and writes one result file per point and the manifest.
+
+        Points whose result file exists are skipped unless override is True. With RESULT_CACHE, only the seeds that
+        are not in the `ResultStore` of their point are played.
+
+        Args:
+            override (bool, optional): If True, reruns points whose result file exists or whose seeds are stored.
+                Defaults to False.
+
+        Returns:
+            dict: The manifest of the sweep.
+        """
+        start_time = timer()
+        pending = [point for point in self.points if override or not results_exist(point["file"])]
+        run_games([point["game"] for point in pending], override)
+        print(f"Sweep '{self.name}': {len(pending)} of {len(self.points)} points in {round(timer() - start_time, 3)}s")
+
+        manifest = {
+            "name": self.name,
+            "elapsed": round(timer() - start_time, 3),
+            "points": [{
+                "index": point["index"], "overrides": point["overrides"], "characters": point["characters"],
+                "n_stat": point["game"].conf("n_stat"), "file": point["file"], "rerun": point in pending
+            } for point in self.points]
+        }
+        save_data_as_json(manifest, os.path.join(self.folder, "manifest.json"))
+        return manifest
+
+
+def overrides_hash(overrides: dict) -> str:
+    """Returns the first 8 hex digits of the SHA-256 of the overrides of a grid point."""
+    return hashlib.sha256(json.dumps(normalize(overrides), sort_keys=True).encode()).hexdigest()[:8]
@@ -0,0 +1,33 @@
+import pickle
+import timeit
+import tracemalloc
+
+from config import conf
+from helper import make_random_dict
+from simulate.agent import Agent
+from simulate.information_theory import Info
+
+# Time of the arithmetic that agents run in every conversation
+I1, I2, trust = Info(7, 6), Info(3, 5), 0.3
+n = 200000
+for name, statement in {
+    "Info(mu, la)": lambda: Info(7, 6),
+    "I1 + I2": lambda: I1 + I2,
+    "I1 - I2": lambda: I1 - I2,
+    "I1 * trust + I2 * (1 - trust)": lambda: I1 * trust + I2 * (1 - trust),
+    "I1.round(2)": lambda: I1.round(2),
+}.items():
+    print(f"{name:32s} {1e9 * timeit.timeit(statement, number=n) / n:8.1f} ns")
+
+# Size of a single Info and of the memory of one agent
+print(f"pickled Info: {len(pickle.dumps(I1))} bytes")
+tracemalloc.start()
+snapshot = tracemalloc.take_snapshot()
+agents = [Agent(id, 0.5, "ordinary", make_random_dict(0), None, conf) for id in conf("agents")]
+for agent in agents:
+    agent.I = [agent.I[b] + Info(b, 1) for b in conf("agents")]
+stats = tracemalloc.take_snapshot().compare_to(snapshot, "filename")
+info_stats = [stat for stat in stats if stat.traceback[0].filename.endswith("info.py")]
+print(f"memory per Agent: {sum(stat.size_diff for stat in stats) / len(agents):.0f} bytes, "
+      f"thereof Info objects: {sum(stat.size_diff for stat in info_stats) / len(agents):.0f} bytes "
+      f"in {sum(stat.count_diff for stat in info_stats) / len(agents):.0f} allocations")
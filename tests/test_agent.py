@@ -1,4 +1,5 @@
 from simulate import Game
+from simulate.agent import Updater
 from simulate.information_theory import Info
 from config import init_conf
 
@@ -18,4 +19,24 @@ def test_updater_awareness():
 
     agent.Updater.awareness(True, 0, statement)
     update = agent.I[agent.id]
-    assert update.mu == self_info.mu + 1 and update.la == self_info.la + 1
\ No newline at end of file
+    assert update.mu == self_info.mu + 1 and update.la == self_info.la + 1
+
+def test_updater_update_batch():
+    listeners = game.simulations[0].agents[1:]
+    speaker, topic = 0, 1
+    receptions = [listener.Receiver.receive(topic=topic, speaker=speaker, statement=Info(4, 2), blush=False)
+                  for listener in listeners]
+
+    expected = []
+    for listener, reception in zip(listeners, receptions):
+        listener.Updater.add_to_buffer(reception)
+        I_before = list(listener.I)
+        listener.Updater.update(topic, speaker)
+        expected.append((listener.I[topic], listener.I[speaker]))
+        listener.I = I_before
+        listener.Updater.add_to_buffer(reception)
+
+    Updater.update_batch([listener.Updater for listener in listeners], topic, speaker)
+    for listener, (Itopic, Ispeaker) in zip(listeners, expected):
+        assert listener.I[topic].mu == Itopic.mu and listener.I[topic].la == Itopic.la
+        assert listener.I[speaker].mu == Ispeaker.mu and listener.I[speaker].la == Ispeaker.la
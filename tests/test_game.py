@@ -1,3 +1,5 @@
+import os
+import json
 import pytest
 
 from simulate import Game, Simulation
@@ -10,3 +12,143 @@ def test_setup():
     assert len(game.simulations) == conf("n_stat")
     for simulation in game.simulations:
         assert isinstance(simulation, Simulation)
+
+def test_sweep(tmp_path):
+    import json
+    from simulate import Sweep
+    from helper import load_results
+    from config import init_conf
+    from config.config_loader.config_error import ConfigError
+    assert init_conf({"BLUSH_FREQ_LIE": 0.3})("BLUSH_FREQ_LIE") == 0.3 and conf("BLUSH_FREQ_LIE") != 0.3
+
+    sweep = Sweep({"BLUSH_FREQ_LIE": [0.05, 0.2], "n_stat": [2], "n_rounds": [3], "RESULT_CACHE": [True],
+                   "RESULT_CACHE_FOLDER": [str(tmp_path)]},
+                  [{"all": "ordinary"}, {0: "manipulative"}], folder=str(tmp_path))
+    manifest = sweep.run()
+    assert len(manifest["points"]) == 4 and all(point["rerun"] for point in manifest["points"])
+    assert sweep.points[1]["game"].conf("BLUSH_FREQ_LIE") == 0.05 and sweep.points[2]["game"].conf("BLUSH_FREQ_LIE") == 0.2
+    for point in manifest["points"]:
+        assert point["file"].endswith(".npz") and len(load_results(point["file"])) == 2
+    assert not any(point["rerun"] for point in sweep.run()["points"])
+
+    changed = Sweep({"BLUSH_FREQ_LIE": [0.3], "n_stat": [2], "n_rounds": [3]}, [{"all": "ordinary"}], folder=str(tmp_path))
+    point = changed.run()["points"][0]
+    assert point["rerun"] and point["file"] != manifest["points"][0]["file"]
+
+    with pytest.raises(ConfigError):
+        Sweep({"MIN_KL": [-0.5]})
+
+
+def test_result_store(tmp_path, monkeypatch):
+    from config import init_conf
+    from simulate import result_store
+    from simulate.result_store import code_fingerprint
+    overrides = {"n_stat": 2, "n_rounds": 3, "RESULT_CACHE": True, "RESULT_CACHE_FOLDER": str(tmp_path)}
+    game = Game(write_to_file=False, conf=init_conf(overrides))
+    results = game.run(override=False)
+    assert sorted(os.listdir(game.store.folder)) == ["0.pkl", "1.pkl"]
+
+    more_seeds = Game(write_to_file=False, conf=init_conf({**overrides, "n_stat": 3}))
+    assert more_seeds.store.key == game.store.key and len(more_seeds.load_stored()) == 2
+    assert more_seeds.run(override=False)[:2] == results and len(os.listdir(game.store.folder)) == 3
+
+    changed = Game(write_to_file=False, conf=init_conf({**overrides, "BLUSH_FREQ_LIE": 0.3}))
+    assert changed.store.key != game.store.key and changed.load_stored() == {}
+
+    assert len(code_fingerprint()) == 16
+    monkeypatch.setattr(result_store, "code_fingerprint", lambda: "changed code")
+    assert Game(write_to_file=False, conf=init_conf(overrides)).store.key != game.store.key
+
+    random_honesties = Game(write_to_file=False, conf=init_conf({**overrides, "honesties_dict": None}))
+    assert random_honesties.store is None and init_conf(overrides)("RANDOM_HONESTIES")
+
+
+def test_run_games(tmp_path):
+    from config import init_conf
+    from simulate import run_games
+    from helper import run_parallel
+    from simulate.information_theory import Ift
+    run_parallel.close_pool()
+    Ift.warm_up() # JAX runs in the parent before the pool is started
+    overrides = {"n_stat": 2, "n_rounds": 3, "RESULT_CACHE": False, "TASK_COSTS_FILE": str(tmp_path / "costs.json")}
+    games = [Game(characters, write_to_file=False, conf=init_conf(overrides))
+             for characters in ({"all": "ordinary"}, {0: "manipulative", "all": "ordinary"})]
+    results = run_games(games, override=True)
+    assert [len(result) for result in results] == [2, 2]
+    assert results[1][0] == Game(games[1].characters_setup, write_to_file=False, conf=games[1].conf).run(override=True)[0]
+
+    pool = run_parallel.POOL
+    assert pool is not None and run_games(games, override=True) == results and run_parallel.POOL is pool
+
+    static = [Game(game.characters_setup, write_to_file=False, conf=init_conf({**overrides, "SCHEDULING": "static"}))
+              for game in games]
+    assert run_games(static, override=True) == results
+    with open(tmp_path / "costs.json") as file:
+        assert set(json.load(file)) == {game.name for game in games}
+
+
+def test_dynamic_scheduling():
+    from helper import Progress
+    from helper.run_parallel import guided_batches
+    costs = [1, 5, 1, 1, 2, 1, 1, 1]
+    batches = guided_batches(costs, n_cores=2)
+    assert sorted(index for batch in batches for index in batch) == list(range(len(costs)))
+    assert batches[0] == [1] and len(batches[-1]) == 1
+
+    progress = Progress(["a", "a", "a", "b"], interval=float("inf"))
+    for index, runtime in enumerate([1.0, 1.0, 5.0, 2.0]):
+        progress.update(index, runtime)
+    assert progress.done == {"a": 3, "b": 1} and progress.stragglers() == [2]
+
+
+def test_task_costs(tmp_path):
+    from helper import TaskCosts
+    first, second = TaskCosts(str(tmp_path / "costs.json")), TaskCosts(str(tmp_path / "costs.json"))
+    first.update("a", [1.0, 3.0])
+    second.update("b", [4.0])
+    assert TaskCosts(str(tmp_path / "costs.json")).costs == {"a": 2.0, "b": 4.0}
+    assert TaskCosts(None).estimate(["a"]) == [1.0]
+
+
+def test_result_files(tmp_path):
+    from config import init_conf
+    from helper import save_results, load_results, convert_json_results
+    results = Game(write_to_file=False, conf=init_conf({"n_stat": 2, "n_rounds": 5, "RESULT_CACHE": False})).run(True)
+    save_results(results, str(tmp_path / "sim.json"))
+    json_results = load_results(str(tmp_path / "sim.json"))
+    assert load_results(convert_json_results(str(tmp_path / "sim.json"))) == results
+    for precision in ("float64", "float32", "quantized"):
+        save_results(json_results, str(tmp_path / f"{precision}.npz"), precision)
+    assert load_results(str(tmp_path / "float64.npz")) == results
+    quantized = load_results(str(tmp_path / "quantized.npz"))
+    assert [[state["Iself"] for step in result[1:] for state in step.values()] for result in quantized] == \
+        [[state["Iself"] for step in result[1:] for state in step.values()] for result in results]
+    assert (tmp_path / "float32.npz").stat().st_size < (tmp_path / "float64.npz").stat().st_size
+
+    import numpy as np
+    from helper.records import load_records, map_column
+    column = map_column(str(tmp_path / "quantized.npz"), "Iself")
+    with np.load(str(tmp_path / "quantized.npz")) as file:
+        assert isinstance(column, np.memmap) and np.array_equal(column, file["Iself"])
+        np.savez_compressed(str(tmp_path / "compressed.npz"), **file)
+    assert load_records(str(tmp_path / "compressed.npz")) == quantized
+    assert load_records(str(tmp_path / "float64.npz"), [1]) == results[1:]
+
+
+def test_stream_results(tmp_path):
+    from config import init_conf
+    from helper import load_results, results_exist
+    overrides = {"n_stat": 2, "n_rounds": 5, "folder": str(tmp_path), "RESULT_CACHE": True,
+                 "RESULT_CACHE_FOLDER": str(tmp_path / "store")}
+    expected = Game(write_to_file=False, conf=init_conf(overrides)).run(True)
+    game = Game(conf=init_conf({**overrides, "RESULT_FORMAT": "jsonl"}))
+    game.run(True)
+    assert game.outfile_name.endswith(".jsonl") and results_exist(game.outfile_name)
+    assert sorted(os.listdir(game.outfile_name)) == ["manifest.json", "seed_0.jsonl", "seed_1.jsonl"]
+    assert load_results(game.outfile_name) == expected and game.load_stored() == dict(enumerate(expected))
+
+    os.remove(os.path.join(game.outfile_name, "manifest.json"))
+    assert not results_exist(game.outfile_name)
+    game.run(False) # finalized again from the result store
+    assert load_results(game.outfile_name) == expected
+    assert game.prepare(True) is not None and not results_exist(game.outfile_name) # incomplete until finalized
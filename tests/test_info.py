@@ -1,6 +1,14 @@
+import os
+from collections import OrderedDict
 import pytest
+import numpy as np
+from scipy.special import digamma
 
 from simulate.information_theory import Info, Ift
+from simulate.information_theory.cache import LRUCache, merge_shards, write_entries
+from simulate.information_theory.kl_table import KLTable
+from simulate.information_theory.solvers import newton_minimize_KL
+from config import init_conf
 
 
 def test_info_arithmetic():
@@ -10,11 +18,32 @@ def test_info_arithmetic():
     assert 3 * (I1.mu) == (3 * I1).mu and 3 * (I1.la) == (3 * I1).la
 
 
+def test_info_immutable():
+    import pickle
+    I = Info(2.345, 1.234)
+    with pytest.raises(AttributeError):
+        I.mu = 3
+    rounded = I.round(1)
+    assert (rounded.mu, rounded.la) == (2.3, 1.2) and (I.mu, I.la) == (2.345, 1.234)
+    I2 = pickle.loads(pickle.dumps(I))
+    assert (I2.mu, I2.la) == (I.mu, I.la)
+    assert Info(3e6, 1e6).mu == 7.5e5 and (Info.TRUE.mu, Info.TRUE.la) == (1, 0)
+
+
 def test_KL():
     assert Ift.KL(Info(2, 3), Info(2, 3)) == 0
     assert round(Ift.KL(Info(3, 5), Info(6, 3)), 2) == 1.38
 
 
+def test_KL_many():
+    P, Q = [Info(3, 5), Info(0, 0), Info(40, 2)], [Info(6, 3), Info(2, 3), Info(40, 2)]
+    kl = Ift.KL_many([I.mu for I in P], [I.la for I in P], [I.mu for I in Q], [I.la for I in Q])
+    assert np.allclose(kl, [Ift.KL(IP, IQ) for IP, IQ in zip(P, Q)], rtol=1e-14)
+    pairwise = Ift.pairwise_KL(P)
+    assert pairwise.shape == (3, 3) and np.allclose(np.diag(pairwise), 0)
+    assert np.isclose(pairwise[0, 1], Ift.KL(P[0], P[1]))
+
+
 def test_match():
     Itruth, Ilie, Istart = Info(5, 3), Info(6, 4), Info(3, 3)
     I1 = Ift.match(1, Itruth, Ilie, Istart)
@@ -27,4 +56,109 @@ def test_minimize_KL():
     u, v = 1, 2
     mu, la = Ift.minimize_KL(u, v)
     assert mu + 1 > 0 and la + 1 > 0
-    
\ No newline at end of file
+    
+
+def test_newton_minimize_KL():
+    infos = [Info(5, 3), Info(0, 0), Info(40, 2), Info(0.3, 12), Info(250, 310)]
+    u = np.array([digamma(I.mu + I.la + 2) - digamma(I.mu + 1) for I in infos])
+    v = np.array([digamma(I.mu + I.la + 2) - digamma(I.la + 1) for I in infos])
+    mu, la = Ift.newton_minimize_KL(u, v)
+    for i, I in enumerate(infos):
+        assert np.isclose(mu[i], I.mu, rtol=1e-8, atol=1e-8) and np.isclose(la[i], I.la, rtol=1e-8, atol=1e-8)
+
+    trust, Itruth, Ilie = 0.3, Info(5, 3), Info(1, 8)
+    u = trust * (digamma(Itruth.mu + Itruth.la + 2) - digamma(Itruth.mu + 1)) + \
+        (1 - trust) * (digamma(Ilie.mu + Ilie.la + 2) - digamma(Ilie.mu + 1))
+    v = trust * (digamma(Itruth.mu + Itruth.la + 2) - digamma(Itruth.la + 1)) + \
+        (1 - trust) * (digamma(Ilie.mu + Ilie.la + 2) - digamma(Ilie.la + 1))
+    short = Ift.minimize_KL(u, v)
+    newton = Ift.newton_minimize_KL(u, v)
+    assert np.allclose(newton, short, rtol=Ift.conf("NEWTON_SHORT_TOL"))
+
+    # infeasible moments (exp(-u) + exp(-v) > 1) and too few iterations are not converged
+    _, _, converged = newton_minimize_KL([0.1, u], [0.1, v], full_output=True)
+    assert converged.tolist() == [False, True]
+    _, _, converged = newton_minimize_KL(u, v, max_iter=1, full_output=True)
+    assert not converged
+    conf = Ift.conf
+    try:
+        Ift.conf = init_conf({"NEWTON_MAX_ITER": 1})
+        assert np.allclose(Ift.newton_minimize_KL([u], [v]), np.reshape(Ift.solve_KL(u, v, method="SHORT"), (2, 1)))
+    finally:
+        Ift.conf = conf
+
+
+def test_match_batch():
+    trust = [0, 1, 0.3, 0.75]
+    Itruth = [Info(5, 3), Info(2, 1), Info(5, 3), Info(0, 4)]
+    Ilie = [Info(6, 4), Info(0, 1), Info(1, 8), Info(3, 3)]
+    Istart = [Info(0, 0)] * 4
+    batch = Ift.match_batch(trust, Itruth, Ilie, Istart)
+    assert batch[0] is Ilie[0] and batch[1] is Itruth[1]
+    for i in range(2, 4):
+        single = Ift.match(trust[i], Itruth[i], Ilie[i], Istart[i])
+        assert np.isclose(batch[i].mu, single.mu) and np.isclose(batch[i].la, single.la)
+
+
+def test_KL_cache(tmp_path):
+    cache = LRUCache(size=2, decimals=6, filename=str(tmp_path / "kl_cache.pkl"))
+    cache.put(cache.key(1, 2), (0.5, 0.5))
+    cache.put(cache.key(2, 3), (1.5, 1.5))
+    assert cache.get(cache.key(1 + 1e-9, 2)) == (0.5, 0.5)
+    cache.put(cache.key(3, 4), (2.5, 2.5))
+    assert cache.get(cache.key(2, 3)) is None
+    assert cache.stats() == {"hits": 1, "misses": 1, "evictions": 1, "entries": 2}
+
+    cache.save()
+    assert os.path.exists(cache.shard_path()) and not os.path.exists(tmp_path / "kl_cache.pkl")
+    write_entries(OrderedDict({cache.key(5, 6): (4.5, 4.5)}), str(tmp_path / "kl_cache.pkl.0.shard"))
+    os.utime(tmp_path / "kl_cache.pkl.0.shard", (0, 0)) # saved by another worker before this one
+    merge_shards(str(tmp_path / "kl_cache.pkl"), size=3)
+    assert os.listdir(tmp_path) == ["kl_cache.pkl"]
+    reloaded = LRUCache(size=2, decimals=6, filename=str(tmp_path / "kl_cache.pkl"))
+    assert reloaded.get(reloaded.key(3, 4)) == (2.5, 2.5) and reloaded.get(reloaded.key(5, 6)) is None
+    assert reloaded.stats() == {"hits": 1, "misses": 1, "evictions": 0, "entries": 2}
+    other = LRUCache(size=2, decimals=6, filename=str(tmp_path / "kl_cache.pkl"), settings=("NEWTON", -0.99999, 20))
+    assert other.get(other.key(3, 4)) is None # results of other settings are not reused
+
+    Ift.cache = LRUCache(size=10, decimals=12)
+    try:
+        first, second = Ift.minimize_KL(1, 2), Ift.minimize_KL(1, 2)
+        assert first == second and Ift.cache_stats()["hits"] == 1
+    finally:
+        Ift.cache = None
+
+
+def test_KL_table(tmp_path):
+    table = KLTable(u_min=0.01, u_max=10, size=96, max_error=1e-3, folder=str(tmp_path), MIN_KL=-0.99999)
+    assert os.path.exists(table.filename)
+
+    infos = [Info(5, 3), Info(2, 9), Info(12, 4)]
+    u = np.array([digamma(I.mu + I.la + 2) - digamma(I.mu + 1) for I in infos] + [20])
+    v = np.array([digamma(I.mu + I.la + 2) - digamma(I.la + 1) for I in infos] + [0.5])
+    mu, la, ok = table.lookup(u, v)
+    assert ok[:-1].all() and not ok[-1]
+    for i in np.flatnonzero(ok):
+        assert abs(mu[i] - infos[i].mu) / (1 + infos[i].mu) <= 1e-3 and abs(la[i] - infos[i].la) / (1 + infos[i].la) <= 1e-3
+
+    mu, la = table.solve(u, v)
+    assert np.allclose(Ift.newton_minimize_KL(u[-1], v[-1]), (mu[-1], la[-1]))
+
+    report = table.accuracy_report(Ift.newton_minimize_KL, n_samples=50)
+    assert report["table_rate"] >= 0.5 and report["max_error"] <= 1e-3
+
+
+def test_maximum_lie_size():
+    from scipy.optimize import root
+    cases = [(Info(5, 3), 0.1, True), (Info(5, 3), 0.1, False), (Info(0, 0), 2.0, True),
+             (Info(40, 2), 1e-3, False), (Info(250, 310), 0.5, True)]
+    for assumed, tolerance, friend in cases:
+        def lie_size(x):
+            statement = assumed + Info(x ** 2, 0) if friend else assumed + Info(0, x ** 2)
+            return Ift.KL(statement, assumed) - tolerance
+        expected = root(lie_size, [2.0]).x[0] ** 2
+        assert np.isclose(Ift.maximum_lie_size(assumed, tolerance, friend), expected, rtol=1e-8)
+
+    sizes = Ift.maximum_lie_size_many([case[0] for case in cases], [case[1] for case in cases], [case[2] for case in cases])
+    assert np.allclose(sizes, [Ift.maximum_lie_size(*case) for case in cases], rtol=1e-10)
+    assert Ift.maximum_lie_size(Info(5, 3), 0, True) == 0
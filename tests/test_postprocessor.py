@@ -0,0 +1,136 @@
+import pytest
+import numpy as np
+
+from config import conf, init_conf
+from evaluate.postprocessor.time_series_maker import TimeSeriesMaker
+
+@pytest.fixture(scope="module")
+def results():
+    """Results of a short game with two seeds, played once for all tests of the module."""
+    from simulate import Game
+    return Game(write_to_file=False, conf=init_conf({"n_stat": 2, "n_rounds": 20, "RESULT_CACHE": False})).run(True)
+
+def reference_time_series(data: list[dict], times: int) -> dict:
+    """Builds the series step by step: carry every value forward, then apply the changes of the conversation."""
+    n = conf("n_agents")
+    ts = {}
+    for a in conf("agents"):
+        start = data[0][a]
+        ts[a] = {"I": np.zeros((n, times)), "J": np.zeros((n, n, times)), "friendships": np.zeros((n, times)),
+                 "lastK": np.zeros(times), "kappa": np.zeros(times)}
+        ts[a]["I"][:, 0], ts[a]["J"][..., 0], ts[a]["friendships"][:, 0] = start["I"], start["J"], start["friendships"]
+        ts[a]["lastK"][0], ts[a]["kappa"][0] = start["lastK"], start["kappa"]
+        for t, entry in enumerate(data[1:], start=1):
+            for key in ts[a]:
+                ts[a][key][..., t] = ts[a][key][..., t - 1]
+            if a in entry:
+                e, series = entry[a], ts[a]
+                series["I"][a, t], series["I"][e["partner"], t] = e["Iself"], e["Ipartner"]
+                series["I"][e["topic"], t] = e.get("Itopic", series["I"][e["topic"], t - 1])
+                series["J"][a, e["topic"], t], series["J"][e["partner"], e["topic"], t] = e["Jself"], e["Jpartner"]
+                series["lastK"][t], series["kappa"][t] = e["lastK"], e["kappa"]
+                series["friendships"][e["partner"], t] = e.get("friendships", series["friendships"][e["partner"], t - 1])
+    return ts
+
+def test_time_series_maker(results):
+    times = len(results[0])
+    for result in results:
+        expected = reference_time_series(list(result), times)
+        for data in (result, list(result)):
+            ts = TimeSeriesMaker().make_time_series_data(data, times)
+            for a in conf("agents"):
+                assert all(np.array_equal(ts[a][key], expected[a][key]) for key in expected[a])
+                assert np.array_equal(ts[a]["Iothers"][..., 0], result[0][a]["Iothers"])
+
+def test_forward_fill():
+    values = np.array([[1., 5., 0., 0., 2.]])
+    assert TimeSeriesMaker.forward_fill(values, values != 0).tolist() == [[1., 5., 5., 5., 2.]]
+
+def test_statistics(results):
+    from evaluate import Postprocessor
+    from evaluate.postprocessor.calculate_statistics import calculate_statistics
+    times = len(results[0])
+    series = [TimeSeriesMaker().make_time_series_data(result, times) for result in results]
+    statistics = calculate_statistics(series, times, quantiles=[0.1, 0.5], confidence=0.9)
+    assert {"mean", "std", "min", "max", "q10", "q50", "ci_low", "ci_high"} == set(statistics)
+    values = np.array([ts[1]["J"] for ts in series])
+    assert np.allclose(statistics["mean"][1]["J"], values.mean(axis=0))
+    assert np.allclose(statistics["q50"][1]["J"], np.median(values, axis=0))
+    assert np.all(statistics["ci_low"][1]["J"] <= statistics["mean"][1]["J"])
+
+    select = Postprocessor(data=results).select
+    low, high = select["bands"]["min-max"]["A0 on A1"]
+    assert np.all(low <= select["A0 on A1"]) and np.all(select["A0 on A1"] <= high)
+    assert set(select["bands"]) == {"std", "ci", "min-max", "q25-q75"}
+
+def test_streaming_postprocessor(results, tmp_path, monkeypatch):
+    from evaluate import Postprocessor
+    from helper import save_results, iterate_results
+    from evaluate.postprocessor.calculate_statistics import RunningStatistics
+    batch = Postprocessor(data=results, mode="batch")
+    for name in ("sim.json", "sim.npz", "sim.jsonl"):
+        save_results(results, str(tmp_path / name))
+        assert len(list(iterate_results(str(tmp_path / name)))) == len(results)
+        streamed = Postprocessor(filename=str(tmp_path / name), mode="streaming")
+        for statistic, data in streamed.statistics.items():
+            for a in conf("agents"):
+                assert all(np.allclose(data[a][key], batch.statistics[statistic][a][key]) for key in data[a])
+        assert set(streamed.select["bands"]) == {"std", "ci", "min-max"}
+
+    from helper import records
+    selected = []
+    select_records = records.select_records
+    monkeypatch.setattr(records, "select_records", lambda *args: selected.append(args[2]) or select_records(*args))
+    seeds = iterate_results(str(tmp_path / "sim.npz"))
+    assert next(seeds) == results[0] and selected == [[0]] # one seed is built per iteration
+    assert list(seeds) == results[1:] and selected == [[seed] for seed in range(len(results))]
+
+    series = [TimeSeriesMaker().make_time_series_data(result, len(result)) for result in results]
+    halves = [RunningStatistics(), RunningStatistics()]
+    for half, ts in zip(halves, series):
+        half.update(ts)
+    merged = RunningStatistics().merge(halves[0]).merge(halves[1]).result()
+    assert np.allclose(merged["std"][0]["I"], batch.statistics["std"][0]["I"])
+
+def test_parallel_postprocessor(results, tmp_path, monkeypatch):
+    import evaluate.postprocessor.postprocessor as postprocessor
+    from helper import save_results
+    streamed = postprocessor.Postprocessor(data=results, mode="streaming")
+    for min_parallel in (len(results) + 1, 2):
+        monkeypatch.setattr(postprocessor, "conf", lambda key: min_parallel if key == "POSTPROCESSING_MIN_PARALLEL"
+                            else conf(key))
+        for name in ("sim.npz", "sim.json", None):
+            if name:
+                save_results(results, str(tmp_path / name))
+            parallel = postprocessor.Postprocessor(filename=name and str(tmp_path / name), data=None if name else results,
+                                                   mode="parallel")
+            for statistic, data in parallel.statistics.items():
+                for a in conf("agents"):
+                    assert all(np.allclose(data[a][key], streamed.statistics[statistic][a][key]) for key in data[a])
+
+def test_select_cache(results, tmp_path):
+    import os
+    from helper import save_results
+    from evaluate.postprocessor import SelectCache
+    filename = str(tmp_path / "sim.npz")
+    save_results(results, filename)
+    cache = SelectCache(str(tmp_path / "selects"))
+    select = cache.load(filename=filename)
+    cached = cache.load(filename=filename)
+    assert isinstance(cached["A0 on A1"], np.memmap)
+    assert cached["time"] == select["time"] and set(cached["bands"]) == set(select["bands"])
+    assert all(np.array_equal(cached[key], select[key]) for key in select if key not in ("time", "bands"))
+    assert np.array_equal(cached["bands"]["ci"]["A0 on A1"][1], select["bands"]["ci"]["A0 on A1"][1])
+
+    os.utime(filename, ns=(0, 0))
+    assert isinstance(cache.load(filename=filename)["A0 on A1"], np.memmap) # same content, still valid
+    save_results(results[:1], filename)
+    assert not isinstance(cache.load(filename=filename)["A0 on A1"], np.memmap)
+    cache.VERSION = SelectCache.VERSION + 1
+    assert not isinstance(cache.load(filename=filename)["A0 on A1"], np.memmap)
+    assert isinstance(cache.load(filename=filename)["A0 on A1"], np.memmap)
+    cache.code = "changed code"
+    assert not isinstance(cache.load(filename=filename)["A0 on A1"], np.memmap)
+
+    assert not isinstance(cache.load(data=results)["A0 on A1"], np.memmap)
+    assert isinstance(cache.load(data=results)["A0 on A1"], np.memmap)
@@ -1,3 +1,4 @@
+import os
 import pytest
 
 from simulate import Game
@@ -11,7 +12,167 @@ def test_setup():
     simulation = game.simulations[0]
     assert isinstance(simulation.random, dict)
     assert len(simulation.agents) == conf("n_agents")
-    assert len(simulation.conversations) == conf("n_rounds") * conf("n_agents")
+    assert len(simulation.conversations) == conf("n_agents")
+    assert len(list(simulation.schedule_conversations())) == conf("n_rounds") * conf("n_agents")
+
+def test_simulation_pickle():
+    import pickle
+    simulation = game.simulations[1]
+    restored = pickle.loads(pickle.dumps(simulation))
+    assert "agents" not in simulation.__getstate__()
+    assert restored.honesties == simulation.honesties and len(restored.agents) == conf("n_agents")
+    assert restored.random["topic"].uniform() == simulation.random["topic"].uniform()
 
 def test_simulation_name():
     pass
+
+def test_mind_backends():
+    from simulate import Simulation
+    results, entries = {}, {}
+    for backend in ("lists", "arrays", "sparse"):
+        short_conf = lambda key: backend if key == "MIND_BACKEND" else 10 if key == "n_rounds" else conf(key)
+        simulation = Simulation(0, {"all": "manipulative"}, short_conf)
+        results[backend] = simulation.play()
+        entries[backend] = sum(agent.count_mind_entries() for agent in simulation.agents)
+    assert results["arrays"] == results["lists"] and results["sparse"][1:] == results["lists"][1:]
+    from helper.records import dense_matrix
+    for agent, state in results["sparse"][0].items():
+        assert state["Iothers"]["entries"] == [] and state["J"]["entries"] == []
+        decoded = {**state, "Iothers": dense_matrix(state["Iothers"]), "J": dense_matrix(state["J"])}
+        assert decoded == results["lists"][0][agent]
+
+    from simulate.agent import Agent
+    from simulate.information_theory import Info
+    from helper import make_random_dict
+    arrays_conf = init_conf({"MIND_BACKEND": "arrays"})
+    agent = Agent(1, 0.5, "ordinary", make_random_dict(0, arrays_conf), None, arrays_conf)
+    n = conf("n_agents")
+    assert agent.I.data.shape == (n, 2) and agent.Iothers.data.shape == (n, n, 2)
+    assert agent.friendships.counts(1) == [1, 0] and agent.friendships.counts(0) == [0, 0]
+    agent.J.set_counts((0, 2), 2e6, 0)
+    assert agent.J.counts(0, 2) == [Info(2e6, 0).mu, Info(2e6, 0).la] == [1e6, 0]
+    assert entries["lists"] == 3 * conf("n_agents") ** 3 and 0 < entries["sparse"] < entries["lists"]
+
+def test_jax_engine():
+    import numpy as np
+    from simulate import Simulation
+    from simulate.jax_engine import JaxEngine
+    from config.config_loader.config_error import ConfigError
+    for key, value in (("p_one_to_one", 0.5), ("LOGGING", True), ("ACTIVE_SELF_FRIENDSHIP", True)):
+        with pytest.raises(ConfigError):
+            init_conf({"ENGINE": "jax", key: value})
+
+    short_conf, n_seeds = init_conf({"n_rounds": 10, "ENGINE": "jax"}), 32
+    simulations = [Simulation(seed, {"all": "manipulative"}, short_conf) for seed in range(n_seeds)]
+    results = JaxEngine(short_conf).run(simulations)
+    expected = [simulation.play() for simulation in simulations]
+    assert len(results) == n_seeds and len(results[0]) == len(expected[0])
+    assert results[0][0] == expected[0][0]
+    keys = {"topic", "partner", "id", "Iself", "Ipartner", "Iothers", "Jself", "Jpartner", "lastK", "kappa"}
+    for step in results[0][1:]:
+        assert len(step) == 2
+        for state in step.values():
+            assert keys <= set(state) <= keys | {"friendships", "Itopic"}
+            assert 0 <= state["Iself"] <= 1 and state["kappa"] > 0
+
+    # the engines draw different random numbers, so only the trajectories averaged over the seeds agree
+    for field in ("Iself", "Ipartner", "Jself"):
+        jax_values, python_values = trajectories(results, field), trajectories(expected, field)
+        error = np.sqrt((np.nanvar(jax_values, axis=0) + np.nanvar(python_values, axis=0)) / n_seeds) + 1e-3
+        difference = np.abs(np.nanmean(jax_values, axis=0) - np.nanmean(python_values, axis=0))
+        assert np.nanmax(difference / error) < 5
+
+def trajectories(results: list, field: str):
+    """Returns the latest value of a field of every agent after every conversation, shape (seeds, steps, agents)."""
+    import numpy as np
+    n_agents = len(results[0][0])
+    values = np.full((len(results), len(results[0]) - 1, n_agents), np.nan)
+    for seed, result in enumerate(results):
+        current = np.full(n_agents, np.nan)
+        for step, states in enumerate(result[1:]):
+            for agent, state in states.items():
+                current[agent] = state[field]
+            values[seed, step] = current
+    return values
+
+def test_conversation_plan():
+    from simulate import Simulation
+    for setup in ({"all": "ordinary"}, {0: "egocentric", "all": "ordinary"}):
+        results = {}
+        for planned in (True, False):
+            plan_conf = lambda key: planned if key == "CONVERSATION_PLAN" else 0.5 if key == "p_one_to_one" else 20 if key == "n_rounds" else conf(key)
+            results[planned] = Simulation(0, setup, plan_conf).play()
+        assert results[True] == results[False]
+
+def test_random_sources():
+    import numpy as np
+    from simulate import Simulation
+    from helper.random_streams import LegacyStream, GeneratorStream
+    legacy, reference = LegacyStream(7, block_size=3), np.random.RandomState(7)
+    for _ in range(50):
+        assert legacy.uniform() == reference.uniform()
+        assert legacy.choice([0, 1, 2, 4, 5]) == reference.choice([0, 1, 2, 4, 5])
+        assert legacy.exponential(1.7) == reference.exponential(1.7)
+        assert np.array_equal(legacy.randint(0, 9, size=5), reference.randint(0, 9, size=5))
+        assert legacy.choice(np.int64(5)) == reference.choice(np.int64(5))
+    generator = GeneratorStream(7)
+    assert all(0 <= generator.choice(np.int64(3)) < 3 for _ in range(20))
+
+    results = {}
+    for source in ("legacy", "RandomState", "generator"):
+        source_conf = lambda key: source if key == "RANDOM_SOURCE" else 10 if key == "n_rounds" else conf(key)
+        simulation = Simulation(0, {"all": "manipulative"}, source_conf)
+        assert type(simulation.random["topic"]).__name__ == {"legacy": "LegacyStream", "RandomState": "RandomState", "generator": "GeneratorStream"}[source]
+        results[source] = simulation.play()
+    assert results["legacy"] == results["RandomState"]
+    assert len(results["generator"]) == len(results["legacy"])
+
+def test_step_records(tmp_path):
+    import pickle
+    from simulate import Simulation
+    from simulate.game import play_simulation, receive_output
+    from helper import StepRecords
+    short_conf = init_conf({"n_rounds": 10, "RESULT_TRANSFER": "memmap", "RESULT_TRANSFER_FOLDER": str(tmp_path)})
+    expected = Simulation(0, {"all": "manipulative"}, short_conf).play()
+    assert StepRecords.from_result(expected) == expected and list(StepRecords.from_result(expected)) == expected
+
+    output = play_simulation(Simulation(0, {"all": "manipulative"}, short_conf))
+    assert "result" not in output and len(pickle.dumps(output)) < 2000
+    records = receive_output(output)["result"]
+    assert records == expected and records[-1] == expected[-1] and os.listdir(tmp_path) == []
+    assert pickle.loads(pickle.dumps(records)) == expected
+
+def test_one_to_all_records(tmp_path):
+    from simulate import Simulation
+    from helper import StepRecords
+    broadcast_conf = init_conf({"n_rounds": 10, "p_one_to_one": 0.5})
+    expected = Simulation(0, {"all": "ordinary"}, broadcast_conf).play()
+    broadcasts = [entry for entry in expected[1:] if len(entry) == conf("n_agents")]
+    assert broadcasts and all(len(entry) in (2, conf("n_agents")) for entry in expected[1:])
+    for entry in broadcasts:
+        speaker = next(state for state in entry.values() if state["partner"] == -1)
+        assert "Ipartner" not in speaker and "Jself" in speaker
+        assert all(state["partner"] == speaker["id"] for state in entry.values() if state is not speaker)
+
+    records = Simulation(0, {"all": "ordinary"}, broadcast_conf).play_records()
+    assert records.steps.shape[1] == conf("n_agents") and records == expected
+    assert StepRecords.from_result(expected) == expected
+
+    import warnings
+    from helper.records import save_records, load_records
+    with warnings.catch_warnings():
+        warnings.simplefilter("error")
+        save_records([records], str(tmp_path / "quantized.npz"), "quantized")
+    quantized = load_records(str(tmp_path / "quantized.npz"))[0]
+    rounded = ("Iself", "Ipartner", "Iothers", "Jself", "Jpartner")
+    for step, expected_step in zip(quantized[1:], expected[1:]):
+        assert {agent: set(state) for agent, state in step.items()} == \
+            {agent: set(state) for agent, state in expected_step.items()}
+        assert all(step[agent][field] == state[field] for agent, state in expected_step.items()
+                   for field in rounded if field in state)
+
+    from evaluate.postprocessor.time_series_maker import TimeSeriesMaker
+    series = TimeSeriesMaker().make_time_series_data(records, len(records))
+    speaker = next(state for state in broadcasts[-1].values() if state["partner"] == -1)
+    t = expected.index(broadcasts[-1])
+    assert series[speaker["id"]]["J"][speaker["id"], speaker["topic"], t] == speaker["Jself"]